@@ -10,15 +10,25 @@ from src.correlation_matrix import (
 from src.survey_analysis import SurveyAnalyzer
 from src.survey_statistics import SurveyStatistics
 from src.ttest import do_ttest
+from src.nonparametric import rank_tests
 from src.group import group_data
 from src.descriptives import descriptives_by_group
 from src.linear_regression import linear_regression
+from src.report import Report
+from src.other_answers import OtherAnswerNormalizer
+from src.cleaning import clean_data, load_raw
+from src.screening import exclusion_counts
+from src.export import export_analysis
 
 # ===========================
 # CONFIGURATION
 # ===========================
 PRINT_OUTPUT = False  # Print analysis results to console
 GENERATE_FILES = False  # Save plots and files
+GENERATE_REPORT = False  # Collect all results in report/report.md
+REPORT_DIR = "report"
+N_JOBS = None  # worker processes for the report sections (None = all cores, 1 = sequential)
+BLAS_THREADS = 1  # BLAS/OpenMP threads per worker
 
 # Data configuration
 YOUNG_CSV = "data/results-survey779776.csv"
@@ -30,6 +40,14 @@ OLD_VALUE = 0
 
 # Data cleaning configuration
 COLUMN_ANSWER_PERCENTAGE = 0.8
+YOUNG_AGE = (18, 35)
+OLD_AGE = (35, inf)
+SCREEN_RESPONSES = True  # drop failed attention checks, straight-liners, speeders
+
+# Export of df / df_grouped (with GENERATE_FILES)
+EXPORT_DIR = "data/export"
+EXPORT_FORMAT = "parquet"  # "csv" only as explicit opt-in
+EXPORT_APPEND = True  # only write respondents not exported yet
 
 
 def creat_head_dict_from_csv():
@@ -52,37 +70,123 @@ def get_full_question(df: pd.DataFrame):
     return df
 
 
-def check_age(df, low_bound, upper_bound):
-    return df[(df["G02Q04"] >= low_bound) & (df["G02Q04"] <= upper_bound)]
+def build_report(
+    df_grouped: pd.DataFrame,
+    out_dir: str = REPORT_DIR,
+    fmt: str = "md",
+    n_jobs: int = N_JOBS,
+    screening_flags: pd.DataFrame = None,
+):
+    analyzer = SurveyAnalyzer(
+        young_csv=YOUNG_CSV,
+        old_csv=OLD_CSV,
+        key_csv=KEY_CSV,
+        group_col=GROUP_COL,
+        young_value=YOUNG_VALUE,
+        old_value=OLD_VALUE,
+    )
+    df_clean = analyzer.prepare_clean_dataset()
+    scales = [
+        "autonomous_motivation",
+        "controlled_motivation",
+        "usefulness_work",
+        "usefulness_learning",
+    ]
+    predictors = ["upskilling", "reskilling", "age", "usage"]
+
+    report = Report(out_dir=out_dir, fmt=fmt)
+    if screening_flags is not None:
+        report.add_section("screening", exclusion_counts, screening_flags, title="screening exclusions")
+    report.add_section(
+        "descriptives",
+        descriptives_by_group,
+        df=df_grouped,
+        group_col=GROUP_COL,
+        vars_usefulness=scales[2:],
+        vars_motivation=scales[:2],
+        confidence=0.95,
+    )
+    report.add_section("ttest", do_ttest, df_grouped[scales + [GROUP_COL]])
+    report.add_section("rank_tests", rank_tests, df_grouped[scales + [GROUP_COL]])
+    report.add_section("ancova", analyzer.run_ancova, df_clean, print_output=False)
+    for y in ["autonomous_motivation", "controlled_motivation"]:
+        report.add_section(
+            f"regression_{y}",
+            linear_regression,
+            df_X=df_grouped[predictors],
+            df_Y=df_grouped[y],
+        )
+    report.add_section(
+        "correlation_predictors",
+        calc_correlation,
+        df_grouped[["upskilling", "reskilling", "usage", "age"]],
+    )
+    report.add_section(
+        "correlation_motivation_skilling",
+        calc_correlation_motivation_skilling,
+        df_grouped[["upskilling", "reskilling"] + scales[:2]],
+    )
+    for plot in [
+        analyzer.plot_group_box_and_points,
+        analyzer.plot_histograms,
+        analyzer.plot_scatter_autonomous_vs_reskill,
+    ]:
+        report.add_figure(
+            plot.__name__, plot, df_clean, print_output=False, generate_files=True
+        )
+    return report.build(n_jobs=n_jobs, blas_threads=BLAS_THREADS)
 
 
 if __name__ == "__main__":
     # Load and combine datasets
-    df_young = pd.read_csv(YOUNG_CSV)
-    df_young = check_age(df_young, 18, 35)
-    df_young = df_young.assign(young_group=YOUNG_VALUE)
-
-    df_old = pd.read_csv(OLD_CSV)
-    df_old = check_age(df_old, 35, np.inf)
-    df_old = df_old.assign(young_group=OLD_VALUE)
-
-    df = pd.concat([df_young, df_old], ignore_index=True)
+    df_young, df_old = load_raw(YOUNG_CSV, OLD_CSV)
     # print(df.iloc[1]) # with question key
     # print(get_full_question(df).iloc[1]) # with full questions
 
     # Clean dataset
-    min_count = int(COLUMN_ANSWER_PERCENTAGE * len(df))
-
-    # delete rows where user didnt finished
-    df = df[df["submitdate"].notna()]
-    # drop columns with to litte partisans
-    df = df.dropna(axis="columns", thresh=min_count)
+    df, screening_flags = clean_data(
+        df_young,
+        df_old,
+        young_age=YOUNG_AGE,
+        old_age=OLD_AGE,
+        column_answer_percentage=COLUMN_ANSWER_PERCENTAGE,
+        screen_responses=SCREEN_RESPONSES,
+        group_col=GROUP_COL,
+        young_value=YOUNG_VALUE,
+        old_value=OLD_VALUE,
+        return_flags=True,
+    )
+    exclusions = None
+    if screening_flags is not None:
+        # always shown: screening changes the sample every later result is based on
+        exclusions = exclusion_counts(screening_flags)
+        print(f"Screening excluded {exclusions['excluded']} of {exclusions['screened']} responses:")
+        print(exclusions.drop(["excluded", "screened"]).to_string())
+        if PRINT_OUTPUT:
+            print(screening_flags.drop(columns="completion_seconds").sum())
     # print(df[df["young_group"] == 1].shape)
     # print(df[df["young_group"] == 0].shape)
 
     # Create grouped dataset with calculated variables
     df_grouped = group_data(df, print_cronbach=True)
 
+    if GENERATE_FILES:
+        export_analysis(
+            df,
+            df_grouped,
+            out_dir=EXPORT_DIR,
+            cleaning={
+                "young_age": YOUNG_AGE,
+                "old_age": OLD_AGE,
+                "column_answer_percentage": COLUMN_ANSWER_PERCENTAGE,
+                "screen_responses": SCREEN_RESPONSES,
+            },
+            sources=[YOUNG_CSV, OLD_CSV],
+            screening=None if exclusions is None else exclusions.to_dict(),
+            fmt=EXPORT_FORMAT,
+            append=EXPORT_APPEND,
+        )
+
     # Define variables for analysis
     vars_usefulness = ["usefulness_work", "usefulness_learning"]
     vars_motivation = ["controlled_motivation", "autonomous_motivation"]
@@ -117,11 +221,15 @@ if __name__ == "__main__":
         analyzer.run_ttest_autonomous_by_group(
             df_clean, print_output=PRINT_OUTPUT, generate_files=GENERATE_FILES
         )
+        analyzer.run_rank_test_autonomous_by_group(
+            df_clean, print_output=PRINT_OUTPUT, generate_files=GENERATE_FILES
+        )
         analyzer.run_ancova(
             df_clean, print_output=PRINT_OUTPUT, generate_files=GENERATE_FILES
         )
 
-        df_clean.to_csv("data/analysis.csv", index=False)
+        if EXPORT_FORMAT == "csv":
+            df_clean.to_csv("data/analysis.csv", index=False)
 
         analyzer.plot_group_box_and_points(
             df_clean, print_output=PRINT_OUTPUT, generate_files=GENERATE_FILES
@@ -134,8 +242,11 @@ if __name__ == "__main__":
         )
 
         # Survey statistics using data from main
-        survey_stats = SurveyStatistics(df=df)
+        # [other] free texts -> categories, aliases in data/other_aliases.csv
+        normalizer = OtherAnswerNormalizer()
+        survey_stats = SurveyStatistics(df=df, normalizer=normalizer)
         survey_stats.print_summary(print_output=True, generate_files=GENERATE_FILES)
+        normalizer.save()
 
         corr_1 = calc_correlation(
             df_grouped[["upskilling", "reskilling", "usage", "age"]],
@@ -182,3 +293,6 @@ if __name__ == "__main__":
             ],
             print_results=True,
         )
+
+    if GENERATE_REPORT:
+        print(build_report(df_grouped, screening_flags=screening_flags))
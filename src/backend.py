@@ -0,0 +1,443 @@
+"""
+Dataframe backends for the core pipeline (loading, cleaning, scale scoring,
+descriptives, demographics).
+
+"pandas" runs the existing functions. "polars" keeps loading, cleaning and
+screening as one lazy, multi-threaded Polars plan; only the column threshold
+of cleaning is collected, and run() collects scores, descriptives and
+demographics together. It needs the optional polars and pyarrow packages.
+Both return pandas objects from descriptives() and collect(), so results can
+be compared directly (see compare_backends).
+"""
+
+import os
+import tempfile
+import time
+from math import inf
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from src.cleaning import clean_data, load_raw
+from src.descriptives import descriptives_by_group
+from src.group import SCALES, ScoringPlan, group_data, scale_items
+from src.item_correlation import item_columns
+from src.screening import ATTENTION_CHECKS, EXCLUDE_ON, TIMING_COLUMNS, longest_run
+from src.survey_statistics import SurveyStatistics
+
+# the strings pandas.read_csv reads as NaN by default
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+DEMOGRAPHICS = {
+    "gender": (
+        ["G02Q05", "G02Q05[other]"],
+        {1: "Male", 2: "Female", 3: "Other"},
+    ),
+    "school_education": (
+        ["G02Q06", "G02Q06[other]"],
+        {1: "Primary", 2: "Secondary", 3: "Tertiary", 4: "University"},
+    ),
+    "vocational_education": (
+        ["G02Q07", "G02Q07[other]"],
+        {1: "No Training", 2: "In Training", 3: "Completed", 4: "Advanced", 5: "Specialized"},
+    ),
+}
+
+
+class PandasBackend:
+    name = "pandas"
+
+    def load(self, young_csv: str, old_csv: str):
+        return load_raw(young_csv, old_csv)
+
+    def clean(self, raw, **config) -> pd.DataFrame:
+        return clean_data(*raw, **config)
+
+    def group_data(self, df: pd.DataFrame, plan: ScoringPlan = None) -> pd.DataFrame:
+        out = group_data(df.copy(), plan=plan)
+        out.index = range(len(out))
+        return out
+
+    def descriptives(self, df_grouped, group_col: str, targets: list[str], confidence: float = 0.95):
+        return descriptives_by_group(df_grouped, group_col, targets, [], confidence=confidence)
+
+    def demographics(self, df: pd.DataFrame) -> dict:
+        stats_ = SurveyStatistics(df)
+        return {
+            "age": stats_.age_statistics(),
+            "gender": stats_.gender_statistics()["participants_per_gender"],
+            "school_education": stats_.school_education_statistics()["participants_per_school_education"],
+            "vocational_education": stats_.vocational_education_statistics()["participants_per_vocational_education"],
+        }
+
+    def collect(self, frame) -> pd.DataFrame:
+        return frame
+
+    def run(self, df: pd.DataFrame, group_col: str, targets: list[str]) -> dict:
+        grouped = self.group_data(df)
+        return {
+            "grouped": grouped,
+            "descriptives": self.descriptives(grouped, group_col, targets),
+            "demographics": self.demographics(df),
+        }
+
+
+class PolarsBackend:
+    name = "polars"
+
+    def __init__(self):
+        try:
+            import polars
+        except ImportError as e:
+            raise ImportError("The polars backend needs the packages polars and pyarrow") from e
+        self.pl = polars
+
+    def load(self, young_csv: str, old_csv: str):
+        pl = self.pl
+        frames = []
+        for path in (young_csv, old_csv):
+            # read lazily as text, only the answer codes used as numbers are parsed (unparsable ones become null)
+            numeric = self._numeric_columns(path)
+            lf = pl.scan_csv(
+                path,
+                infer_schema_length=0,
+                schema_overrides={c: pl.Float64 for c in numeric},
+                ignore_errors=True,
+            )
+            # the missing-value strings of pandas.read_csv as an expression, much cheaper than null_values
+            text = [c for c in lf.collect_schema().names() if c not in numeric]
+            frames.append(
+                lf.with_columns(
+                    [pl.col(c).fill_nan(None) for c in numeric]
+                    + [pl.when(pl.col(c).is_in(NA_VALUES)).then(None).otherwise(pl.col(c)).alias(c) for c in text]
+                )
+            )
+        return tuple(frames)
+
+    def _numeric_columns(self, path: str) -> list[str]:
+        schema = self.pl.scan_csv(path, infer_schema_length=0).collect_schema().names()
+        numeric = set(item_columns(pd.DataFrame(columns=schema))) | set(ATTENTION_CHECKS) | set(TIMING_COLUMNS)
+        numeric |= {i for entry in SCALES.values() for i in scale_items(entry)}
+        numeric |= {"G02Q04"} | {cols[0] for cols, _ in DEMOGRAPHICS.values()}
+        return [c for c in schema if c in numeric]
+
+    def _num(self, col: str):
+        return self.pl.col(col).cast(self.pl.Float64, strict=False)
+
+    def clean(
+        self,
+        raw,
+        young_age: tuple = (18, 35),
+        old_age: tuple = (35, inf),
+        column_answer_percentage: float = 0.8,
+        screen_responses: bool = True,
+        group_col: str = "young_group",
+        young_value: int = 1,
+        old_value: int = 0,
+    ):
+        """Same steps as cleaning.clean_data, returns a LazyFrame."""
+        pl = self.pl
+        young, old = raw
+        age = self._num("G02Q04")
+        lf = pl.concat(
+            [
+                young.filter(age.is_between(*young_age)).with_columns(pl.lit(young_value).alias(group_col)),
+                old.filter(age.is_between(*old_age)).with_columns(pl.lit(old_value).alias(group_col)),
+            ],
+            how="diagonal_relaxed",
+        ).with_row_index("__row")
+
+        filtered = lf.filter(pl.col("submitdate").is_not_null())
+        if screen_responses:
+            filtered = filtered.filter(~self._exclude(filtered.collect_schema().names()))
+
+        # the column threshold is the only data-dependent step: one query for both counts
+        total, counts = pl.collect_all([lf.select(pl.len()), filtered.select(pl.all().count())])
+        min_count = int(column_answer_percentage * total.item())
+        counts = counts.row(0, named=True)
+        return filtered.select([c for c in counts if c == "__row" or counts[c] >= min_count])
+
+    def _exclude(
+        self,
+        schema: list[str],
+        scales: dict = SCALES,
+        attention_checks: dict = ATTENTION_CHECKS,
+        long_string_max: int = 25,
+        speeder_ratio: float = 0.3,
+        straightline_share: float = 1.0,
+    ):
+        """Expression of screening.screen's exclusion (flags of screening_flags in EXCLUDE_ON)."""
+        pl = self.pl
+        flags = {}
+
+        attention = [
+            self._num(item).is_not_null() & (self._num(item) != expected)
+            for item, expected in attention_checks.items()
+            if item in schema
+        ]
+        flags["attention"] = pl.any_horizontal(attention) if attention else pl.lit(False)
+
+        blocks = [scale_items(v) for v in scales.values()]
+        zero_var = [
+            (pl.max_horizontal([self._num(i) for i in items]) == pl.min_horizontal([self._num(i) for i in items]))
+            & (pl.sum_horizontal([self._num(i).is_not_null() for i in items]) >= 2)
+            for items in blocks
+            if len(items) > 1 and set(items) <= set(schema)
+        ]
+        share = pl.mean_horizontal([z.fill_null(False).cast(pl.Float64) for z in zero_var]) if zero_var else pl.lit(0.0)
+        flags["straightliner"] = share >= straightline_share
+
+        items = item_columns(pd.DataFrame(columns=schema))
+        if items:
+            # same numpy kernel as screening_flags, run inside the query
+            longest = pl.struct([self._num(c) for c in items]).map_batches(
+                lambda s: pl.Series(longest_run(s.struct.unnest().to_numpy().astype(float))),
+                return_dtype=pl.Int64,
+            )
+            flags["long_string"] = longest > long_string_max
+        else:
+            flags["long_string"] = pl.lit(False)
+
+        timing = next((c for c in TIMING_COLUMNS if c in schema), None)
+        if timing is not None:
+            seconds = self._num(timing)
+        elif "startdate" in schema and "submitdate" in schema:
+            start, end = (pl.col(c).str.to_datetime(strict=False) for c in ("startdate", "submitdate"))
+            seconds = (end - start).dt.total_microseconds() / 1e6
+        else:
+            seconds = None
+        flags["speeder"] = pl.lit(False) if seconds is None else (seconds < speeder_ratio * seconds.median()).fill_null(False)
+
+        return pl.any_horizontal([flags[f] for f in EXCLUDE_ON])
+
+    def group_data(self, lf, plan: ScoringPlan = None):
+        """Scale scores and composites of the ScoringPlan (as group.group_data) as one lazy projection."""
+        pl = self.pl
+        plan = ScoringPlan() if plan is None else plan
+        exprs = []
+        for k, (key, spec) in enumerate(plan.specs.items()):
+            low, high = spec["range"]
+            total, weight, count = [], [], []
+            for item in spec["items"]:
+                x = self._num(item)
+                w = float(spec["weights"].get(item, 1.0))
+                keyed = low + high - x if item in spec["reverse"] else x
+                total.append(keyed * w)
+                weight.append(pl.when(x.is_not_null()).then(pl.lit(w)).otherwise(pl.lit(0.0)))
+                count.append(x.is_not_null().cast(pl.Int32))
+            score = pl.sum_horizontal(total) / pl.sum_horizontal(weight)
+            exprs.append(pl.when(pl.sum_horizontal(count) >= plan.min_valid[k]).then(score).alias(key))
+        lf = lf.select(exprs)
+
+        known = list(plan.scales)
+        for names, W in plan.levels:
+            comps = []
+            for name, c in zip(names, W.T):
+                parts = [(known[j], w) for j, w in enumerate(c) if w != 0]
+                # plain arithmetic: a missing part makes the composite missing
+                total = sum((pl.col(part) * w for part, w in parts[1:]), pl.col(parts[0][0]) * parts[0][1])
+                comps.append((total / sum(w for _, w in parts)).alias(name))
+            lf = lf.with_columns(comps)
+            known += names
+        return lf
+
+    def descriptives(self, lf, group_col: str, targets: list[str], confidence: float = 0.95):
+        return self._descriptives_rows(self._descriptives_query(lf, group_col, targets).collect(), targets, confidence)
+
+    def _descriptives_query(self, lf, group_col: str, targets: list[str]):
+        pl = self.pl
+        aggs = []
+        for var in targets:
+            c = pl.col(var).fill_nan(None)
+            aggs += [
+                c.count().alias(f"{var}|n"),
+                c.mean().alias(f"{var}|mean"),
+                c.median().alias(f"{var}|median"),
+                c.std(ddof=1).alias(f"{var}|std"),
+            ]
+        overall = lf.select(aggs).with_columns(pl.lit("overall").alias("group"))
+        per_group = (
+            lf.filter(pl.col(group_col).is_not_null())
+            .group_by(group_col)
+            .agg(aggs)
+            .sort(group_col)
+            .select(
+                pl.format(f"{group_col}={{}}", pl.col(group_col).cast(pl.Int64)).alias("group"),
+                pl.exclude(group_col, "group"),
+            )
+        )
+        return pl.concat([overall.select(per_group.collect_schema().names()), per_group])
+
+    def _descriptives_rows(self, wide, targets: list[str], confidence: float) -> pd.DataFrame:
+        rows = []
+        for rec in wide.iter_rows(named=True):
+            for var in targets:
+                n = rec[f"{var}|n"]
+                mean = rec[f"{var}|mean"] if n > 0 else np.nan
+                std = rec[f"{var}|std"] if n > 1 else np.nan
+                if n < 2:
+                    ci = (np.nan, np.nan)
+                else:
+                    half = stats.t.ppf((1 + confidence) / 2, df=n - 1) * std / np.sqrt(n)
+                    ci = (mean - half, mean + half)
+                rows.append(
+                    {
+                        "group": rec["group"],
+                        "variable": var,
+                        "n": int(n),
+                        "mean": float(mean) if mean is not None else np.nan,
+                        "median": float(rec[f"{var}|median"]) if n > 0 else np.nan,
+                        "std": float(std) if std is not None else np.nan,
+                        "ci_low": ci[0],
+                        "ci_high": ci[1],
+                    }
+                )
+        return pd.DataFrame(rows)
+
+    def demographics(self, lf) -> dict:
+        queries = self._demographics_queries(lf)
+        return self._demographics_result(dict(zip(queries, self.pl.collect_all(list(queries.values())))))
+
+    def _demographics_queries(self, lf) -> dict:
+        pl = self.pl
+        age = self._num("G02Q04")
+        queries = {
+            "age": lf.select(
+                age.mean().alias("mean"),
+                age.median().alias("median"),
+                age.std().alias("std"),
+                age.min().alias("min"),
+                age.max().alias("max"),
+                age.count().alias("count"),
+            ),
+            "per_age": lf.select(age.alias("age")).drop_nulls().group_by("age").len().sort("age"),
+        }
+        schema = lf.collect_schema().names()
+        for key, (cols, _) in DEMOGRAPHICS.items():
+            code, other = cols
+            if code not in schema:
+                continue
+            code_num = self._num(code)
+            other_txt = pl.col(other) if other in schema else pl.lit(None, dtype=pl.String)
+            queries[key] = (
+                lf.select(
+                    pl.when(code_num.is_not_null() & (code_num != 0)).then(code_num).alias("code"),
+                    other_txt.alias("other"),
+                )
+                .group_by("code", "other")
+                .len()
+            )
+        return queries
+
+    def _demographics_result(self, frames: dict) -> dict:
+        age_stats = frames["age"].row(0, named=True)
+        out = {
+            "age": {
+                "mean": float(age_stats["mean"]),
+                "median": float(age_stats["median"]),
+                "std": float(age_stats["std"]),
+                "min": int(age_stats["min"]),
+                "max": int(age_stats["max"]),
+                "count": int(age_stats["count"]),
+                "participants_per_age": {int(a): int(n) for a, n in frames["per_age"].iter_rows()},
+            }
+        }
+        for key, (_, mapping) in DEMOGRAPHICS.items():
+            if key not in frames:
+                continue
+            mapped = {}
+            for c, o, n in frames[key].iter_rows():
+                if c is not None:
+                    label = mapping.get(c, f"Unknown ({c})")
+                else:
+                    label = f"Unknown ({o or ''})"
+                mapped[label] = mapped.get(label, 0) + int(n)
+            out[key] = mapped
+        return out
+
+    def run(self, lf, group_col: str, targets: list[str]) -> dict:
+        """Scores, descriptives and demographics in one collect_all, so the cleaning plan runs once."""
+        grouped = self.group_data(lf)
+        demo = self._demographics_queries(lf)
+        frames = self.pl.collect_all([grouped, self._descriptives_query(grouped, group_col, targets)] + list(demo.values()))
+        return {
+            "grouped": self.collect(frames[0]),
+            "descriptives": self._descriptives_rows(frames[1], targets, 0.95),
+            "demographics": self._demographics_result(dict(zip(demo, frames[2:]))),
+        }
+
+    def collect(self, frame) -> pd.DataFrame:
+        if hasattr(frame, "collect"):
+            frame = frame.collect()
+        return frame.drop("__row", strict=False).to_pandas()
+
+
+BACKENDS = {"pandas": PandasBackend, "polars": PolarsBackend}
+
+
+def get_backend(name: str = "pandas"):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend: {name}")
+    return BACKENDS[name]()
+
+
+TARGETS = [
+    "usefulness_work",
+    "usefulness_learning",
+    "controlled_motivation",
+    "autonomous_motivation",
+]
+
+
+def run_backend(backend, young_csv: str, old_csv: str, **config) -> dict:
+    raw = backend.load(young_csv, old_csv)
+    return backend.run(backend.clean(raw, **config), "young_group", TARGETS)
+
+
+def compare_backends(young_csv: str, old_csv: str, backends=("pandas", "polars"), rtol: float = 1e-9, **config) -> dict:
+    """Runs every backend and raises AssertionError if the results differ from the first one."""
+    results = {name: run_backend(get_backend(name), young_csv, old_csv, **config) for name in backends}
+    ref = results[backends[0]]
+    for name in backends[1:]:
+        res = results[name]
+        pd.testing.assert_frame_equal(
+            ref["grouped"].reset_index(drop=True),
+            res["grouped"][ref["grouped"].columns].reset_index(drop=True),
+            check_dtype=False,
+            rtol=rtol,
+        )
+        pd.testing.assert_frame_equal(ref["descriptives"], res["descriptives"], check_dtype=False, rtol=rtol)
+        ref_demo, demo = ref["demographics"], res["demographics"]
+        for key in ref_demo:
+            if key == "age":
+                for stat, value in ref_demo["age"].items():
+                    if isinstance(value, float):
+                        assert np.isclose(value, demo["age"][stat], rtol=rtol), (name, stat)
+                    else:
+                        assert value == demo["age"][stat], (name, stat)
+            else:
+                assert ref_demo[key] == demo[key], (name, key)
+    return results
+
+
+def benchmark_backends(sizes=(10_000, 100_000, 1_000_000), backends=("pandas", "polars"), seed: int = 0) -> pd.DataFrame:
+    """Wall time of the full backend pipeline on synthetic waves of n respondents per group."""
+    from src.synthetic import synthetic_wave
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            young_csv = os.path.join(tmp, f"young_{n}.csv")
+            old_csv = os.path.join(tmp, f"old_{n}.csv")
+            synthetic_wave(n, young=True, seed=seed).to_csv(young_csv, index=False)
+            synthetic_wave(n, young=False, seed=seed + 1).to_csv(old_csv, index=False)
+            for name in backends:
+                backend = get_backend(name)
+                start = time.perf_counter()
+                run_backend(backend, young_csv, old_csv)
+                rows.append({"backend": name, "n_per_group": n, "seconds": time.perf_counter() - start})
+    return pd.DataFrame(rows)
@@ -0,0 +1,166 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+def batched_lstsq(X: np.ndarray, Y: np.ndarray) -> np.ndarray:
+    """
+    Least-squares coefficients for a stack of problems.
+
+    X has shape (b, n, k), Y (b, n, m); returns (b, k, m). Singular resamples
+    fall back to the pseudo-inverse.
+    """
+    XtX = np.einsum("bni,bnj->bij", X, X)
+    XtY = np.einsum("bni,bnm->bim", X, Y)
+    try:
+        return np.linalg.solve(XtX, XtY)
+    except np.linalg.LinAlgError:
+        return np.linalg.pinv(XtX) @ XtY
+
+
+def _boot_chunk(X: np.ndarray, Y: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    return batched_lstsq(X[idx], Y[idx])
+
+
+def resample_indices(n: int, n_boot: int, seed: int = 0) -> np.ndarray:
+    """Pairs-bootstrap row indices, shape (n_boot, n)."""
+    return np.random.default_rng(seed).integers(0, n, size=(n_boot, n))
+
+
+def bootstrap_betas(
+    X: np.ndarray,
+    Y: np.ndarray,
+    idx: np.ndarray,
+    chunk_size: int = 500,
+    n_jobs: int = None,
+) -> np.ndarray:
+    """
+    Coefficients of all resamples in idx, shape (n_boot, k, m).
+
+    The resamples are solved chunk_size at a time as one stacked batch,
+    chunks run on a process pool with n_jobs workers (n_jobs=1 runs inline).
+    """
+    chunks = [idx[i : i + chunk_size] for i in range(0, len(idx), chunk_size)]
+    n_jobs = os.cpu_count() if n_jobs is None else n_jobs
+    if n_jobs == 1 or len(chunks) == 1:
+        parts = [_boot_chunk(X, Y, c) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            parts = list(pool.map(_boot_chunk, [X] * len(chunks), [Y] * len(chunks), chunks))
+    return np.concatenate(parts)
+
+
+def hc3_se(X: np.ndarray, resid: np.ndarray) -> np.ndarray:
+    """HC3 robust standard errors, shape (k, m) for residuals of shape (n, m)."""
+    XtX_inv = np.linalg.inv(X.T @ X)
+    h = np.einsum("ij,jk,ik->i", X, XtX_inv, X)
+    w = resid**2 / (1 - h[:, None]) ** 2
+    # sandwich per outcome: XtX_inv X' diag(w) X XtX_inv
+    meat = np.einsum("ni,nm,nj->mij", X, w, X)
+    cov = XtX_inv @ meat @ XtX_inv
+    return np.sqrt(np.diagonal(cov, axis1=1, axis2=2)).T
+
+
+def jackknife_betas(X: np.ndarray, resid: np.ndarray, beta: np.ndarray) -> np.ndarray:
+    """Leave-one-out coefficients from the full fit, shape (n, k, m)."""
+    XtX_inv = np.linalg.inv(X.T @ X)
+    h = np.einsum("ij,jk,ik->i", X, XtX_inv, X)
+    # beta_(i) = beta - (X'X)^-1 x_i e_i / (1 - h_i)
+    infl = (X @ XtX_inv)[:, :, None] * (resid / (1 - h[:, None]))[:, None, :]
+    return beta[None] - infl
+
+
+def percentile_ci(boot: np.ndarray, confidence: float = 0.95) -> tuple[np.ndarray, np.ndarray]:
+    a = (1 - confidence) / 2
+    return np.quantile(boot, a, axis=0), np.quantile(boot, 1 - a, axis=0)
+
+
+def bca_ci(
+    boot: np.ndarray, estimate: np.ndarray, jack: np.ndarray, confidence: float = 0.95
+) -> tuple[np.ndarray, np.ndarray]:
+    """Bias-corrected and accelerated intervals, boot (b, ...), estimate (...), jack (n, ...)."""
+    prop = (boot < estimate).mean(axis=0) + 0.5 * (boot == estimate).mean(axis=0)
+    z0 = stats.norm.ppf(np.clip(prop, 1e-10, 1 - 1e-10))
+
+    d = jack.mean(axis=0) - jack
+    num = (d**3).sum(axis=0)
+    den = 6 * ((d**2).sum(axis=0)) ** 1.5
+    acc = np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+    bounds = []
+    for z_a in stats.norm.ppf([(1 - confidence) / 2, (1 + confidence) / 2]):
+        q = stats.norm.cdf(z0 + (z0 + z_a) / (1 - acc * (z0 + z_a)))
+        # quantile per coefficient, q differs between coefficients
+        flat_boot = boot.reshape(boot.shape[0], -1)
+        flat_q = q.reshape(-1)
+        bounds.append(
+            np.array([np.quantile(flat_boot[:, j], flat_q[j]) for j in range(flat_boot.shape[1])]).reshape(q.shape)
+        )
+    return bounds[0], bounds[1]
+
+
+def bootstrap_regression(
+    df_X: pd.DataFrame,
+    df_Y: pd.DataFrame,
+    n_boot: int = 5000,
+    confidence: float = 0.95,
+    chunk_size: int = 500,
+    n_jobs: int = None,
+    seed: int = 0,
+    weights: pd.Series = None,
+) -> pd.DataFrame:
+    """
+    Pairs bootstrap for OLS with intercept, one row per outcome and term.
+
+    All outcomes in df_Y share the same resample indices. Rows with missing
+    values in any predictor or outcome are dropped. Reports the OLS estimate,
+    classical and HC3 standard errors, the bootstrap SE and percentile and
+    BCa intervals. With weights (Series aligned to df_X) every row is scaled
+    by sqrt(w), which turns all of these into their WLS counterparts.
+    """
+    if isinstance(df_Y, pd.Series):
+        df_Y = df_Y.to_frame()
+    data = pd.concat([df_X, df_Y], axis=1).dropna()
+    terms = ["const"] + list(df_X.columns)
+    X = np.column_stack([np.ones(len(data)), data[df_X.columns].to_numpy(dtype=float)])
+    Y = data[df_Y.columns].to_numpy(dtype=float)
+    if weights is not None:
+        sqrt_w = np.sqrt(weights.reindex(data.index).to_numpy(dtype=float))
+        X = X * sqrt_w[:, None]
+        Y = Y * sqrt_w[:, None]
+    n, k = X.shape
+
+    beta = batched_lstsq(X[None], Y[None])[0]
+    resid = Y - X @ beta
+    sigma2 = (resid**2).sum(axis=0) / (n - k)
+    se_ols = np.sqrt(np.outer(np.diag(np.linalg.inv(X.T @ X)), sigma2))
+    se_hc3 = hc3_se(X, resid)
+
+    idx = resample_indices(n, n_boot, seed=seed)
+    boot = bootstrap_betas(X, Y, idx, chunk_size=chunk_size, n_jobs=n_jobs)
+    pct_low, pct_high = percentile_ci(boot, confidence)
+    bca_low, bca_high = bca_ci(boot, beta, jackknife_betas(X, resid, beta), confidence)
+
+    rows = []
+    for m, outcome in enumerate(df_Y.columns):
+        for j, term in enumerate(terms):
+            rows.append(
+                {
+                    "outcome": outcome,
+                    "term": term,
+                    "coef": beta[j, m],
+                    "se": se_ols[j, m],
+                    "se_hc3": se_hc3[j, m],
+                    "boot_se": boot[:, j, m].std(ddof=1),
+                    "pct_low": pct_low[j, m],
+                    "pct_high": pct_high[j, m],
+                    "bca_low": bca_low[j, m],
+                    "bca_high": bca_high[j, m],
+                    "n": n,
+                    "n_boot": n_boot,
+                }
+            )
+    return pd.DataFrame(rows)
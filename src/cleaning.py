@@ -0,0 +1,49 @@
+from math import inf
+
+import pandas as pd
+
+from src.screening import screen
+
+
+def check_age(df, low_bound, upper_bound):
+    return df[(df["G02Q04"] >= low_bound) & (df["G02Q04"] <= upper_bound)]
+
+
+def load_raw(young_csv: str, old_csv: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    return pd.read_csv(young_csv), pd.read_csv(old_csv)
+
+
+def clean_data(
+    df_young: pd.DataFrame,
+    df_old: pd.DataFrame,
+    young_age: tuple = (18, 35),
+    old_age: tuple = (35, inf),
+    column_answer_percentage: float = 0.8,
+    screen_responses: bool = True,
+    group_col: str = "young_group",
+    young_value: int = 1,
+    old_value: int = 0,
+    return_flags: bool = False,
+):
+    """
+    Cleaning step of main.py: age bounds per survey, unfinished responses,
+    response screening and columns with too few answers.
+    """
+    df_young = check_age(df_young, *young_age).assign(**{group_col: young_value})
+    df_old = check_age(df_old, *old_age).assign(**{group_col: old_value})
+    df = pd.concat([df_young, df_old], ignore_index=True)
+
+    min_count = int(column_answer_percentage * len(df))
+
+    # delete rows where user didnt finished
+    df = df[df["submitdate"].notna()]
+    # flag low quality responses before any scale is scored
+    flags = None
+    if screen_responses:
+        flags, df = screen(df)
+    # drop columns with to litte partisans
+    df = df.dropna(axis="columns", thresh=min_count)
+
+    if return_flags:
+        return df, flags
+    return df
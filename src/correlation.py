@@ -3,26 +3,25 @@
 # =========================
 # IFBL + LLM Survey Analysis
 # =========================
+# Alle Schritte sind Funktionen, beim Import wird nichts gelesen oder berechnet.
+# Direkt ausgeführt (python -m src.correlation) gibt das Modul die alte Auswertung aus.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
 
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import pearsonr
-import statsmodels.api as sm
+import pandas as pd
+from scipy import stats
+
+from src.item_correlation import pairwise_complete_corr
 
 # -------------------------
-# 1) Dateien laden
+# 1) Dateien
 # -------------------------
-DATA_FILE = "../data/results-survey374736.csv"  # eure Antworten (25 x 74)
-LABEL_FILE = "../data/results-full.csv"  # eure "Spaltennamen detaillierter" (optional)
-
-df = pd.read_csv(DATA_FILE)
-
-# Optional: Labels laden (nur falls du später was nachschauen willst)
-try:
-    df_labels = pd.read_csv(LABEL_FILE)
-except Exception:
-    df_labels = None
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+DATA_FILE = os.path.join(DATA_DIR, "results-survey374736.csv")  # eure Antworten (25 x 74)
+LABEL_FILE = os.path.join(DATA_DIR, "results-full.csv")  # eure "Spaltennamen detaillierter" (optional)
 
 
 # -------------------------
@@ -71,31 +70,27 @@ def cronbach_alpha(data: pd.DataFrame, cols: list, label: str) -> float:
     alpha = (k / (k - 1)) * (1 - item_vars.sum() / total_var)
     return float(alpha)
 
-from typing import List, Tuple
-
-def corr_pvalues(df_in, cols):
+def corr_pvalues(df_in: pd.DataFrame, cols: list) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     Gibt (corr_matrix, p_matrix) zurück für Pearson-Korrelation.
+
+    Paarweise vollständige Fälle wie bei pearsonr, aber alle Paare in einem
+    Matrixprodukt; p über die t-Verteilung mit n - 2 Freiheitsgraden.
     """
-    sub = df_in[cols].apply(pd.to_numeric, errors="coerce")
-
-    corr = sub.corr(method="pearson")
-
-    p = pd.DataFrame(np.ones_like(corr), columns=cols, index=cols, dtype=float)
-    for i in range(len(cols)):
-        for j in range(len(cols)):
-            if i == j:
-                p.iloc[i, j] = np.nan
-                continue
-            x = sub.iloc[:, i]
-            y = sub.iloc[:, j]
-            valid = x.notna() & y.notna()
-            if valid.sum() < 3:
-                p.iloc[i, j] = np.nan
-            else:
-                _, pv = pearsonr(x[valid], y[valid])
-                p.iloc[i, j] = pv
-    return corr, p
+    sub = df_in[cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    m = ~np.isnan(sub)
+    x = np.where(m, sub, 0.0)
+    r, n = pairwise_complete_corr(x, m.astype(float), x, m.astype(float))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = r * np.sqrt((n - 2) / (1 - r**2))
+    p = 2 * stats.t.sf(np.abs(t), n - 2)
+    p[n < 3] = np.nan
+    np.fill_diagonal(p, np.nan)
+    np.fill_diagonal(r, np.where(np.diag(n) >= 2, 1.0, np.nan))
+
+    corr = pd.DataFrame(r, index=cols, columns=cols)
+    return corr, pd.DataFrame(p, index=cols, columns=cols)
 
 
 # -------------------------
@@ -138,44 +133,19 @@ reskilling_items = [f"G05Q19[{i}]" for i in range(1, 7)]
 # (Wenn ihr lieber "useful for job performance" wollt: G03Q13, aber da ist ein Attention Check [7].)
 usefulness_items = [f"G03Q14[{i}]" for i in range(1, 11)]
 
+# Konstrukt -> (Items, Label für Fehlermeldungen)
+CONSTRUCTS = {
+    "autonomous_motivation": (autonomous_items, "Autonomous Motivation"),
+    "controlled_motivation": (controlled_items, "Controlled Motivation"),
+    "upskilling": (upskilling_items, "Upskilling"),
+    "reskilling": (reskilling_items, "Reskilling"),
+    "perceived_usefulness": (usefulness_items, "Perceived Usefulness (IFBL)"),
+}
+
 # Kontrollvariablen:
 age_col = "G02Q04"      # How old are you?
 freq_work_col = "G03Q12"  # LLM frequency in work-related context
 
-
-# -------------------------
-# 4) Konstrukte berechnen
-# -------------------------
-df["autonomous_motivation"] = row_mean(df, autonomous_items, "Autonomous Motivation")
-df["controlled_motivation"] = row_mean(df, controlled_items, "Controlled Motivation")
-df["upskilling"] = row_mean(df, upskilling_items, "Upskilling")
-df["reskilling"] = row_mean(df, reskilling_items, "Reskilling")
-df["perceived_usefulness"] = row_mean(df, usefulness_items, "Perceived Usefulness (IFBL)")
-
-# Alter und Frequenz numerisch machen
-require_columns(df, [age_col, freq_work_col], "Controls")
-df["age"] = pd.to_numeric(df[age_col], errors="coerce")
-df["llm_use_freq_work"] = pd.to_numeric(df[freq_work_col], errors="coerce")
-
-# Altersgruppen für RQ1 (18–35 vs 45+)
-df["age_group_rq1"] = np.where(
-    df["age"].between(18, 35, inclusive="both"), "younger_18_35",
-    np.where(df["age"] >= 45, "older_45plus", np.nan)
-)
-
-# -------------------------
-# 5) Mini-Check: Reliabilität (optional, aber sehr gut im Seminar)
-# -------------------------
-print("\n--- Cronbach Alpha (optional) ---")
-print("Autonomous:", cronbach_alpha(df, autonomous_items, "Autonomous"))
-print("Controlled:", cronbach_alpha(df, controlled_items, "Controlled"))
-print("Upskilling:", cronbach_alpha(df, upskilling_items, "Upskilling"))
-print("Reskilling:", cronbach_alpha(df, reskilling_items, "Reskilling"))
-print("Usefulness:", cronbach_alpha(df, usefulness_items, "Usefulness"))
-
-# -------------------------
-# 6) Korrelationsanalyse (RQ2-Kern)
-# -------------------------
 vars_for_corr = [
     "upskilling",
     "reskilling",
@@ -184,62 +154,186 @@ vars_for_corr = [
     "age",
     "llm_use_freq_work"
 ]
+reg_vars = ["upskilling", "reskilling", "age", "llm_use_freq_work"]
+reg_outcomes = ["autonomous_motivation", "controlled_motivation"]
+rq1_vars = ["autonomous_motivation", "controlled_motivation", "perceived_usefulness"]
 
-corr, pvals = corr_pvalues(df, vars_for_corr)
 
-print("\n--- Pearson Correlations (r) ---")
-print(corr.round(3))
+# -------------------------
+# 4) Konstrukte berechnen
+# -------------------------
+def build_constructs(df: pd.DataFrame, constructs: dict = CONSTRUCTS) -> pd.DataFrame:
+    """Kopie von df mit Konstrukt-Mittelwerten, age, llm_use_freq_work und age_group_rq1."""
+    df = df.copy()
+    for name, (items, label) in constructs.items():
+        df[name] = row_mean(df, items, label)
 
-print("\n--- p-values ---")
-print(pvals.round(4))
+    # Alter und Frequenz numerisch machen
+    require_columns(df, [age_col, freq_work_col], "Controls")
+    df["age"] = pd.to_numeric(df[age_col], errors="coerce")
+    df["llm_use_freq_work"] = pd.to_numeric(df[freq_work_col], errors="coerce")
 
-# Heatmap (ohne seaborn, nur matplotlib)
-plt.figure()
-plt.imshow(corr.values, aspect="auto")
-plt.xticks(range(len(vars_for_corr)), vars_for_corr, rotation=45, ha="right")
-plt.yticks(range(len(vars_for_corr)), vars_for_corr)
-plt.colorbar(label="Pearson r")
-plt.title("Correlation Matrix (Pearson r)")
-plt.tight_layout()
-plt.show()
+    # Altersgruppen für RQ1 (18–35 vs 45+), None statt np.nan (numpy 2 mischt keine str/float)
+    df["age_group_rq1"] = np.where(
+        df["age"].between(18, 35, inclusive="both"), "younger_18_35",
+        np.where(df["age"] >= 45, "older_45plus", None)
+    )
+    return df
 
 
 # -------------------------
-# 7) OPTIONAL: Regression (RQ2) - Kontrolle für Alter & Nutzungshäufigkeit
+# 5) Reliabilität, Korrelationen, Regressionen, RQ1
 # -------------------------
-# Beispiel: autonomous_motivation ~ upskilling + reskilling + age + llm_use_freq_work
-reg_vars = ["upskilling", "reskilling", "age", "llm_use_freq_work"]
+def reliability(df: pd.DataFrame, constructs: dict = CONSTRUCTS) -> pd.Series:
+    """Cronbachs Alpha je Konstrukt."""
+    return pd.Series(
+        {name: cronbach_alpha(df, items, label) for name, (items, label) in constructs.items()},
+        name="cronbach_alpha",
+    )
+
+def regressions(df: pd.DataFrame, outcomes: list = reg_outcomes, predictors: list = reg_vars, min_n: int = 8) -> dict:
+    """
+    OLS je Outcome mit Konstante, Kontrolle für Alter & Nutzungshäufigkeit.
+
+    Bei weniger als min_n vollständigen Fällen ist das Modell None
+    (grobe Mindestgröße, sonst wird's sehr instabil).
+    """
+    import statsmodels.api as sm
+
+    models = {}
+    for y in outcomes:
+        reg_df = df[[y] + predictors].dropna()
+        if len(reg_df) < min_n:
+            models[y] = None
+            continue
+        models[y] = sm.OLS(reg_df[y], sm.add_constant(reg_df[predictors])).fit()
+    return models
+
+def rq1_descriptives(df: pd.DataFrame, variables: list = rq1_vars) -> tuple[pd.DataFrame, pd.Series]:
+    """Mittelwerte und N je Altersgruppe (keine Korrelation, sondern Gruppendifferenz)."""
+    rq1_df = df[df["age_group_rq1"].isin(["younger_18_35", "older_45plus"])]
+    return rq1_df.groupby("age_group_rq1")[variables].mean(), rq1_df["age_group_rq1"].value_counts()
+
+def plot_correlation(corr: pd.DataFrame, out_png: str = None) -> None:
+    """Heatmap (ohne seaborn, nur matplotlib). Ohne out_png wird sie angezeigt."""
+    import matplotlib.pyplot as plt
+
+    cols = list(corr.columns)
+    fig = plt.figure()
+    plt.imshow(corr.values, aspect="auto")
+    plt.xticks(range(len(cols)), cols, rotation=45, ha="right")
+    plt.yticks(range(len(cols)), cols)
+    plt.colorbar(label="Pearson r")
+    plt.title("Correlation Matrix (Pearson r)")
+    plt.tight_layout()
+    if out_png is None:
+        plt.show()
+    else:
+        fig.savefig(out_png, dpi=200)
+        plt.close(fig)
+
+
+class CorrelationAnalysis:
+    """
+    Die ganze Auswertung für einen Datensatz, jeder Teil wird erst beim
+    ersten Zugriff berechnet und dann gemerkt.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.raw = df
 
-reg_df = df[["autonomous_motivation"] + reg_vars].dropna()
-if len(reg_df) >= 8:  # grobe Mindestgröße, sonst wird's sehr instabil
-    X = sm.add_constant(reg_df[reg_vars])
-    y = reg_df["autonomous_motivation"]
-    model = sm.OLS(y, X).fit()
-    print("\n--- Regression: Autonomous Motivation ---")
-    print(model.summary())
-else:
-    print("\n[Regression Autonomous] Zu wenige vollständige Fälle (nach dropna).")
-
-# Beispiel: controlled_motivation ~ upskilling + reskilling + age + llm_use_freq_work
-reg_df2 = df[["controlled_motivation"] + reg_vars].dropna()
-if len(reg_df2) >= 8:
-    X2 = sm.add_constant(reg_df2[reg_vars])
-    y2 = reg_df2["controlled_motivation"]
-    model2 = sm.OLS(y2, X2).fit()
-    print("\n--- Regression: Controlled Motivation ---")
-    print(model2.summary())
-else:
-    print("\n[Regression Controlled] Zu wenige vollständige Fälle (nach dropna).")
+    @cached_property
+    def data(self) -> pd.DataFrame:
+        return build_constructs(self.raw)
+
+    @cached_property
+    def alphas(self) -> pd.Series:
+        return reliability(self.data)
+
+    @cached_property
+    def correlations(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        return corr_pvalues(self.data, vars_for_corr)
+
+    @cached_property
+    def models(self) -> dict:
+        return regressions(self.data)
+
+    @cached_property
+    def rq1(self) -> tuple[pd.DataFrame, pd.Series]:
+        return rq1_descriptives(self.data)
+
+    def results(self) -> dict:
+        corr, pvals = self.correlations
+        means, counts = self.rq1
+        return {
+            "cronbach_alpha": self.alphas,
+            "corr": corr,
+            "p": pvals,
+            "models": self.models,
+            "rq1_means": means,
+            "rq1_n": counts,
+        }
 
 
 # -------------------------
-# 8) OPTIONAL: RQ1 Unterschied zwischen Altersgruppen (nur als Extra)
+# 6) Batch über mehrere Datensätze
 # -------------------------
-# Das ist KEINE Korrelation, sondern Gruppendifferenz. (Hilft aber fürs Seminar.)
-rq1_vars = ["autonomous_motivation", "controlled_motivation", "perceived_usefulness"]
+def _analyze_file(path: str) -> dict:
+    return CorrelationAnalysis(pd.read_csv(path)).results()
+
+def _analyze_frame(df: pd.DataFrame) -> dict:
+    return CorrelationAnalysis(df).results()
 
-rq1_df = df[df["age_group_rq1"].isin(["younger_18_35", "older_45plus"])].copy()
-print("\n--- RQ1 Deskriptiv nach Altersgruppe ---")
-print(rq1_df.groupby("age_group_rq1")[rq1_vars].mean().round(3))
-print("\nN pro Gruppe:")
-print(rq1_df["age_group_rq1"].value_counts())
+def analyze_many(datasets, n_jobs: int = None) -> dict:
+    """
+    Führt die Auswertung für viele Datensätze parallel in Prozessen aus.
+
+    datasets ist eine Liste von CSV-Pfaden oder ein dict name -> DataFrame/Pfad.
+    Pfade werden erst im Worker gelesen. Gibt name -> results() zurück.
+    """
+    if not isinstance(datasets, dict):
+        datasets = {path: path for path in datasets}
+    names = list(datasets)
+
+    def job(item):
+        return (_analyze_file, item) if isinstance(item, str) else (_analyze_frame, item)
+
+    n_jobs = os.cpu_count() if n_jobs is None else n_jobs
+    if n_jobs == 1:
+        results = [func(item) for func, item in map(job, datasets.values())]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [pool.submit(*job(item)) for item in datasets.values()]
+            results = [f.result() for f in futures]
+    return dict(zip(names, results))
+
+
+def main(data_file: str = DATA_FILE) -> None:
+    analysis = CorrelationAnalysis(pd.read_csv(data_file))
+
+    print("\n--- Cronbach Alpha (optional) ---")
+    print(analysis.alphas)
+
+    corr, pvals = analysis.correlations
+    print("\n--- Pearson Correlations (r) ---")
+    print(corr.round(3))
+    print("\n--- p-values ---")
+    print(pvals.round(4))
+    plot_correlation(corr)
+
+    for y, model in analysis.models.items():
+        if model is None:
+            print(f"\n[Regression {y}] Zu wenige vollständige Fälle (nach dropna).")
+        else:
+            print(f"\n--- Regression: {y} ---")
+            print(model.summary())
+
+    means, counts = analysis.rq1
+    print("\n--- RQ1 Deskriptiv nach Altersgruppe ---")
+    print(means.round(3))
+    print("\nN pro Gruppe:")
+    print(counts)
+
+
+if __name__ == "__main__":
+    main()
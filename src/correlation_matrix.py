@@ -1,26 +1,11 @@
 import pandas as pd
-from matplotlib import pyplot as plt
-import seaborn as sns
 from scipy.stats import pearsonr
 
+from src.heatmap import render_heatmap
 
-def _fig(df, file_name: str, title: str = None, vmin: float = 0, vmax: float = 1):
-    fig, ax = plt.subplots()
-
-    if title is not None:
-        ax.set_title(title)
-
-    df = df.astype(float)
 
-    sns.heatmap(
-        data=df, annot=True, cmap="crest", square=True, vmin=vmin, vmax=vmax, ax=ax
-    )
-    plt.xticks(rotation=45)
-    plt.yticks(rotation=0)
-    fig.tight_layout()
-
-    # plt.show()
-    plt.savefig(file_name)
+def _fig(df, file_name: str, title: str = None, vmin: float = 0, vmax: float = 1):
+    render_heatmap(df, file_name=file_name, title=title, vmin=vmin, vmax=vmax)
 
 
 def calc_correlation_motivation_skilling(
@@ -0,0 +1,209 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+OUTCOMES = ["autonomous_motivation", "controlled_motivation"]
+PREDICTORS = ["upskilling", "reskilling", "age", "usage"]
+MODELS = ("ols", "ridge", "lasso", "elasticnet")
+
+# fold data of the worker process, set once per worker by _init_worker
+_DATA = {}
+
+
+def _init_worker(X: np.ndarray, y: np.ndarray, grids: dict, l1_ratio: float) -> None:
+    _DATA.update(X=X, y=y, grids=grids, l1_ratio=l1_ratio)
+
+
+def kfold_indices(n: int, k: int = 5, n_repeats: int = 10, seed: int = 0) -> list[tuple[int, int, np.ndarray]]:
+    """(repeat, fold, test index) for n_repeats shuffled k-fold splits of n rows."""
+    rng = np.random.default_rng(seed)
+    splits = []
+    for rep in range(n_repeats):
+        for fold, test in enumerate(np.array_split(rng.permutation(n), k)):
+            splits.append((rep, fold, np.sort(test)))
+    return splits
+
+
+def _standardize(X: np.ndarray, y: np.ndarray):
+    """Centers y and scales X on the training rows, penalties are applied on that scale."""
+    x_mean, x_std = X.mean(axis=0), X.std(axis=0)
+    x_std[x_std == 0] = 1
+    y_mean = y.mean()
+    return (X - x_mean) / x_std, y - y_mean, x_mean, x_std, y_mean
+
+
+def alpha_grid(X: np.ndarray, y: np.ndarray, model: str, n_alphas: int = 30, l1_ratio: float = 0.5) -> np.ndarray:
+    """
+    Descending penalties for one model, from all coefficients zero (lasso /
+    elastic net) down to 1e-3 of that value. Ridge uses the lasso start
+    times 100 down to 1e-5, it never reaches exactly zero.
+    """
+    Xs, yc, *_ = _standardize(X, y)
+    alpha_max = np.abs(Xs.T @ yc).max() / len(y)
+    if model == "ridge":
+        return alpha_max * np.logspace(2, -5, n_alphas)
+    l1 = 1.0 if model == "lasso" else l1_ratio
+    return alpha_max / l1 * np.logspace(0, -3, n_alphas)
+
+
+def ridge_path(X: np.ndarray, y: np.ndarray, alphas: np.ndarray) -> np.ndarray:
+    """Ridge coefficients (p, n_alphas) of standardized X for all penalties from one SVD."""
+    U, s, Vt = np.linalg.svd(X, full_matrices=False)
+    uty = U.T @ y
+    d = s[:, None] / (s[:, None] ** 2 + len(y) * alphas[None, :])
+    return Vt.T @ (d * uty[:, None])
+
+
+def enet_path(
+    X: np.ndarray,
+    y: np.ndarray,
+    alphas: np.ndarray,
+    l1_ratio: float = 1.0,
+    tol: float = 1e-8,
+    max_iter: int = 10_000,
+) -> np.ndarray:
+    """
+    Elastic net coefficients (p, n_alphas) by coordinate descent on the Gram matrix.
+
+    Objective 1/(2n) ||y - Xb||^2 + alpha (l1_ratio |b|_1 + (1 - l1_ratio) / 2 |b|^2),
+    l1_ratio=1 is the lasso. Each penalty starts from the solution of the
+    previous (larger) one, so along a descending grid only a few sweeps are
+    needed per step.
+    """
+    n, p = X.shape
+    G = X.T @ X / n
+    c = X.T @ y / n
+    b = np.zeros(p)
+    path = np.empty((p, len(alphas)))
+    for a, alpha in enumerate(alphas):
+        l1, l2 = alpha * l1_ratio, alpha * (1 - l1_ratio)
+        for _ in range(max_iter):
+            delta = 0.0
+            for j in range(p):
+                rho = c[j] - G[j] @ b + G[j, j] * b[j]
+                new = np.sign(rho) * max(abs(rho) - l1, 0.0) / (G[j, j] + l2)
+                delta = max(delta, abs(new - b[j]))
+                b[j] = new
+            if delta < tol:
+                break
+        path[:, a] = b
+    return path
+
+
+def _scores(y: np.ndarray, y_hat: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """R² (against the test mean) and RMSE for every column of predictions."""
+    sse = ((y[:, None] - y_hat) ** 2).sum(axis=0)
+    sst = ((y - y.mean()) ** 2).sum()
+    return 1 - sse / sst, np.sqrt(sse / len(y))
+
+
+def _fit_fold(split: tuple[int, int, np.ndarray]) -> list[dict]:
+    """Fits every model and penalty on the training rows and scores the test rows."""
+    rep, fold, test = split
+    X, y, grids = _DATA["X"], _DATA["y"], _DATA["grids"]
+    train = np.ones(len(y), dtype=bool)
+    train[test] = False
+
+    Xs, yc, x_mean, x_std, y_mean = _standardize(X[train], y[train])
+    X_test = (X[test] - x_mean) / x_std
+    y_test = y[test]
+
+    rows = []
+    for model, alphas in grids.items():
+        if model == "ols":
+            B = np.linalg.lstsq(Xs, yc, rcond=None)[0][:, None]
+            alphas = np.array([0.0])
+        elif model == "ridge":
+            B = ridge_path(Xs, yc, alphas)
+        else:
+            l1 = 1.0 if model == "lasso" else _DATA["l1_ratio"]
+            B = enet_path(Xs, yc, alphas, l1_ratio=l1)
+        r2, rmse = _scores(y_test, y_mean + X_test @ B)
+        n_nonzero = (np.abs(B) > 1e-12).sum(axis=0)
+        for a, alpha in enumerate(alphas):
+            rows.append(
+                {
+                    "repeat": rep,
+                    "fold": fold,
+                    "model": model,
+                    "alpha": alpha,
+                    "r2": r2[a],
+                    "rmse": rmse[a],
+                    "n_nonzero": int(n_nonzero[a]),
+                }
+            )
+    return rows
+
+
+def cross_validate(
+    df: pd.DataFrame,
+    outcome: str,
+    predictors: list[str] = PREDICTORS,
+    models=MODELS,
+    k: int = 5,
+    n_repeats: int = 10,
+    n_alphas: int = 30,
+    l1_ratio: float = 0.5,
+    n_jobs: int = None,
+    seed: int = 0,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Repeated k-fold cross-validation of OLS and regularized linear models.
+
+    Rows with missing outcome or predictor are dropped. The penalty grids
+    are fixed on the full data, every fold fits the whole path and the folds
+    are run in a process pool (the data is sent once per worker). Returns
+    (folds, summary): out-of-sample R² and RMSE per fold, and per model and
+    penalty their mean and sd with the penalty of lowest mean RMSE marked as
+    best.
+    """
+    data = df[predictors + [outcome]].apply(pd.to_numeric, errors="coerce").dropna()
+    X = data[predictors].to_numpy(dtype=float)
+    y = data[outcome].to_numpy(dtype=float)
+    grids = {m: None if m == "ols" else alpha_grid(X, y, m, n_alphas, l1_ratio) for m in models}
+    splits = kfold_indices(len(y), k, n_repeats, seed)
+
+    n_jobs = os.cpu_count() if n_jobs is None else n_jobs
+    if n_jobs == 1:
+        _init_worker(X, y, grids, l1_ratio)
+        results = [_fit_fold(s) for s in splits]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_init_worker, initargs=(X, y, grids, l1_ratio)
+        ) as pool:
+            results = list(pool.map(_fit_fold, splits, chunksize=max(1, len(splits) // (4 * n_jobs))))
+
+    folds = pd.DataFrame([r for rows in results for r in rows])
+    folds.insert(0, "outcome", outcome)
+
+    summary = (
+        folds.groupby(["outcome", "model", "alpha"], sort=False)
+        .agg(
+            r2_mean=("r2", "mean"),
+            r2_sd=("r2", "std"),
+            rmse_mean=("rmse", "mean"),
+            rmse_sd=("rmse", "std"),
+            n_nonzero=("n_nonzero", "mean"),
+        )
+        .reset_index()
+    )
+    best = summary.groupby("model", sort=False)["rmse_mean"].idxmin()
+    summary["best"] = summary.index.isin(best)
+    summary["n"] = len(y)
+    return folds, summary
+
+
+def evaluate_models(
+    df_grouped: pd.DataFrame,
+    outcomes: list[str] = OUTCOMES,
+    predictors: list[str] = PREDICTORS,
+    **kwargs,
+) -> pd.DataFrame:
+    """Best penalty of every model for each outcome, keyword arguments go to cross_validate."""
+    best = []
+    for outcome in outcomes:
+        _, summary = cross_validate(df_grouped, outcome, predictors, **kwargs)
+        best.append(summary[summary["best"]])
+    return pd.concat(best, ignore_index=True).drop(columns="best")
@@ -4,9 +4,20 @@ import numpy as np
 import pandas as pd
 from scipy import stats
 
+from src.query import select_rows
+from src.weighting import resolve_weights, weighted_mean_se, weighted_quantile
 
-def mean_ci(series: pd.Series, confidence: float = 0.95) -> tuple[float, float]:
+
+def mean_ci(series: pd.Series, confidence: float = 0.95, weights: pd.Series = None) -> tuple[float, float]:
     
+    if weights is not None:
+        # Gewichteter Mittelwert, SE per Linearisierung
+        m, se, n = weighted_mean_se(pd.to_numeric(series, errors="coerce"), weights)
+        if n < 2:
+            return (np.nan, np.nan)
+        half = float(stats.t.ppf((1 + confidence) / 2, df=n - 1)) * se
+        return (m - half, m + half)
+
     x = pd.to_numeric(series, errors="coerce").dropna()
     n = len(x)
     if n < 2:
@@ -25,23 +36,47 @@ def descriptives_by_group(
     vars_usefulness: list[str],
     vars_motivation: list[str],
     confidence: float = 0.95,
+    weights=None,
+    rows=None,
 ) -> pd.DataFrame:
- 
+    """
+    n, mean, median, sd and CI of the mean, overall and per group.
+
+    weights (column name or Series aligned to df, e.g. from weighting.rake)
+    gives weighted means, medians, sd and linearization CIs; n stays the
+    number of answers. rows (query.Bitmap, index labels or boolean mask)
+    restricts everything to a subset of respondents.
+    """
+    df = select_rows(df, rows)
     targets = vars_usefulness + vars_motivation
     for c in targets:
         if c not in df.columns:
             raise KeyError(f"Spalte fehlt im DataFrame: {c}")
+    w_all = resolve_weights(df, weights)
 
     def summarize(sub: pd.DataFrame, group_label: str) -> pd.DataFrame:
         rows = []
+        w = None if w_all is None else w_all.loc[sub.index]
         for var in targets:
             s = pd.to_numeric(sub[var], errors="coerce")
+            if w is not None:
+                s = s.where(w > 0)
             n = int(s.notna().sum())
-            mean = float(s.mean()) if n > 0 else np.nan
-            median = float(s.median()) if n > 0 else np.nan
-            std = float(s.std(ddof=1)) if n > 1 else np.nan
+            if w is None:
+                mean = float(s.mean()) if n > 0 else np.nan
+                median = float(s.median()) if n > 0 else np.nan
+                std = float(s.std(ddof=1)) if n > 1 else np.nan
+            else:
+                mean, _, _ = weighted_mean_se(s, w)
+                median = weighted_quantile(s, w, 0.5)
+                ok = s.notna() & w.notna()
+                std = (
+                    float(np.sqrt(np.cov(s[ok], aweights=w[ok], ddof=1)))
+                    if n > 1
+                    else np.nan
+                )
 
-            ci_low, ci_high = mean_ci(s, confidence=confidence)
+            ci_low, ci_high = mean_ci(s, confidence=confidence, weights=w)
 
             rows.append(
                 {
@@ -0,0 +1,69 @@
+import numpy as np
+from scipy import stats
+from scipy.special import gammaln
+
+
+def hedges_correction(dof: np.ndarray) -> np.ndarray:
+    """Exact small-sample factor J = Γ(df/2) / (sqrt(df/2) Γ((df-1)/2))."""
+    dof = np.asarray(dof, dtype=float)
+    return np.exp(gammaln(dof / 2) - gammaln((dof - 1) / 2)) / np.sqrt(dof / 2)
+
+
+def nct_ncp_ci(t: np.ndarray, dof: np.ndarray, confidence: float = 0.95, n_iter: int = 80) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Confidence limits for the noncentrality parameter of observed t values.
+
+    Solves nct.cdf(t, df, ncp) = (1 ± confidence) / 2 for all entries at
+    once by bisection (the cdf falls monotonically in ncp), so the cost is
+    n_iter vectorized cdf calls however many scales there are.
+    """
+    t, dof = np.broadcast_arrays(np.asarray(t, dtype=float), np.asarray(dof, dtype=float))
+    width = 10 + 2 * np.abs(t)
+    limits = []
+    for target in ((1 + confidence) / 2, (1 - confidence) / 2):
+        lo, hi = t - width, t + width
+        for _ in range(n_iter):
+            mid = (lo + hi) / 2
+            cdf = stats.nct.cdf(t, dof, mid)
+            # the cdf can be nan far out in the tails, there ncp < t means cdf near 1
+            above = np.where(np.isnan(cdf), mid < t, cdf > target)
+            lo = np.where(above, mid, lo)
+            hi = np.where(above, hi, mid)
+        limits.append((lo + hi) / 2)
+    bad = ~np.isfinite(t) | ~np.isfinite(dof) | (dof <= 0)
+    return np.where(bad, np.nan, limits[0]), np.where(bad, np.nan, limits[1])
+
+
+def standardized_difference(
+    n0: np.ndarray,
+    n1: np.ndarray,
+    mean0: np.ndarray,
+    mean1: np.ndarray,
+    var0: np.ndarray,
+    var1: np.ndarray,
+    confidence: float = 0.95,
+) -> dict:
+    """
+    Cohen's d and Hedges' g of mean0 - mean1 with noncentral-t CIs, from group statistics.
+
+    All arguments are arrays over scales (n, mean and ddof=1 variance of
+    each group). d uses the pooled sd; its CI inverts the Student t of the
+    same difference, d * sqrt(n0 n1 / (n0 + n1)) ~ nct(n0 + n1 - 2). g and
+    its limits are d scaled by the exact small-sample correction.
+    """
+    n0, n1, mean0, mean1, var0, var1 = (np.asarray(a, dtype=float) for a in (n0, n1, mean0, mean1, var0, var1))
+    dof = n0 + n1 - 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sd_pooled = np.sqrt(((n0 - 1) * var0 + (n1 - 1) * var1) / dof)
+        d = (mean0 - mean1) / sd_pooled
+        scale = np.sqrt(n0 * n1 / (n0 + n1))
+    low, high = nct_ncp_ci(d * scale, dof, confidence)
+    J = hedges_correction(dof)
+    return {
+        "cohens_d": d,
+        "d_ci_lower": low / scale,
+        "d_ci_higher": high / scale,
+        "hedges_g": J * d,
+        "g_ci_lower": J * low / scale,
+        "g_ci_higher": J * high / scale,
+    }
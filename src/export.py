@@ -0,0 +1,196 @@
+import glob
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from src.group import SCALES, scale_spec
+
+EXPORT_DIR = "data/export"
+# identifies a respondent across runs (the row index is not stable: clean_data concatenates both surveys)
+RESPONDENT_KEY = ["young_group", "id"]
+DATE_COLUMNS = ["submitdate", "startdate", "datestamp"]
+META_KEY = b"kwkm"
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("The parquet export needs the package pyarrow, use fmt='csv' without it") from e
+    return pa, pq
+
+
+def source_hash(paths: list[str]) -> str:
+    """sha256 over the raw survey files the dataset was built from."""
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def typed(df: pd.DataFrame) -> pd.DataFrame:
+    """Date columns as datetime, remaining text columns as string (numeric ones stay as they are)."""
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        if col in DATE_COLUMNS:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+        else:
+            df[col] = df[col].astype("string")
+    return df
+
+
+def _csv_meta_path(path: str) -> str:
+    return path + ".schema.json"
+
+
+def _parts(path: str) -> list[str]:
+    return sorted(glob.glob(os.path.join(path, "part-*.parquet")))
+
+
+def read_metadata(path: str) -> dict:
+    """Embedded schema of the newest part (scales, cleaning parameters, source hash, ...) and all parts."""
+    if not os.path.isdir(path):
+        with open(_csv_meta_path(path)) as f:
+            return json.load(f)
+    _, pq = _pyarrow()
+    parts = [json.loads(pq.read_schema(p).metadata[META_KEY]) for p in _parts(path)]
+    if not parts:
+        raise FileNotFoundError(f"No dataset in {path}")
+    return parts[-1] | {"parts": [{k: m.get(k) for k in ("part", "n_rows", "source_hash", "created")} for m in parts]}
+
+
+def read_dataset(path: str, columns: list[str] = None) -> pd.DataFrame:
+    """All parts of an exported dataset (parquet directory or CSV file)."""
+    if not os.path.isdir(path):
+        meta = read_metadata(path)
+        df = pd.read_csv(path, usecols=columns)
+        dates = [c for c in meta["dates"] if c in df.columns]
+        return df.astype({c: "datetime64[ns]" for c in dates})
+    _, pq = _pyarrow()
+    return pq.read_table(path, columns=columns).to_pandas()
+
+
+def _check_compatible(old: dict, new: dict) -> None:
+    for field in ("kind", "key", "scales", "cleaning", "columns"):
+        # column types may differ per batch (e.g. int without missing values), the names may not
+        a, b = old.get(field), new.get(field)
+        if field == "columns":
+            a, b = list(a or []), list(b or [])
+        if a != b:
+            raise ValueError(f"Cannot append, {field} differs from the existing export; write it again with append=False")
+
+
+def write_dataset(
+    df: pd.DataFrame,
+    path: str,
+    kind: str,
+    metadata: dict = None,
+    key: list[str] = RESPONDENT_KEY,
+    fmt: str = "parquet",
+    compression: str = "zstd",
+    append: bool = False,
+) -> int:
+    """
+    Writes df with its schema (kind, key, SCALES, column types and metadata
+    such as cleaning parameters and source hash) embedded.
+
+    parquet (default): path is a directory of compressed part files, the
+    metadata sits in the schema of every part. csv: plain file at path with
+    the metadata in path + ".schema.json".
+
+    With append, only rows whose key is not exported yet are written, as a
+    new part (parquet) or appended lines (csv); a run that only adds
+    respondents therefore rewrites nothing. Changed existing rows are not
+    detected, write those again without append. Returns the number of rows
+    written. The row index is not stored, key identifies the rows.
+    """
+    if fmt not in ("parquet", "csv"):
+        raise ValueError(f"Unknown format {fmt}, use 'parquet' or 'csv'")
+    missing = [c for c in key if c not in df.columns]
+    if missing:
+        raise KeyError(f"Key columns {missing} not in the dataset")
+    df = typed(df).reset_index(drop=True)
+    meta = {
+        "kind": kind,
+        "key": list(key),
+        "scales": {k: scale_spec(v) for k, v in SCALES.items()},
+        "columns": {c: str(t) for c, t in df.dtypes.items()},
+        "dates": [c for c in df.columns if pd.api.types.is_datetime64_any_dtype(df[c])],
+    } | (metadata or {})
+    # as it reads back from JSON (tuples become lists, ...)
+    meta = json.loads(json.dumps(meta, default=str))
+
+    exists = os.path.isdir(path) and bool(_parts(path)) if fmt == "parquet" else os.path.exists(path)
+    part, parts = 0, []
+    if append and exists:
+        old = read_metadata(path)
+        _check_compatible(old, meta)
+        known = read_dataset(path, columns=list(key))[list(key)].astype(df[key].dtypes.to_dict())
+        known = pd.MultiIndex.from_frame(known)
+        df = df[~pd.MultiIndex.from_frame(df[key]).isin(known)]
+        parts = old.get("parts", [])
+        part = len(parts)
+        if df.empty:
+            return 0
+    meta |= {"part": part, "n_rows": len(df), "created": pd.Timestamp.now().isoformat(timespec="seconds")}
+
+    if fmt == "csv":
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        appending = append and exists
+        df.to_csv(path, mode="a" if appending else "w", header=not appending, index=False)
+        parts = parts + [{k: meta[k] for k in ("part", "n_rows", "source_hash", "created") if k in meta}]
+        with open(_csv_meta_path(path), "w") as f:
+            json.dump(meta | {"parts": parts}, f, indent=2, default=str)
+        return len(df)
+
+    pa, pq = _pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if part > 0:
+        # same physical types as the first part, e.g. all-missing columns of a small batch
+        table = table.cast(pq.read_schema(_parts(path)[0]).remove_metadata())
+    table = table.replace_schema_metadata({META_KEY: json.dumps(meta, default=str).encode()})
+    os.makedirs(path, exist_ok=True)
+    if part == 0:
+        for old_part in _parts(path):
+            os.remove(old_part)
+    pq.write_table(table, os.path.join(path, f"part-{part:05d}.parquet"), compression=compression)
+    return len(df)
+
+
+def export_analysis(
+    df_clean: pd.DataFrame,
+    df_grouped: pd.DataFrame,
+    out_dir: str = EXPORT_DIR,
+    cleaning: dict = None,
+    sources: list[str] = None,
+    screening: dict = None,
+    fmt: str = "parquet",
+    append: bool = False,
+) -> dict:
+    """
+    Exports the cleaned responses and the scale scores of group_data as
+    out_dir/clean and out_dir/grouped (.csv with fmt="csv"). df_grouped gets
+    the key columns of df_clean (same index). cleaning are the clean_data
+    parameters, sources the raw survey files (hashed), screening the
+    exclusion counts of screening.exclusion_counts. Returns rows written.
+    """
+    metadata = {"cleaning": cleaning or {}, "screening": screening}
+    if sources:
+        metadata |= {"sources": [os.path.basename(p) for p in sources], "source_hash": source_hash(sources)}
+    else:
+        metadata |= {"sources": [], "source_hash": None}
+    keyed = df_grouped.drop(columns=[c for c in RESPONDENT_KEY if c in df_grouped.columns])
+    grouped = df_clean[RESPONDENT_KEY].join(keyed, how="right")
+    suffix = ".csv" if fmt == "csv" else ""
+    return {
+        name: write_dataset(data, os.path.join(out_dir, name + suffix), name, metadata, fmt=fmt, append=append)
+        for name, data in (("clean", df_clean), ("grouped", grouped))
+    }
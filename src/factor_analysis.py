@@ -0,0 +1,250 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.group import SCALES, scale_spec
+
+
+def scale_items(scales: dict = SCALES) -> list[str]:
+    """Items of all multi-item scales, in SCALES order."""
+    blocks = [scale_spec(entry)["items"] for entry in scales.values()]
+    return list(dict.fromkeys(i for items in blocks if len(items) > 1 for i in items))
+
+
+def item_matrix(df: pd.DataFrame, columns: list[str] = None) -> pd.DataFrame:
+    """Numeric item block, rows with missing items are dropped (listwise)."""
+    columns = scale_items() if columns is None else columns
+    return df[columns].apply(pd.to_numeric, errors="coerce").dropna()
+
+
+def _standardize(X) -> np.ndarray:
+    X = np.asarray(X, dtype=float)
+    sd = X.std(axis=0, ddof=1)
+    sd[sd == 0] = 1
+    return (X - X.mean(axis=0)) / sd
+
+
+# -----------------------------
+# PCA
+# -----------------------------
+def randomized_svd(X, k: int, n_oversamples: int = 10, n_iter: int = 4, seed: int = 0):
+    """Truncated SVD after Halko et al. (range finder + power iterations)."""
+    rng = np.random.default_rng(seed)
+    X = np.asarray(X, dtype=float)
+    size = min(k + n_oversamples, min(X.shape))
+    Q = X @ rng.standard_normal((X.shape[1], size))
+    Q, _ = np.linalg.qr(Q)
+    for _ in range(n_iter):
+        Q, _ = np.linalg.qr(X.T @ Q)
+        Q, _ = np.linalg.qr(X @ Q)
+    U_b, s, Vt = np.linalg.svd(Q.T @ X, full_matrices=False)
+    return (Q @ U_b)[:, :k], s[:k], Vt[:k]
+
+
+def pca(df: pd.DataFrame, n_components: int = None, randomized: bool = None, seed: int = 0) -> dict:
+    """
+    PCA on the standardized item matrix.
+
+    randomized=None switches to the randomized SVD for more than 10000 rows.
+    Returns loadings (items x components), explained variance ratio and scores.
+    """
+    Z = _standardize(df)
+    n, p = Z.shape
+    n_components = p if n_components is None else n_components
+    if randomized is None:
+        randomized = n > 10_000 and n_components < p
+
+    if randomized:
+        U, s, Vt = randomized_svd(Z, n_components, seed=seed)
+    else:
+        U, s, Vt = np.linalg.svd(Z, full_matrices=False)
+        U, s, Vt = U[:, :n_components], s[:n_components], Vt[:n_components]
+
+    eigenvalues = s**2 / (n - 1)
+    names = [f"PC{i + 1}" for i in range(n_components)]
+    loadings = pd.DataFrame(Vt.T * np.sqrt(eigenvalues), index=df.columns, columns=names)
+    return {
+        "eigenvalues": pd.Series(eigenvalues, index=names),
+        "explained_variance_ratio": pd.Series(eigenvalues / p, index=names),
+        "loadings": loadings,
+        "scores": pd.DataFrame(U * s, index=df.index, columns=names),
+    }
+
+
+# -----------------------------
+# EFA
+# -----------------------------
+def varimax(loadings: np.ndarray, max_iter: int = 500, tol: float = 1e-8) -> np.ndarray:
+    L = np.asarray(loadings, dtype=float)
+    p, k = L.shape
+    R = np.eye(k)
+    d = 0
+    for _ in range(max_iter):
+        LR = L @ R
+        u, s, vt = np.linalg.svd(L.T @ (LR**3 - LR @ np.diag((LR**2).sum(axis=0)) / p))
+        R = u @ vt
+        d_new = s.sum()
+        if d_new < d * (1 + tol):
+            break
+        d = d_new
+    return L @ R
+
+
+def promax(loadings: np.ndarray, power: int = 4) -> tuple[np.ndarray, np.ndarray]:
+    """Oblique promax rotation, returns (pattern loadings, factor correlations)."""
+    L = varimax(loadings)
+    target = L * np.abs(L) ** (power - 1)
+    U = np.linalg.lstsq(L, target, rcond=None)[0]
+    U = U @ np.diag(np.sqrt(np.diag(np.linalg.inv(U.T @ U))))
+    pattern = L @ U
+    U_inv = np.linalg.inv(U)
+    phi = U_inv @ U_inv.T
+    return pattern, phi
+
+
+def efa(
+    df: pd.DataFrame,
+    n_factors: int,
+    rotation: str = "promax",
+    max_iter: int = 200,
+    tol: float = 1e-6,
+) -> dict:
+    """
+    Principal axis factoring on the item correlation matrix.
+
+    rotation is "promax" (oblique), "varimax" or None. Returns the loadings,
+    the factor correlation matrix phi and the communalities.
+    """
+    R = np.corrcoef(np.asarray(df, dtype=float), rowvar=False)
+    # start with squared multiple correlations as communalities
+    h2 = 1 - 1 / np.diag(np.linalg.pinv(R))
+    for _ in range(max_iter):
+        R_red = R.copy()
+        np.fill_diagonal(R_red, h2)
+        vals, vecs = np.linalg.eigh(R_red)
+        idx = np.argsort(vals)[::-1][:n_factors]
+        L = vecs[:, idx] * np.sqrt(np.clip(vals[idx], 0, None))
+        h2_new = (L**2).sum(axis=1)
+        if np.max(np.abs(h2_new - h2)) < tol:
+            h2 = h2_new
+            break
+        h2 = h2_new
+
+    phi = np.eye(n_factors)
+    if rotation == "promax" and n_factors > 1:
+        L, phi = promax(L)
+    elif rotation == "varimax" and n_factors > 1:
+        L = varimax(L)
+    elif rotation not in (None, "promax", "varimax"):
+        raise ValueError(f"Unknown rotation: {rotation}")
+
+    # sign convention: largest loading of every factor positive
+    signs = np.sign(L[np.abs(L).argmax(axis=0), range(n_factors)])
+    L = L * signs
+    phi = phi * np.outer(signs, signs)
+
+    names = [f"F{i + 1}" for i in range(n_factors)]
+    return {
+        "loadings": pd.DataFrame(L, index=df.columns, columns=names),
+        "phi": pd.DataFrame(phi, index=names, columns=names),
+        "communalities": pd.Series(h2, index=df.columns),
+    }
+
+
+# -----------------------------
+# Parallel analysis
+# -----------------------------
+def _random_eigenvalues(n: int, p: int, n_draws: int, seed) -> np.ndarray:
+    """Eigenvalues of n_draws random correlation matrices, computed as one stacked batch."""
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((n_draws, n, p))
+    X -= X.mean(axis=1, keepdims=True)
+    X /= np.sqrt((X**2).sum(axis=1, keepdims=True))
+    R = np.einsum("bni,bnj->bij", X, X)
+    return np.linalg.eigvalsh(R)[:, ::-1]
+
+
+def parallel_analysis(
+    df: pd.DataFrame,
+    n_draws: int = 1000,
+    quantile: float = 0.95,
+    n_jobs: int = None,
+    batch_size: int = 100,
+    seed: int = 0,
+) -> dict:
+    """
+    Horn's parallel analysis.
+
+    The random eigenvalues are drawn in batches of batch_size stacked matrices,
+    the batches run on a process pool with n_jobs workers. Returns the observed
+    and simulated eigenvalues and the suggested number of factors.
+    """
+    n, p = df.shape
+    observed = np.linalg.eigvalsh(np.corrcoef(np.asarray(df, dtype=float), rowvar=False))[::-1]
+
+    sizes = [batch_size] * (n_draws // batch_size)
+    if n_draws % batch_size:
+        sizes.append(n_draws % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    n_jobs = os.cpu_count() if n_jobs is None else n_jobs
+    if n_jobs == 1 or len(sizes) == 1:
+        parts = [_random_eigenvalues(n, p, s, sd) for s, sd in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            parts = list(pool.map(_random_eigenvalues, [n] * len(sizes), [p] * len(sizes), sizes, seeds))
+    simulated = np.concatenate(parts)
+
+    threshold = np.quantile(simulated, quantile, axis=0)
+    above = observed > threshold
+    n_factors = int(np.argmin(above)) if not above.all() else p
+
+    return {
+        "eigenvalues": pd.DataFrame(
+            {"observed": observed, "simulated_mean": simulated.mean(axis=0), "threshold": threshold},
+            index=range(1, p + 1),
+        ),
+        "n_factors": n_factors,
+    }
+
+
+# -----------------------------
+# Comparison with SCALES
+# -----------------------------
+def compare_with_scales(loadings: pd.DataFrame, scales: dict = SCALES) -> pd.DataFrame:
+    """
+    Per item: declared scale, factor with the highest absolute loading and
+    whether it matches the factor most items of the same scale load on.
+
+    shared_factor lists the other scales with the same dominant factor; such
+    scales are not separated by the factor solution, so their items count as
+    consistent only if the dominant factor is their scale's alone.
+    """
+    item_scale = {}
+    for k, entry in scales.items():
+        cols = scale_spec(entry)["items"]
+        if len(cols) > 1:
+            item_scale.update({i: k for i in cols})
+    rows = []
+    for item in loadings.index:
+        row = loadings.loc[item]
+        rows.append(
+            {
+                "item": item,
+                "scale": item_scale.get(item),
+                "factor": row.abs().idxmax(),
+                "loading": row[row.abs().idxmax()],
+                "cross_loading": row.abs().nlargest(2).iloc[-1] if len(row) > 1 else np.nan,
+            }
+        )
+    out = pd.DataFrame(rows)
+    dominant = out.groupby("scale")["factor"].agg(lambda s: s.value_counts().idxmax())
+    out["scale_factor"] = out["scale"].map(dominant)
+    owners = dominant.groupby(dominant).groups
+    out["shared_factor"] = [
+        [] if pd.isna(scale) else sorted(set(owners[dominant[scale]]) - {scale}) for scale in out["scale"]
+    ]
+    out["consistent"] = (out["factor"] == out["scale_factor"]) & (out["shared_factor"].str.len() == 0)
+    return out
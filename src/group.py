@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
 import pingouin as pg
+from scipy import sparse
 
 SCALES = {
     "usage": [
@@ -50,34 +52,166 @@ SCALES = {
 }
 
 
-def group_data(input_df, print_cronbach=False) -> pd.DataFrame:
-    all_items = [item for items in SCALES.values() for item in items]
-    unique_items = list(dict.fromkeys(all_items))
-    # cols = [c for c in unique_items if c in input_df.columns]
-    # input_df[all_items] = input_df[all_items].apply(pd.to_numeric, errors="coerce")
-    input_df.loc[:, all_items] = input_df.loc[:, all_items].apply(
-        pd.to_numeric, errors="coerce"
-    )
-
-    df = pd.DataFrame()
-    for key, column_list in SCALES.items():
-        if print_cronbach:
-            if len(column_list) > 1:
-                cronbach = pg.cronbach_alpha(data=input_df[column_list])
-                print(
-                    f"Cronbach's Alpha für group {key} = {round(cronbach[0], 3)}, mit der grenze {cronbach[1]}"
-                )
-        df[key] = input_df[column_list].mean(axis=1)
+# composites as weights over scales, may also use other composites
+COMPOSITES = {
+    "controlled_motivation": {
+        "external_regulation_material": 0.25,
+        "external_regulation_social": 0.25,
+        "introjected_regulation": 0.5,
+    },
+    "autonomous_motivation": {"intrinsic_regulation": 0.5, "identified_regulation": 0.5},
+}
+
+LIKERT_RANGE = (1, 7)
+
+
+def scale_spec(entry) -> dict:
+    """
+    A SCALES entry as dict. Entries are item lists or dicts with "items" and
+    optional "reverse" (items keyed low + high - x), "weights" ({item:
+    weight}, default 1), "min_valid" (answered items needed, int, default 1),
+    "min_share" (share of the items that must be answered, 0 to 1, default 0)
+    and "range" ((low, high), default LIKERT_RANGE).
+    """
+    if isinstance(entry, dict):
+        spec = dict(entry)
+    else:
+        spec = {"items": list(entry)}
+    spec.setdefault("reverse", [])
+    spec.setdefault("weights", {})
+    spec.setdefault("min_valid", 1)
+    spec.setdefault("min_share", 0.0)
+    spec.setdefault("range", LIKERT_RANGE)
+    if isinstance(spec["min_valid"], bool) or not isinstance(spec["min_valid"], (int, np.integer)):
+        raise ValueError(f"min_valid is a number of items, got {spec['min_valid']!r}; use min_share for a share")
+    if not 0 <= spec["min_share"] <= 1:
+        raise ValueError(f"min_share must be between 0 and 1, got {spec['min_share']!r}")
+    return spec
+
+
+def min_answered(spec: dict, n_items: int = None) -> int:
+    """Answered items a score needs: min_valid and min_share of the items, at most all n_items."""
+    n_items = len(spec["items"]) if n_items is None else n_items
+    return int(min(max(spec["min_valid"], np.ceil(spec["min_share"] * n_items)), n_items))
+
+
+def scale_items(entry) -> list:
+    """Items of a SCALES entry (item list or dict spec)."""
+    return scale_spec(entry)["items"]
+
+
+class ScoringPlan:
+    """
+    Compiled scoring of SCALES and COMPOSITES.
 
-    ext_mat = "external_regulation_material"
-    ext_soc = "external_regulation_social"
-    introj = "introjected_regulation"
-    intrin = "intrinsic_regulation"
-    ident = "identified_regulation"
+    The scale definitions become one sparse matrix A over [answers, answered
+    mask] of the item block. answers @ A gives per scale the weighted sum of
+    the keyed answers (reversed items contribute w * (low + high) for every
+    answer and -w * x), the sum of weights of the answered items and their
+    count, so all scales are scored with one masked matrix product:
+    score = weighted sum / answered weight where count >= min_valid.
 
-    df["controlled_motivation"] = (((df[ext_mat] + df[ext_soc]) / 2) + df[introj]) / 2
+    Composites are weighted means of scale (or earlier composite) scores,
+    NaN as soon as a part is missing, one small product per nesting level.
+    """
 
-    df["autonomous_motivation"] = (df[intrin] + df[ident]) / 2
+    def __init__(self, scales: dict = SCALES, composites: dict = COMPOSITES):
+        self.specs = {name: scale_spec(entry) for name, entry in scales.items()}
+        self.items = list(dict.fromkeys(i for spec in self.specs.values() for i in spec["items"]))
+        self.scales = list(self.specs)
+        pos = {item: j for j, item in enumerate(self.items)}
+        p, S = len(self.items), len(self.scales)
+
+        rows, cols, vals = [], [], []
+        self.min_valid = np.zeros(S)
+        for k, name in enumerate(self.scales):
+            spec = self.specs[name]
+            unknown = set(spec["reverse"]) - set(spec["items"])
+            if unknown:
+                raise ValueError(f"Reverse-keyed items {sorted(unknown)} are not items of {name}")
+            low, high = spec["range"]
+            for item in spec["items"]:
+                j, w = pos[item], float(spec["weights"].get(item, 1.0))
+                reverse = item in spec["reverse"]
+                # answer block: slope of the keyed answer; mask block: its offset, the weight and the count
+                rows += [j, p + j, p + j, p + j]
+                cols += [k, k, S + k, 2 * S + k]
+                vals += [-w if reverse else w, w * (low + high) if reverse else 0.0, w, 1.0]
+            self.min_valid[k] = min_answered(spec)
+        self.A = sparse.csr_matrix((vals, (rows, cols)), shape=(2 * p, 3 * S))
+        self._answers, self._mask = self.A[:p], self.A[p:]
+
+        self.composites = list(composites)
+        self.levels = self._levels(composites)
+
+    def _levels(self, composites: dict) -> list:
+        """Composites in nesting order: (names, weight matrix over all columns so far) per level."""
+        known = list(self.scales)
+        todo = dict(composites)
+        levels = []
+        while todo:
+            ready = [c for c, parts in todo.items() if all(part in known for part in parts)]
+            if not ready:
+                raise ValueError(f"Composites {sorted(todo)} refer to unknown scales or to each other in a cycle")
+            W = np.zeros((len(known), len(ready)))
+            for k, c in enumerate(ready):
+                for part, w in todo.pop(c).items():
+                    W[known.index(part), k] = w
+            levels.append((ready, W))
+            known += ready
+        return levels
+
+    def item_block(self, df: pd.DataFrame) -> np.ndarray:
+        block = df[self.items]
+        if not all(pd.api.types.is_numeric_dtype(t) for t in block.dtypes):
+            block = block.apply(pd.to_numeric, errors="coerce")
+        return block.to_numpy(dtype=float)
+
+    def keyed(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Item answers with reverse-keyed items turned, e.g. for Cronbach's alpha."""
+        out = pd.DataFrame(self.item_block(df), index=df.index, columns=self.items)
+        for spec in self.specs.values():
+            low, high = spec["range"]
+            for item in spec["reverse"]:
+                out[item] = low + high - out[item]
+        return out
+
+    def score(self, df: pd.DataFrame) -> pd.DataFrame:
+        X = self.item_block(df)
+        M = ~np.isnan(X)
+        S = len(self.scales)
+        out = np.where(M, X, 0.0) @ self._answers + M.astype(float) @ self._mask
+        total, weight, count = out[:, :S], out[:, S : 2 * S], out[:, 2 * S :]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scores = np.where(count >= self.min_valid, total / weight, np.nan)
+        for names, W in self.levels:
+            # nan in a used part makes the composite nan
+            valid = ~np.isnan(scores)
+            part = np.where(valid, scores, 0.0) @ W
+            missing = (~valid).astype(float) @ (W != 0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                comp = np.where(missing > 0, np.nan, part / W.sum(axis=0))
+            scores = np.hstack([scores, comp])
+        return pd.DataFrame(scores, index=df.index, columns=self.scales + self.composites)
+
+
+def group_data(input_df, print_cronbach=False, plan: ScoringPlan = None) -> pd.DataFrame:
+    """
+    Scale scores (mean of the answered items) and motivation composites of
+    the cleaned survey, see ScoringPlan. plan defaults to SCALES and COMPOSITES.
+    """
+    plan = ScoringPlan() if plan is None else plan
+    # items numeric in the input as well, later steps use them
+    items = input_df.loc[:, plan.items].apply(pd.to_numeric, errors="coerce")
+    input_df.loc[:, plan.items] = items
+
+    if print_cronbach:
+        keyed = plan.keyed(input_df)
+        for key, spec in plan.specs.items():
+            if len(spec["items"]) > 1:
+                cronbach = pg.cronbach_alpha(data=keyed[spec["items"]])
+                print(
+                    f"Cronbach's Alpha für group {key} = {round(cronbach[0], 3)}, mit der grenze {cronbach[1]}"
+                )
 
-    # print(df)
-    return df
+    return plan.score(items)
@@ -0,0 +1,159 @@
+import os
+
+import numpy as np
+import pandas as pd
+from matplotlib import pyplot as plt
+import seaborn as sns
+from scipy.cluster.hierarchy import leaves_list, linkage
+
+# above this many rows/columns the per-cell annotations are dropped
+ANNOT_THRESHOLD = 30
+# max pixels per axis for the rasterized image, larger matrices are block-averaged
+MAX_PIXELS = 1000
+
+
+def cluster_order(values: np.ndarray, axis: int = 0) -> np.ndarray:
+    """Returns the leaf order of an average-linkage clustering of rows (axis=0) or columns (axis=1)."""
+    x = np.asarray(values, dtype=float)
+    if axis == 1:
+        x = x.T
+    if x.shape[0] < 3:
+        return np.arange(x.shape[0])
+    x = np.nan_to_num(x, nan=0.0)
+    return leaves_list(linkage(x, method="average", metric="euclidean"))
+
+
+def downsample(values: np.ndarray, max_pixels: int = MAX_PIXELS) -> np.ndarray:
+    """Block-averages a matrix so that no axis is longer than max_pixels."""
+    x = np.asarray(values, dtype=float)
+    n_rows, n_cols = x.shape
+    f_r = int(np.ceil(n_rows / max_pixels))
+    f_c = int(np.ceil(n_cols / max_pixels))
+    if f_r == 1 and f_c == 1:
+        return x
+
+    pad_r = (-n_rows) % f_r
+    pad_c = (-n_cols) % f_c
+    x = np.pad(x, ((0, pad_r), (0, pad_c)), constant_values=np.nan)
+    blocks = x.reshape(x.shape[0] // f_r, f_r, x.shape[1] // f_c, f_c)
+
+    # nanmean without the "empty slice" warning for fully padded blocks
+    valid = ~np.isnan(blocks)
+    total = np.where(valid, blocks, 0.0).sum(axis=(1, 3))
+    count = valid.sum(axis=(1, 3))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def _save_arrays(file_name: str, df: pd.DataFrame, row_order, col_order) -> str:
+    path = os.path.splitext(file_name)[0] + ".npz"
+    np.savez_compressed(
+        path,
+        values=df.to_numpy(dtype=float),
+        rows=np.asarray(df.index, dtype=str),
+        columns=np.asarray(df.columns, dtype=str),
+        row_order=np.asarray(row_order),
+        col_order=np.asarray(col_order),
+    )
+    return path
+
+
+def _annotated(df, ax, vmin, vmax, cmap):
+    sns.heatmap(
+        data=df, annot=True, cmap=cmap, square=True, vmin=vmin, vmax=vmax, ax=ax
+    )
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.tick_params(axis="y", labelrotation=0)
+
+
+def _rasterized(df, ax, vmin, vmax, cmap, max_pixels):
+    values = downsample(df.to_numpy(dtype=float), max_pixels=max_pixels)
+    img = ax.imshow(
+        values,
+        cmap=cmap,
+        vmin=vmin,
+        vmax=vmax,
+        aspect="auto",
+        interpolation="nearest",
+        rasterized=True,
+    )
+    plt.colorbar(img, ax=ax)
+
+    # labels only as long as they stay readable
+    if df.shape[0] <= 2 * ANNOT_THRESHOLD and values.shape == df.shape:
+        ax.set_yticks(range(df.shape[0]), df.index, fontsize=6)
+    else:
+        ax.set_yticks([])
+    if df.shape[1] <= 2 * ANNOT_THRESHOLD and values.shape == df.shape:
+        ax.set_xticks(range(df.shape[1]), df.columns, rotation=90, fontsize=6)
+    else:
+        ax.set_xticks([])
+
+
+def render_heatmap(
+    df: pd.DataFrame,
+    file_name: str,
+    title: str = None,
+    vmin: float = None,
+    vmax: float = None,
+    cmap: str = "crest",
+    cluster: bool = None,
+    annot_threshold: int = ANNOT_THRESHOLD,
+    max_pixels: int = MAX_PIXELS,
+    tile_size: int = None,
+    save_arrays: bool = False,
+) -> pd.DataFrame:
+    """
+    Draws a heatmap of df and saves it to file_name.
+
+    Small matrices keep the annotated seaborn heatmap, above annot_threshold
+    rows or columns a rasterized image without per-cell text is drawn.
+    cluster=None clusters only in the rasterized mode. With tile_size every
+    tile_size x tile_size block is additionally saved as its own figure.
+    save_arrays also writes the drawn matrix with its labels and orders next
+    to the figure (.npz), for large rasterized matrices whose image has no
+    cell values. Returns the (reordered) matrix that was drawn.
+    """
+    df = df.astype(float)
+    large = max(df.shape) > annot_threshold
+    if cluster is None:
+        cluster = large
+
+    row_order = np.arange(df.shape[0])
+    col_order = np.arange(df.shape[1])
+    if cluster:
+        row_order = cluster_order(df.to_numpy(), axis=0)
+        # symmetric matrices keep the same order on both axes
+        if df.shape[0] == df.shape[1] and list(df.index) == list(df.columns):
+            col_order = row_order
+        else:
+            col_order = cluster_order(df.to_numpy(), axis=1)
+        df = df.iloc[row_order, col_order]
+
+    fig, ax = plt.subplots(figsize=(10, 8) if large else None)
+    if title is not None:
+        ax.set_title(title)
+    if large:
+        _rasterized(df, ax, vmin, vmax, cmap, max_pixels)
+    else:
+        _annotated(df, ax, vmin, vmax, cmap)
+    fig.tight_layout()
+    fig.savefig(file_name, dpi=200 if large else "figure")
+    plt.close(fig)
+
+    if tile_size is not None and large:
+        stem, ext = os.path.splitext(file_name)
+        for i in range(0, df.shape[0], tile_size):
+            for j in range(0, df.shape[1], tile_size):
+                tile = df.iloc[i : i + tile_size, j : j + tile_size]
+                fig, ax = plt.subplots(figsize=(10, 8))
+                ax.set_title(f"{title or ''} [{i}:{i + tile.shape[0]}, {j}:{j + tile.shape[1]}]")
+                _rasterized(tile, ax, vmin, vmax, cmap, max_pixels)
+                fig.tight_layout()
+                fig.savefig(f"{stem}_tile_{i}_{j}{ext}", dpi=200)
+                plt.close(fig)
+
+    if save_arrays:
+        _save_arrays(file_name, df, row_order, col_order)
+
+    return df
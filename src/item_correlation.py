@@ -0,0 +1,121 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import leaves_list, linkage
+from scipy.spatial.distance import squareform
+
+ITEM_PREFIXES = ["G03Q13", "G03Q14", "G04Q16", "G05Q18", "G05Q19"]
+
+
+def item_columns(df: pd.DataFrame, prefixes: list[str] = None) -> list[str]:
+    """All item columns (e.g. G04Q16[3]) that belong to one of the question prefixes."""
+    prefixes = ITEM_PREFIXES if prefixes is None else prefixes
+    return [c for c in df.columns if any(c.startswith(f"{p}[") for p in prefixes)]
+
+
+def pairwise_complete_corr(x_i, m_i, x_j, m_j):
+    """Pairwise-complete Pearson r and n between two column blocks."""
+    n = m_i.T @ m_j
+    s_x = x_i.T @ m_j
+    s_y = m_i.T @ x_j
+    s_xx = (x_i * x_i).T @ m_j
+    s_yy = m_i.T @ (x_j * x_j)
+    s_xy = x_i.T @ x_j
+
+    cov = n * s_xy - s_x * s_y
+    var_x = n * s_xx - s_x**2
+    var_y = n * s_yy - s_y**2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = cov / np.sqrt(var_x * var_y)
+    r[(n < 3) | (var_x <= 0) | (var_y <= 0)] = np.nan
+    return np.clip(r, -1, 1), n
+
+
+def cluster_order_from_corr(r: np.ndarray) -> np.ndarray:
+    """Average-linkage order with 1 - r as distance, missing correlations count as 0."""
+    if r.shape[0] < 3:
+        return np.arange(r.shape[0])
+    dist = 1 - np.nan_to_num(np.asarray(r, dtype=float), nan=0.0)
+    np.fill_diagonal(dist, 0)
+    dist = (dist + dist.T) / 2
+    return leaves_list(linkage(squareform(dist, checks=False), method="average"))
+
+
+def blockwise_correlation(
+    df: pd.DataFrame,
+    columns: list[str] = None,
+    block_size: int = 256,
+    out_dir: str = None,
+) -> dict:
+    """
+    Item x item Pearson matrix with pairwise-complete n, computed tile by tile.
+
+    Only block_size columns of both sides are held as dense float arrays at a
+    time. With out_dir the matrices are written as .npy files (and opened as
+    memmaps) so heatmaps and factor analysis can load them with
+    np.load(..., mmap_mode="r"), see load_item_correlation.
+    """
+    columns = item_columns(df) if columns is None else columns
+    p = len(columns)
+
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+        r = np.lib.format.open_memmap(
+            os.path.join(out_dir, "r.npy"), mode="w+", dtype=np.float64, shape=(p, p)
+        )
+        n = np.lib.format.open_memmap(
+            os.path.join(out_dir, "n.npy"), mode="w+", dtype=np.int64, shape=(p, p)
+        )
+    else:
+        r = np.empty((p, p), dtype=np.float64)
+        n = np.empty((p, p), dtype=np.int64)
+
+    def block(start):
+        sub = df[columns[start : start + block_size]].apply(pd.to_numeric, errors="coerce")
+        x = sub.to_numpy(dtype=float)
+        m = ~np.isnan(x)
+        return np.where(m, x, 0.0), m.astype(float)
+
+    for i in range(0, p, block_size):
+        x_i, m_i = block(i)
+        for j in range(i, p, block_size):
+            x_j, m_j = (x_i, m_i) if j == i else block(j)
+            r_ij, n_ij = pairwise_complete_corr(x_i, m_i, x_j, m_j)
+            r[i : i + block_size, j : j + block_size] = r_ij
+            n[i : i + block_size, j : j + block_size] = n_ij
+            if j != i:
+                r[j : j + block_size, i : i + block_size] = r_ij.T
+                n[j : j + block_size, i : i + block_size] = n_ij.T
+
+    order = cluster_order_from_corr(r)
+
+    if out_dir is not None:
+        r.flush()
+        n.flush()
+        np.save(os.path.join(out_dir, "order.npy"), order)
+        with open(os.path.join(out_dir, "columns.json"), "w") as f:
+            json.dump(columns, f)
+
+    return {"columns": columns, "r": r, "n": n, "order": order}
+
+
+def load_item_correlation(out_dir: str) -> dict:
+    """Opens a matrix written by blockwise_correlation as read-only memmaps."""
+    with open(os.path.join(out_dir, "columns.json")) as f:
+        columns = json.load(f)
+    return {
+        "columns": columns,
+        "r": np.load(os.path.join(out_dir, "r.npy"), mmap_mode="r"),
+        "n": np.load(os.path.join(out_dir, "n.npy"), mmap_mode="r"),
+        "order": np.load(os.path.join(out_dir, "order.npy")),
+    }
+
+
+def to_frame(result: dict, ordered: bool = False) -> pd.DataFrame:
+    """The r matrix as labelled DataFrame, optionally in cluster order."""
+    df = pd.DataFrame(result["r"], index=result["columns"], columns=result["columns"])
+    if ordered:
+        df = df.iloc[result["order"], result["order"]]
+    return df
@@ -0,0 +1,193 @@
+import base64
+import io
+import itertools
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class LimeSurveyError(RuntimeError):
+    pass
+
+
+def store_path(survey_id: int, data_dir: str = "data") -> str:
+    """Local file of a survey, same naming as the manual exports (results-survey<id>.csv)."""
+    return os.path.join(data_dir, f"results-survey{survey_id}.csv")
+
+
+class LimeSurveyClient:
+    """
+    Minimal client for the LimeSurvey RemoteControl 2 JSON-RPC API.
+
+    One requests.Session with a connection pool of pool_size is shared by all
+    calls, so concurrent pulls reuse their connections.
+    """
+
+    def __init__(self, url: str, username: str, password: str, pool_size: int = 8, timeout: float = 60):
+        self.url = url
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session_key = None
+        self._request_ids = itertools.count(1)
+
+    def call(self, method: str, *params):
+        resp = self.session.post(
+            self.url,
+            json={"method": method, "params": list(params), "id": next(self._request_ids)},
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        payload = resp.json()
+        if payload.get("error"):
+            raise LimeSurveyError(f"{method}: {payload['error']}")
+        return payload["result"]
+
+    def __enter__(self):
+        result = self.call("get_session_key", self.username, self.password)
+        if isinstance(result, dict):
+            raise LimeSurveyError(f"get_session_key: {result.get('status')}")
+        self.session_key = result
+        return self
+
+    def __exit__(self, *exc):
+        if self.session_key is not None:
+            try:
+                self.call("release_session_key", self.session_key)
+            finally:
+                self.session_key = None
+        self.session.close()
+
+    def export_responses(self, survey_id: int, from_id: int = None, to_id: int = None) -> pd.DataFrame:
+        """Responses with from_id <= id <= to_id, headings as question codes (G01Q01, G03Q13[1], ...)."""
+        result = self.call(
+            "export_responses",
+            self.session_key,
+            survey_id,
+            "csv",
+            None,  # language
+            "all",  # completion status, incomplete rows are filtered in main.py
+            "code",
+            "short",
+            from_id,
+            to_id,
+        )
+        # no new responses come back as {"status": "No Response found ..."}
+        if isinstance(result, dict):
+            status = str(result.get("status", ""))
+            if status.lower().startswith("no response"):
+                return pd.DataFrame()
+            raise LimeSurveyError(f"export_responses({survey_id}): {status}")
+
+        text = base64.b64decode(result).decode("utf-8-sig")
+        if not text.strip():
+            return pd.DataFrame()
+        return pd.read_csv(io.StringIO(text))
+
+
+def _stored_state(path: str) -> tuple[int, set]:
+    """(last response id, ids of responses without submitdate) of the local file."""
+    if not os.path.exists(path):
+        return 0, set()
+    stored = pd.read_csv(path, usecols=["id", "submitdate"])
+    if stored.empty:
+        return 0, set()
+    incomplete = stored.loc[stored["submitdate"].isna(), "id"]
+    return int(stored["id"].max()), set(incomplete.astype(int))
+
+
+def _pending_path(path: str) -> str:
+    return path + ".pending.json"
+
+
+def _load_pending(path: str) -> dict:
+    """{response id: first time seen unfinished} of the local file."""
+    if not os.path.exists(_pending_path(path)):
+        return {}
+    with open(_pending_path(path)) as f:
+        return {int(k): pd.Timestamp(v) for k, v in json.load(f).items()}
+
+
+def _save_pending(path: str, pending: dict) -> None:
+    with open(_pending_path(path), "w") as f:
+        json.dump({str(k): v.isoformat() for k, v in sorted(pending.items())}, f, indent=1)
+
+
+def fetch_new_responses(client: LimeSurveyClient, survey_id: int, path: str, max_pending_days: float = 14) -> int:
+    """
+    Pulls only responses the local file does not have yet and stores them.
+
+    New responses are requested from the last stored id on. Stored responses
+    without submitdate can still be finished, each is re-checked with its own
+    query (from_id = to_id) until it is max_pending_days old (first seen
+    unfinished, kept in path + ".pending.json"); abandoned ones are then no
+    longer asked for. New ids are appended to the file, it is only rewritten
+    if an unfinished response has been submitted in the meantime. Returns
+    the number of new or updated rows.
+    """
+    last_id, incomplete = _stored_state(path)
+    now = pd.Timestamp.now()
+    seen = _load_pending(path)
+    pending = {i: seen.get(i, now) for i in incomplete}
+    recheck = [i for i, t in sorted(pending.items()) if now - t <= pd.Timedelta(days=max_pending_days)]
+
+    new = client.export_responses(survey_id, from_id=last_id + 1)
+    updates = [client.export_responses(survey_id, from_id=i, to_id=i) for i in recheck]
+    updates = pd.concat([u for u in updates if not u.empty] or [pd.DataFrame()], ignore_index=True)
+
+    if not os.path.exists(path):
+        if new.empty:
+            return 0
+        new = new.sort_values("id")
+        new.to_csv(path, index=False)
+        _save_pending(path, {i: now for i in new.loc[new["submitdate"].isna(), "id"].astype(int)})
+        return len(new)
+
+    columns = pd.read_csv(path, nrows=0).columns
+    fresh = new.reindex(columns=columns).sort_values("id") if not new.empty else new
+    # unfinished responses that have been submitted since the last pull
+    finished = updates.reindex(columns=columns) if not updates.empty else updates
+    if not finished.empty:
+        finished = finished[finished["id"].isin(incomplete) & finished["submitdate"].notna()]
+
+    if len(finished):
+        stored = pd.read_csv(path)
+        stored = stored[~stored["id"].isin(finished["id"])]
+        pd.concat([stored, finished, fresh], ignore_index=True).sort_values("id").to_csv(
+            path, index=False
+        )
+    elif len(fresh):
+        fresh.to_csv(path, mode="a", header=False, index=False)
+
+    for i in finished["id"] if len(finished) else []:
+        pending.pop(int(i), None)
+    if len(fresh):
+        pending |= {i: now for i in fresh.loc[fresh["submitdate"].isna(), "id"].astype(int)}
+    _save_pending(path, pending)
+    return len(fresh) + len(finished)
+
+
+def fetch_surveys(
+    url: str,
+    username: str,
+    password: str,
+    survey_ids: list[int],
+    data_dir: str = "data",
+    max_workers: int = 4,
+) -> dict:
+    """Refreshes several surveys concurrently over one session, returns {survey_id: new rows}."""
+    with LimeSurveyClient(url, username, password, pool_size=max_workers) as client:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            counts = pool.map(
+                lambda sid: fetch_new_responses(client, sid, store_path(sid, data_dir)),
+                survey_ids,
+            )
+            return dict(zip(survey_ids, counts))
@@ -0,0 +1,70 @@
+"""
+Local stand-in for the LimeSurvey RemoteControl API, serves responses from DataFrames.
+
+    app = create_app({779776: pd.read_csv("data/results-survey779776.csv")})
+    app.run(port=8080)
+
+and point LimeSurveyClient at http://127.0.0.1:8080/index.php/admin/remotecontrol.
+"""
+
+import base64
+import uuid
+
+import pandas as pd
+from flask import Flask, jsonify, request
+
+RPC_PATH = "/index.php/admin/remotecontrol"
+
+
+def create_app(surveys: dict, username: str = "admin", password: str = "admin") -> Flask:
+    app = Flask(__name__)
+    sessions = set()
+    app.config["export_calls"] = []
+
+    def get_session_key(user, pwd, *_):
+        if (user, pwd) != (username, password):
+            return {"status": "Invalid user name or password"}
+        key = uuid.uuid4().hex
+        sessions.add(key)
+        return key
+
+    def release_session_key(key):
+        sessions.discard(key)
+        return "OK"
+
+    def export_responses(key, survey_id, doc_type="csv", lang=None, status="all",
+                         heading="code", response_type="short", from_id=None, to_id=None, *_):
+        if key not in sessions:
+            return {"status": "Invalid session key"}
+        if int(survey_id) not in surveys:
+            return {"status": "Error: Invalid survey ID"}
+        app.config["export_calls"].append((int(survey_id), from_id, to_id))
+
+        df = surveys[int(survey_id)]
+        if from_id is not None:
+            df = df[df["id"] >= int(from_id)]
+        if to_id is not None:
+            df = df[df["id"] <= int(to_id)]
+        if status == "complete":
+            df = df[df["submitdate"].notna()]
+        elif status == "incomplete":
+            df = df[df["submitdate"].isna()]
+        if df.empty:
+            return {"status": "No Response found for Token"}
+        return base64.b64encode(df.to_csv(index=False).encode("utf-8")).decode("ascii")
+
+    methods = {
+        "get_session_key": get_session_key,
+        "release_session_key": release_session_key,
+        "export_responses": export_responses,
+    }
+
+    @app.post(RPC_PATH)
+    def rpc():
+        payload = request.get_json()
+        method = methods.get(payload.get("method"))
+        if method is None:
+            return jsonify({"id": payload.get("id"), "result": None, "error": "unknown method"})
+        return jsonify({"id": payload.get("id"), "result": method(*payload.get("params", [])), "error": None})
+
+    return app
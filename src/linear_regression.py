@@ -1,10 +1,54 @@
 import statsmodels.api as sm
 import pandas as pd
 
+from src.bootstrap import bootstrap_regression
+from src.query import select_rows
+from src.weighting import resolve_weights
 
-def linear_regression(df_X: pd.DataFrame, df_Y: pd.DataFrame, print_summary=False):
+
+def linear_regression(
+    df_X: pd.DataFrame,
+    df_Y: pd.DataFrame,
+    print_summary=False,
+    n_boot: int = None,
+    n_jobs: int = None,
+    weights=None,
+    rows=None,
+    data: pd.DataFrame = None,
+):
+    """
+    OLS of df_Y on df_X. weights is a Series aligned to df_Y or a column
+    name, looked up in data (e.g. the full df_grouped) or else in df_X /
+    df_Y; the weight column itself is never used as predictor or outcome.
+
+    Always returns the fitted model. With n_boot the pairs-bootstrap table of
+    bootstrap.bootstrap_regression is attached as model.bootstrap (None
+    without).
+    """
+    if rows is not None:
+        df_X, df_Y = select_rows(df_X, rows), select_rows(df_Y, rows)
+    if isinstance(weights, str):
+        source = data if data is not None else pd.concat([df_X, df_Y], axis=1)
+        if weights not in source.columns:
+            raise KeyError(f"Weight column {weights} not found, pass the full data with data=")
+        w = resolve_weights(source.loc[:, [weights]].reindex(df_Y.index), weights)
+        df_X = df_X.drop(columns=weights, errors="ignore")
+        if isinstance(df_Y, pd.DataFrame):
+            df_Y = df_Y.drop(columns=weights, errors="ignore")
+    else:
+        w = resolve_weights(df_Y if isinstance(df_Y, pd.DataFrame) else df_Y.to_frame(), weights)
     X = sm.add_constant(df_X)
-    model = sm.OLS(df_Y, X).fit()
+    if w is None:
+        model = sm.OLS(df_Y, X).fit()
+    else:
+        # Survey-Gewichte: WLS-Schätzer mit robusten (HC1) Standardfehlern
+        model = sm.WLS(df_Y, X, weights=w).fit(cov_type="HC1")
     summary = model.summary()
     if print_summary:
         print(summary)
+    model.bootstrap = None
+    if n_boot:
+        model.bootstrap = bootstrap_regression(df_X, df_Y, n_boot=n_boot, n_jobs=n_jobs, weights=w)
+        if print_summary:
+            print(model.bootstrap.to_string())
+    return model
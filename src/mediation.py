@@ -0,0 +1,213 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from src.bootstrap import batched_lstsq, bca_ci, jackknife_betas, percentile_ci, resample_indices
+
+PREDICTORS = ["usage", "usefulness_work", "usefulness_learning"]
+MEDIATORS = ["autonomous_motivation", "controlled_motivation"]
+OUTCOMES = ["upskilling", "reskilling"]
+
+
+def _equations(predictors, mediators, outcomes, covariates, moderator, serial, moderate) -> list[tuple[list, list]]:
+    """
+    (dependent variables, terms) of every regression. Equations with the
+    same terms share one design and are solved together (parallel mediators,
+    all outcomes).
+    """
+    mod = [] if moderator is None else [moderator]
+    a_int = [f"{x}:{moderator}" for x in predictors] if moderator and "a" in moderate else []
+    b_int = [f"{v}:{moderator}" for v in predictors + mediators] if moderator and "b" in moderate else []
+    groups = {}
+    for j, m in enumerate(mediators):
+        terms = ["const"] + predictors + (mediators[:j] if serial else []) + mod + a_int + covariates
+        groups.setdefault(tuple(terms), []).append(m)
+    terms = ["const"] + predictors + mediators + mod + b_int + covariates
+    groups[tuple(terms)] = list(outcomes)
+    return [(deps, list(terms)) for terms, deps in groups.items()]
+
+
+def _columns(data: pd.DataFrame, terms: set, moderator: str) -> dict:
+    cols = {"const": np.ones(len(data))}
+    for t in terms:
+        if t == "const":
+            continue
+        if moderator and t.endswith(f":{moderator}"):
+            cols[t] = data[t[: -len(moderator) - 1]].to_numpy(dtype=float) * data[moderator].to_numpy(dtype=float)
+        else:
+            cols[t] = data[t].to_numpy(dtype=float)
+    return cols
+
+
+def _boot_chunk(designs: list, idx: np.ndarray) -> list:
+    return [batched_lstsq(D[idx], Y[idx]) for D, Y in designs]
+
+
+def _coefficients(equations: list, betas: list) -> dict:
+    """{(dependent, term): coefficient array} with the leading axes of betas (..., k, m)."""
+    out = {}
+    for (deps, terms), beta in zip(equations, betas):
+        for j, t in enumerate(terms):
+            for m, d in enumerate(deps):
+                out[(d, t)] = beta[..., j, m]
+    return out
+
+
+def _chains(mediators: list, serial: bool) -> list[tuple]:
+    """Mediator sequences of all indirect paths (serial: every ordered subset)."""
+    if not serial:
+        return [(m,) for m in mediators]
+    return [c for r in range(1, len(mediators) + 1) for c in combinations(mediators, r)]
+
+
+def _effects(coef: dict, predictors, mediators, outcomes, moderator, values, serial) -> tuple[list[dict], list]:
+    """Indirect, direct and total effects at every moderator value; labels and arrays separately."""
+
+    def slope(dep, src, w):
+        b = coef[(dep, src)]
+        if w is not None and (dep, f"{src}:{moderator}") in coef:
+            b = b + coef[(dep, f"{src}:{moderator}")] * w
+        return b
+
+    labels, arrays = [], []
+    for x in predictors:
+        for y in outcomes:
+            per_value = []
+            for w in values:
+                total = slope(y, x, w)
+                row = {"predictor": x, "outcome": y, "moderator_value": w}
+                rows = [(row | {"kind": "direct", "path": f"{x} -> {y}"}, total)]
+                for chain in _chains(mediators, serial):
+                    nodes = (x,) + chain + (y,)
+                    eff = np.prod([slope(nodes[i + 1], nodes[i], w) for i in range(len(nodes) - 1)], axis=0)
+                    total = total + eff
+                    rows.append((row | {"kind": "indirect", "path": " -> ".join(nodes)}, eff))
+                rows.append((row | {"kind": "total", "path": f"{x} -> {y}"}, total))
+                per_value.append(rows)
+                for label, arr in rows:
+                    labels.append(label)
+                    arrays.append(arr)
+            if len(values) > 1:
+                # index of moderated mediation: highest minus lowest moderator value
+                for (label, low), (_, high) in zip(per_value[0], per_value[-1]):
+                    labels.append(label | {"moderator_value": np.nan, "kind": label["kind"] + "_difference"})
+                    arrays.append(high - low)
+    return labels, arrays
+
+
+def mediation(
+    df: pd.DataFrame,
+    predictors: list[str] = PREDICTORS,
+    mediators: list[str] = MEDIATORS,
+    outcomes: list[str] = OUTCOMES,
+    covariates: list[str] = None,
+    moderator: str = None,
+    moderate: tuple = ("a", "b"),
+    moderator_values: list[float] = None,
+    serial: bool = False,
+    n_boot: int = 5000,
+    confidence: float = 0.95,
+    chunk_size: int = 500,
+    n_jobs: int = None,
+    seed: int = 0,
+) -> dict:
+    """
+    Path model predictors -> mediators -> outcomes with bootstrap indirect effects.
+
+    Every mediator is regressed on all predictors and covariates (serial:
+    also on the mediators before it), every outcome on predictors, mediators
+    and covariates; the effect of each predictor is conditional on the
+    others. Parallel mediators give one indirect path per mediator, serial
+    ones every ordered chain (x -> m1 -> y, x -> m2 -> y, x -> m1 -> m2 -> y, ...).
+
+    moderator (e.g. "young_group") enters every equation; moderate chooses
+    the moderated stages: "a" adds predictor x moderator to the mediator
+    equations, "b" adds predictor and mediator x moderator to the outcome
+    equations. Effects are then reported at moderator_values (default as in
+    moderation_sweep), plus the difference between the highest and lowest
+    value (for the indirect paths the index of moderated mediation).
+
+    All equations are fitted on the same pairs-bootstrap resamples, chunk_size
+    resamples at a time as stacked batched least squares; chunks run on a
+    process pool with n_jobs workers (n_jobs=1 runs inline). Intervals are
+    percentile and BCa (jackknife from the closed-form leave-one-out fits).
+
+    Returns {"effects", "coefficients"} as DataFrames.
+    """
+    covariates = [] if covariates is None else list(covariates)
+    predictors, mediators, outcomes = list(predictors), list(mediators), list(outcomes)
+    equations = _equations(predictors, mediators, outcomes, covariates, moderator, serial, moderate)
+    needed = list(dict.fromkeys(predictors + mediators + outcomes + covariates + ([moderator] if moderator else [])))
+    data = df[needed].apply(pd.to_numeric, errors="coerce").dropna()
+    n = len(data)
+
+    values = [None]
+    if moderator is not None:
+        w = data[moderator].to_numpy(dtype=float)
+        levels = np.unique(w)
+        if moderator_values is not None:
+            values = list(moderator_values)
+        elif len(levels) <= 2:
+            values = list(levels)
+        else:
+            values = [w.mean() - w.std(ddof=1), w.mean(), w.mean() + w.std(ddof=1)]
+
+    cols = _columns(data, {t for _, terms in equations for t in terms}, moderator)
+    designs = [
+        (np.column_stack([cols[t] for t in terms]), data[deps].to_numpy(dtype=float)) for deps, terms in equations
+    ]
+
+    betas = [batched_lstsq(D[None], Y[None])[0] for D, Y in designs]
+    jack = [jackknife_betas(D, Y - D @ b, b) for (D, Y), b in zip(designs, betas)]
+
+    idx = resample_indices(n, n_boot, seed=seed)
+    chunks = [idx[i : i + chunk_size] for i in range(0, len(idx), chunk_size)]
+    n_jobs = os.cpu_count() if n_jobs is None else n_jobs
+    if n_jobs == 1 or len(chunks) == 1:
+        parts = [_boot_chunk(designs, c) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            parts = list(pool.map(_boot_chunk, [designs] * len(chunks), chunks))
+    boot = [np.concatenate([p[e] for p in parts]) for e in range(len(equations))]
+
+    args = (predictors, mediators, outcomes, moderator, values, serial)
+    labels, est = _effects(_coefficients(equations, betas), *args)
+    est = np.array(est, dtype=float)
+    boot_eff = np.stack(_effects(_coefficients(equations, boot), *args)[1], axis=-1)
+    jack_eff = np.stack(_effects(_coefficients(equations, jack), *args)[1], axis=-1)
+    pct_low, pct_high = percentile_ci(boot_eff, confidence)
+    bca_low, bca_high = bca_ci(boot_eff, est, jack_eff, confidence)
+    effects = pd.DataFrame(labels)
+    effects = effects.assign(
+        effect=est,
+        boot_se=boot_eff.std(axis=0, ddof=1),
+        pct_low=pct_low,
+        pct_high=pct_high,
+        bca_low=bca_low,
+        bca_high=bca_high,
+        n=n,
+        n_boot=n_boot,
+    )
+    if moderator is None:
+        effects = effects.drop(columns="moderator_value")
+
+    rows = []
+    for (deps, terms), beta, b in zip(equations, betas, boot):
+        low, high = percentile_ci(b, confidence)
+        se = b.std(axis=0, ddof=1)
+        for m, dep in enumerate(deps):
+            for j, term in enumerate(terms):
+                rows.append(
+                    {
+                        "dependent": dep,
+                        "term": term,
+                        "coef": beta[j, m],
+                        "boot_se": se[j, m],
+                        "pct_low": low[j, m],
+                        "pct_high": high[j, m],
+                    }
+                )
+    return {"effects": effects, "coefficients": pd.DataFrame(rows)}
@@ -0,0 +1,214 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy import linalg, stats
+
+
+def _moderator_columns(w: np.ndarray, moderator: str, categorical: bool) -> dict:
+    """The moderator itself, or one dummy per level except the lowest (reference) for a categorical one."""
+    if not categorical:
+        return {moderator: w}
+    return {f"{moderator}[{level:g}]": (w == level).astype(float) for level in np.unique(w)[1:]}
+
+
+def _design(data: pd.DataFrame, predictors, moderator, covariates, categorical) -> tuple[np.ndarray, dict]:
+    """One matrix with every column any model needs, plus the position of each column."""
+    mod = _moderator_columns(data[moderator].to_numpy(dtype=float), moderator, categorical)
+    cols = {"const": np.ones(len(data))} | mod
+    for c in covariates:
+        cols[c] = data[c].to_numpy(dtype=float)
+    for p in predictors:
+        cols[p] = data[p].to_numpy(dtype=float)
+        for m in mod:
+            cols[f"{p}:{m}"] = cols[p] * cols[m]
+    return np.column_stack(list(cols.values())), {name: i for i, name in enumerate(cols)}
+
+
+def _johnson_neyman(b1, b3, v11, v13, v33, t_crit, w_min, w_max) -> dict:
+    """
+    Moderator values where the simple slope b1 + b3*w is significant.
+
+    Solves (b1 + b3 w)^2 = t^2 var(w) for w. Returns the roots and whether the
+    significant region lies between ("inside") or beyond ("outside") them.
+    """
+    a = b3**2 - t_crit**2 * v33
+    b = 2 * (b1 * b3 - t_crit**2 * v13)
+    c = b1**2 - t_crit**2 * v11
+    disc = b**2 - 4 * a * c
+    out = {"jn_lower": np.nan, "jn_upper": np.nan, "jn_significant": None, "jn_in_observed_range": False}
+    if a == 0 or disc < 0:
+        # no crossing: slope is significant everywhere or nowhere
+        out["jn_significant"] = "everywhere" if c > 0 else "nowhere"
+        return out
+    roots = np.sort([(-b - np.sqrt(disc)) / (2 * a), (-b + np.sqrt(disc)) / (2 * a)])
+    out["jn_lower"], out["jn_upper"] = roots
+    out["jn_significant"] = "outside" if a > 0 else "inside"
+    out["jn_in_observed_range"] = bool(((roots >= w_min) & (roots <= w_max)).any())
+    return out
+
+
+def moderation_sweep(
+    df: pd.DataFrame,
+    outcomes: list[str],
+    predictors: list[str],
+    moderator: str = "young_group",
+    covariates: list[str] = None,
+    moderator_values: list[float] = None,
+    confidence: float = 0.95,
+    categorical: bool = False,
+    min_level_n: int = 5,
+) -> dict:
+    """
+    Fits y ~ x + moderator + x:moderator + covariates for every outcome and predictor.
+
+    The design matrix and its Gram matrix are built once on the common
+    complete cases; each model only selects its sub-block, and the Cholesky
+    factor of a sub-block is shared by all outcomes of that predictor.
+    Simple slopes are reported at moderator_values (default: the two values
+    of a binary moderator, otherwise mean -1 SD, mean, mean +1 SD).
+
+    A coded moderator with more than two levels (e.g. gender G02Q05) needs
+    categorical=True: it is then dummy-coded against its lowest level, the
+    models report every dummy and its interaction, simple slopes are given
+    per level (moderator_values selects levels) and the Johnson-Neyman
+    table is empty. Levels with fewer than min_level_n complete cases are
+    dropped with a warning; their dummy and interaction could not be
+    estimated apart. p_interaction is always the joint Wald F test of all
+    interaction terms (equal to the t test for a single one).
+
+    A model whose design is rank deficient raises ValueError.
+
+    Returns {"models", "simple_slopes", "johnson_neyman"} as DataFrames.
+    """
+    covariates = [] if covariates is None else list(covariates)
+    data = df[list(dict.fromkeys(outcomes + predictors + [moderator] + covariates))]
+    data = data.apply(pd.to_numeric, errors="coerce").dropna()
+
+    if categorical:
+        counts = data[moderator].value_counts()
+        rare = sorted(counts.index[counts < min_level_n])
+        if rare:
+            warnings.warn(
+                f"Dropping levels {rare} of {moderator} with fewer than {min_level_n} complete cases "
+                f"({counts[rare].to_dict()})"
+            )
+            data = data[~data[moderator].isin(rare)]
+
+    w = data[moderator].to_numpy(dtype=float)
+    levels = np.unique(w)
+    if categorical:
+        if len(levels) < 2:
+            raise ValueError(f"Categorical moderator {moderator} has fewer than two levels in the complete cases")
+        moderator_values = list(levels) if moderator_values is None else list(moderator_values)
+        unknown = [v for v in moderator_values if v not in levels]
+        if unknown:
+            raise ValueError(f"moderator_values {unknown} are not levels of {moderator} ({list(levels)})")
+    elif len(levels) > 2 and np.all(levels == np.round(levels)) and len(levels) <= 10:
+        warnings.warn(
+            f"{moderator} has {len(levels)} integer levels and is used as a continuous moderator; "
+            "pass categorical=True if it is a code"
+        )
+    if moderator_values is None:
+        if len(levels) <= 2:
+            moderator_values = list(levels)
+        else:
+            moderator_values = [w.mean() - w.std(ddof=1), w.mean(), w.mean() + w.std(ddof=1)]
+
+    D, pos = _design(data, predictors, moderator, covariates, categorical)
+    mod = list(_moderator_columns(w, moderator, categorical))
+    Y = data[outcomes].to_numpy(dtype=float)
+    G = D.T @ D
+    DtY = D.T @ Y
+    yty = (Y**2).sum(axis=0)
+    y_centered_ss = ((Y - Y.mean(axis=0)) ** 2).sum(axis=0)
+    n = len(data)
+    q = len(mod)
+
+    models, slopes, jn = [], [], []
+    for p in predictors:
+        interactions = [f"{p}:{m}" for m in mod]
+        terms = ["const", p] + mod + interactions + covariates
+        idx = [pos[t] for t in terms]
+        rank = np.linalg.matrix_rank(D[:, idx])
+        if rank < len(idx):
+            which = f"levels {list(levels)}" if categorical else f"values in [{w.min()}, {w.max()}]"
+            raise ValueError(
+                f"Design of {p} moderated by {moderator} ({which}) has rank {rank} < {len(idx)} columns; "
+                "a level or covariate is collinear with other terms"
+            )
+        chol = linalg.cho_factor(G[np.ix_(idx, idx)])
+        XtX_inv = linalg.cho_solve(chol, np.eye(len(idx)))
+        beta = linalg.cho_solve(chol, DtY[idx])  # (k, n_outcomes)
+
+        dof = n - len(idx)
+        t_crit = stats.t.ppf((1 + confidence) / 2, dof)
+        rss = yty - (beta * DtY[idx]).sum(axis=0)
+        sigma2 = rss / dof
+        inter = slice(2 + q, 2 + 2 * q)
+
+        # contrast of the simple slope at every moderator value
+        contrasts = []
+        for val in moderator_values:
+            c = np.zeros(len(idx))
+            c[1] = 1.0
+            if categorical:
+                if val != levels[0]:
+                    c[2 + q + list(levels[1:]).index(val)] = 1.0
+            else:
+                c[2 + q] = val
+            contrasts.append(c)
+        C = np.array(contrasts)
+
+        for m, y in enumerate(outcomes):
+            V = XtX_inv * sigma2[m]
+            se = np.sqrt(np.diag(V))
+            t = beta[:, m] / se
+            pvals = 2 * stats.t.sf(np.abs(t), dof)
+            row = {"outcome": y, "predictor": p, "moderator": moderator, "n": n, "r2": 1 - rss[m] / y_centered_ss[m]}
+            labels = [("predictor", 1)]
+            if categorical:
+                labels += [(f"moderator[{level:g}]", 2 + j) for j, level in enumerate(levels[1:])]
+                labels += [(f"interaction[{level:g}]", 2 + q + j) for j, level in enumerate(levels[1:])]
+            else:
+                labels += [("moderator", 2), ("interaction", 3)]
+            for term, j in labels:
+                row[f"b_{term}"] = beta[j, m]
+                row[f"se_{term}"] = se[j]
+                row[f"p_{term}"] = pvals[j]
+            b3 = beta[inter, m]
+            F = b3 @ np.linalg.solve(V[inter, inter], b3) / q
+            row["F_interaction"] = F
+            row["p_interaction"] = stats.f.sf(F, q, dof)
+            models.append(row)
+
+            slope = C @ beta[:, m]
+            slope_se = np.sqrt(np.einsum("ij,jk,ik->i", C, V, C))
+            slope_t = slope / slope_se
+            for val, b, s_e, t_s in zip(moderator_values, slope, slope_se, slope_t):
+                slopes.append(
+                    {
+                        "outcome": y,
+                        "predictor": p,
+                        "moderator_value": val,
+                        "slope": b,
+                        "se": s_e,
+                        "t": t_s,
+                        "p": 2 * stats.t.sf(abs(t_s), dof),
+                        "ci_low": b - t_crit * s_e,
+                        "ci_high": b + t_crit * s_e,
+                    }
+                )
+
+            if not categorical:
+                v11, v13, v33 = V[1, 1], V[1, 3], V[3, 3]
+                jn.append(
+                    {"outcome": y, "predictor": p}
+                    | _johnson_neyman(beta[1, m], beta[3, m], v11, v13, v33, t_crit, w.min(), w.max())
+                )
+
+    return {
+        "models": pd.DataFrame(models),
+        "simple_slopes": pd.DataFrame(slopes),
+        "johnson_neyman": pd.DataFrame(jn),
+    }
@@ -0,0 +1,167 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from src.query import select_rows
+
+# groups up to this size use the exact permutation distribution of the rank sum
+EXACT_MAX_N = 10
+
+
+def midranks(X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Ranks of every column of X (n, S) with ties averaged, NaN stays NaN.
+
+    One sort for all columns; returns the ranks and the tie term
+    sum(t^3 - t) over the tie groups of each column.
+    """
+    n, S = X.shape
+    order = np.argsort(X, axis=0, kind="stable")  # NaN last
+    s = np.take_along_axis(X, order, axis=0)
+    valid = ~np.isnan(s)
+    new = np.ones((n, S), dtype=bool)
+    new[1:] = s[1:] != s[:-1]
+    gid = np.cumsum(new, axis=0) - 1 + np.arange(S) * n
+    counts = np.bincount(gid[valid], minlength=n * S).astype(float)
+    starts = (np.cumsum(counts.reshape(S, n), axis=1) - counts.reshape(S, n)).ravel()
+    sorted_ranks = np.where(valid, starts[gid] + (counts[gid] + 1) / 2, np.nan)
+    ranks = np.empty_like(sorted_ranks)
+    np.put_along_axis(ranks, order, sorted_ranks, axis=0)
+    tie = (counts**3 - counts).reshape(S, n).sum(axis=1)
+    return ranks, tie
+
+
+def exact_rank_sum_p(ranks: np.ndarray, n0: int, r0: float) -> float:
+    """
+    Two-sided exact p of the rank sum r0 of n0 out of the given midranks.
+
+    Counts all subsets of size n0 by their rank sum (ranks doubled, so
+    midranks of ties are integers too); conditional on the ties, as a
+    permutation test. The smaller tail is doubled like scipy's exact
+    Mann-Whitney test.
+    """
+    doubled = np.rint(2 * np.asarray(ranks)).astype(np.int64)
+    size = int(np.sort(doubled)[-n0:].sum()) + 1
+    counts = np.zeros((n0 + 1, size))
+    counts[0, 0] = 1
+    for r in doubled:
+        # the right side is read before writing (numpy copies overlapping operands)
+        counts[1:, r:] += counts[:-1, : size - r]
+    dist = counts[n0] / counts[n0].sum()
+    s0 = int(round(2 * r0))
+    return float(min(1.0, 2 * min(dist[: s0 + 1].sum(), dist[s0:].sum())))
+
+
+def rank_tests(
+    df: pd.DataFrame,
+    group_col: str = "young_group",
+    old_value: int = 0,
+    young_value: int = 1,
+    confidence: float = 0.95,
+    exact: bool = None,
+    print_results: bool = False,
+    rows=None,
+) -> pd.DataFrame:
+    """
+    Old vs. young rank comparison for every column except group_col, as one
+    row per scale like do_ttest.
+
+    All scales are ranked together (midranks for ties, missing values per
+    column left out), once over both groups and once within each group.
+    From these:
+
+    - Mann-Whitney U of the old group with p_u, tie-corrected normal
+      approximation with continuity correction, or the exact permutation
+      distribution when a group has at most EXACT_MAX_N answers (exact=None;
+      True / False forces it), see method.
+    - Brunner-Munzel test (t, p, degrees_of_freedom), which does not assume
+      equal variances or shapes.
+    - relative_effect P(old > young) + P(old = young) / 2 with its
+      Brunner-Munzel CI (confidence_intervall_lower/higher) and the
+      rank-biserial correlation 2 * relative_effect - 1 with CI. Positive
+      values mean higher answers of the old group, like t of do_ttest.
+    """
+    df = select_rows(df, rows)
+    columns = [c for c in df.columns if c != group_col]
+    numeric = [c for c in columns if pd.api.types.is_numeric_dtype(df[c])]
+    for c in columns:
+        if c not in numeric:
+            warnings.warn(f"{c} is not numeric")
+    X = df[numeric].to_numpy(dtype=float)
+    is_old = (df[group_col] == old_value).to_numpy()
+    is_young = (df[group_col] == young_value).to_numpy()
+    X = X[is_old | is_young]
+    is_old, is_young = is_old[is_old | is_young], is_young[is_old | is_young]
+
+    ranks, tie = midranks(X)
+    ranks_old, _ = midranks(X[is_old])
+    ranks_young, _ = midranks(X[is_young])
+    n0 = (~np.isnan(X[is_old])).sum(axis=0).astype(float)
+    n1 = (~np.isnan(X[is_young])).sum(axis=0).astype(float)
+    N = n0 + n1
+
+    # empty groups give nan instead of warnings
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean_old = np.nanmean(np.where(is_old[:, None], X, np.nan), axis=0)
+        mean_young = np.nanmean(np.where(is_young[:, None], X, np.nan), axis=0)
+        median_old = np.nanmedian(np.where(is_old[:, None], X, np.nan), axis=0)
+        median_young = np.nanmedian(np.where(is_young[:, None], X, np.nan), axis=0)
+
+        # Mann-Whitney
+        r0 = np.nansum(ranks[is_old], axis=0)
+        U = r0 - n0 * (n0 + 1) / 2
+        mu = n0 * n1 / 2
+        sd = np.sqrt(n0 * n1 / 12 * ((N + 1) - tie / (N * (N - 1))))
+        p_u = np.where(sd > 0, np.clip(2 * stats.norm.sf((np.abs(U - mu) - 0.5) / sd), 0, 1), np.nan)
+
+        # Brunner-Munzel on the placements (combined minus within-group ranks)
+        mean0 = np.nanmean(ranks[is_old], axis=0)
+        mean1 = np.nanmean(ranks[is_young], axis=0)
+        place0 = ranks[is_old] - ranks_old
+        place1 = ranks[is_young] - ranks_young
+        S0 = np.nansum((place0 - np.nanmean(place0, axis=0)) ** 2, axis=0) / (n0 - 1)
+        S1 = np.nansum((place1 - np.nanmean(place1, axis=0)) ** 2, axis=0) / (n1 - 1)
+        V = n0 * S0 + n1 * S1
+        t = n0 * n1 * (mean0 - mean1) / (N * np.sqrt(V))
+        dof = V**2 / ((n0 * S0) ** 2 / (n0 - 1) + (n1 * S1) ** 2 / (n1 - 1))
+        p = 2 * stats.t.sf(np.abs(t), dof)
+
+        relative = (mean0 - (n0 + 1) / 2) / n1
+        half = stats.t.ppf((1 + confidence) / 2, dof) * np.sqrt(V) / (n0 * n1)
+        low, high = np.clip(relative - half, 0, 1), np.clip(relative + half, 0, 1)
+
+    use_exact = np.minimum(n0, n1) <= EXACT_MAX_N if exact is None else np.full(len(numeric), bool(exact))
+    use_exact &= np.minimum(n0, n1) > 0
+    for j in np.flatnonzero(use_exact):
+        observed = ~np.isnan(X[:, j])
+        p_u[j] = exact_rank_sum_p(ranks[observed, j], int(n0[j]), r0[j])
+
+    results_df = pd.DataFrame(
+        {
+            "scale": numeric,
+            "mean_old": mean_old,
+            "mean_young": mean_young,
+            "median_old": median_old,
+            "median_young": median_young,
+            "n_old": n0.astype(int),
+            "n_young": n1.astype(int),
+            "U": U,
+            "p_u": p_u,
+            "method": np.where(use_exact, "exact", "asymptotic"),
+            "t": t,
+            "p": p,
+            "degrees_of_freedom": dof,
+            "relative_effect": relative,
+            "confidence_intervall_lower": low,
+            "confidence_intervall_higher": high,
+            "rank_biserial": 2 * relative - 1,
+            "rb_ci_lower": 2 * low - 1,
+            "rb_ci_higher": 2 * high - 1,
+        }
+    )
+    if print_results:
+        print(results_df.to_string())
+    return results_df
@@ -0,0 +1,245 @@
+import numpy as np
+import pandas as pd
+from scipy import optimize, stats
+from scipy.special import expit
+
+ITEMS = [f"G05Q18[{i}]" for i in range(1, 6)] + [f"G05Q19[{i}]" for i in range(1, 7)]
+PREDICTORS = ["young_group", "age", "usage"]
+
+
+def _prepare(Y: np.ndarray, X: np.ndarray):
+    """
+    Item codes 0..K_m-1 over the observed levels of each item, and the row
+    weights (1 where item and all predictors are observed, 0 else).
+    """
+    n, M = Y.shape
+    W = (~np.isnan(Y) & ~np.isnan(X).any(axis=1)[:, None]).astype(float)
+    codes = np.zeros((n, M), dtype=np.int64)
+    levels = []
+    for m in range(M):
+        lv = np.unique(Y[W[:, m] > 0, m])
+        levels.append(lv)
+        codes[:, m] = np.searchsorted(lv, np.where(W[:, m] > 0, Y[:, m], lv[0] if len(lv) else 0))
+    return codes, W, levels
+
+
+class _Likelihood:
+    """
+    Negative log-likelihood and gradient of M proportional-odds models at once.
+
+    P(y <= k) = expit(theta_k - x @ beta) for every item; the items share X
+    but have their own beta and thresholds. Thresholds beyond the observed
+    levels of an item are fixed at +inf.
+    """
+
+    def __init__(self, codes: np.ndarray, W: np.ndarray, X: np.ndarray, n_levels: np.ndarray):
+        self.codes, self.W, self.X = codes, W, np.nan_to_num(X)
+        self.n, self.M = codes.shape
+        self.p = X.shape[1]
+        self.J = int(n_levels.max()) - 1
+        self.n_levels = n_levels
+        # threshold slots that belong to an item (the rest stay +inf)
+        self.active = np.arange(self.J)[None, :] < (n_levels[:, None] - 1)
+        self.flat = np.arange(self.M)[None, :] * (self.J + 2) + codes
+
+    def unpack(self, params: np.ndarray):
+        params = params.reshape(self.M, self.p + self.J)
+        return params[:, : self.p], params[:, self.p :]
+
+    def thetas(self, theta: np.ndarray) -> np.ndarray:
+        """(M, J + 2) thresholds with -inf / +inf at both ends and unused slots."""
+        ext = np.full((self.M, self.J + 2), np.inf)
+        ext[:, 0] = -np.inf
+        ext[:, 1:-1] = np.where(self.active, theta, np.inf)
+        return ext
+
+    def nll_grad(self, params: np.ndarray) -> tuple[float, np.ndarray]:
+        """In natural parameters (beta, ordered thresholds)."""
+        beta, theta = self.unpack(params)
+        ext = self.thetas(theta)
+        eta = self.X @ beta.T
+        m = np.arange(self.M)[None, :]
+        upper = ext[m, self.codes + 1] - eta
+        lower = ext[m, self.codes] - eta
+        s_u, s_l = expit(upper), expit(lower)
+        prob = np.clip(s_u - s_l, 1e-300, None)
+        d_u, d_l = s_u * (1 - s_u), s_l * (1 - s_l)
+
+        nll = -(self.W * np.log(prob)).sum()
+        g = self.W / prob
+        g_beta = (g * (d_u - d_l)).T @ self.X
+        size = self.M * (self.J + 2)
+        g_ext = -np.bincount((self.flat + 1).ravel(), weights=(g * d_u).ravel(), minlength=size)
+        g_ext += np.bincount(self.flat.ravel(), weights=(g * d_l).ravel(), minlength=size)
+        g_theta = g_ext.reshape(self.M, self.J + 2)[:, 1:-1] * self.active
+        return nll, np.column_stack([g_beta, g_theta]).ravel()
+
+    def to_natural(self, free: np.ndarray) -> np.ndarray:
+        """Free parameters (beta, first threshold, log gaps) to (beta, thresholds)."""
+        beta, a = self.unpack(free)
+        steps = np.column_stack([a[:, :1], np.exp(a[:, 1:])])
+        return np.column_stack([beta, np.cumsum(steps, axis=1)]).ravel()
+
+    def to_free(self, params: np.ndarray) -> np.ndarray:
+        beta, theta = self.unpack(params)
+        gaps = np.diff(theta, axis=1)
+        gaps = np.where(self.active[:, 1:], np.maximum(gaps, 1e-6), 1.0)
+        return np.column_stack([beta, theta[:, :1], np.log(gaps)]).ravel()
+
+    def nll_grad_free(self, free: np.ndarray) -> tuple[float, np.ndarray]:
+        nll, grad = self.nll_grad(self.to_natural(free))
+        g_beta, g_theta = self.unpack(grad)
+        _, a = self.unpack(free)
+        # theta_j = a_0 + sum_{i<=j} exp(a_i): gradient is a reverse cumulative sum
+        g_a = np.cumsum(g_theta[:, ::-1], axis=1)[:, ::-1]
+        g_a[:, 1:] *= np.exp(a[:, 1:])
+        return nll, np.column_stack([g_beta, g_a]).ravel()
+
+    def hessian(self, params: np.ndarray) -> np.ndarray:
+        """
+        (M, P, P) observed information per item by central differences of the
+        gradient. The items are independent, so one coordinate is perturbed
+        for all items at once and 2 P gradient calls give all M blocks.
+        """
+        P = self.p + self.J
+        H = np.zeros((self.M, P, P))
+        base = params.reshape(self.M, P)
+        for j in range(P):
+            h = 1e-5 * (1 + np.abs(base[:, j]))
+            step = np.zeros_like(base)
+            step[:, j] = h
+            g_plus = self.nll_grad((base + step).ravel())[1].reshape(self.M, P)
+            g_minus = self.nll_grad((base - step).ravel())[1].reshape(self.M, P)
+            H[:, :, j] = (g_plus - g_minus) / (2 * h[:, None])
+        return (H + H.transpose(0, 2, 1)) / 2
+
+
+def _start(lik: _Likelihood) -> np.ndarray:
+    """beta = 0 and the thresholds of the marginal cumulative shares of every item."""
+    theta = np.zeros((lik.M, lik.J))
+    for m in range(lik.M):
+        counts = np.bincount(lik.codes[lik.W[:, m] > 0, m], minlength=lik.n_levels[m])
+        cum = np.cumsum(counts)[:-1] / counts.sum()
+        cum = np.clip(cum, 1e-3, 1 - 1e-3)
+        theta[m, : len(cum)] = np.maximum.accumulate(np.log(cum / (1 - cum)) + np.arange(len(cum)) * 1e-6)
+    return np.column_stack([np.zeros((lik.M, lik.p)), theta]).ravel()
+
+
+def fit_ordinal(Y: np.ndarray, X: np.ndarray, start: np.ndarray = None, tol: float = 1e-8) -> dict:
+    """
+    Proportional-odds (ordered logit) fits of every column of Y on X, jointly.
+
+    The summed likelihood of all items is minimized in one L-BFGS run with
+    a vectorized gradient. start are natural parameters (M, p + J) of an
+    earlier fit with the same items, e.g. of the previous subgroup, and
+    replace the marginal-threshold start if the shapes match. Returns
+    params, se, loglik, n and levels per item and the convergence flag.
+    """
+    Y = np.asarray(Y, dtype=float)
+    X = np.asarray(X, dtype=float)
+    codes, W, levels = _prepare(Y, X)
+    n_levels = np.array([len(lv) for lv in levels])
+    if (n_levels < 2).any():
+        raise ValueError("every item needs at least two observed levels")
+    lik = _Likelihood(codes, W, X, n_levels)
+
+    x0 = _start(lik)
+    if start is not None and np.size(start) == x0.size:
+        x0 = np.asarray(start, dtype=float).ravel()
+    res = optimize.minimize(
+        lik.nll_grad_free,
+        lik.to_free(x0),
+        jac=True,
+        method="L-BFGS-B",
+        options={"maxiter": 10_000, "gtol": tol, "ftol": 1e-15},
+    )
+    params = lik.to_natural(res.x)
+
+    H = lik.hessian(params)
+    P = lik.p + lik.J
+    se = np.full((lik.M, P), np.nan)
+    for m in range(lik.M):
+        keep = np.r_[np.ones(lik.p, dtype=bool), lik.active[m]]
+        cov = np.linalg.pinv(H[m][np.ix_(keep, keep)])
+        se[m, keep] = np.sqrt(np.clip(np.diag(cov), 0, None))
+
+    beta, theta = lik.unpack(params)
+    eta = lik.X @ beta.T
+    ext = lik.thetas(theta)
+    mm = np.arange(lik.M)[None, :]
+    prob = expit(ext[mm, codes + 1] - eta) - expit(ext[mm, codes] - eta)
+    loglik = (W * np.log(np.clip(prob, 1e-300, None))).sum(axis=0)
+
+    return {
+        "params": params.reshape(lik.M, P),
+        "se": se,
+        "loglik": loglik,
+        "n": W.sum(axis=0).astype(int),
+        "levels": levels,
+        "n_predictors": lik.p,
+        "converged": bool(res.success),
+    }
+
+
+def _tidy(fit: dict, items: list[str], predictors: list[str], confidence: float) -> pd.DataFrame:
+    z_crit = stats.norm.ppf((1 + confidence) / 2)
+    p = fit["n_predictors"]
+    rows = []
+    for m, item in enumerate(items):
+        lv = fit["levels"][m]
+        terms = list(predictors) + [f"{lv[j]:g}/{lv[j + 1]:g}" for j in range(len(lv) - 1)]
+        for j, term in enumerate(terms):
+            coef, se = fit["params"][m, j], fit["se"][m, j]
+            rows.append(
+                {
+                    "item": item,
+                    "term": term,
+                    "kind": "coef" if j < p else "threshold",
+                    "coef": coef,
+                    "se": se,
+                    "z": coef / se,
+                    "p": 2 * stats.norm.sf(abs(coef / se)),
+                    "ci_low": coef - z_crit * se,
+                    "ci_high": coef + z_crit * se,
+                    "odds_ratio": np.exp(coef) if j < p else np.nan,
+                    "n": fit["n"][m],
+                    "loglik": fit["loglik"][m],
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def ordinal_regression(
+    df: pd.DataFrame,
+    items: list[str] = ITEMS,
+    predictors: list[str] = PREDICTORS,
+    by: str = None,
+    confidence: float = 0.95,
+) -> pd.DataFrame:
+    """
+    Proportional-odds model of every Likert item on the predictors, one tidy row per item and term.
+
+    df needs the raw items and the predictors, e.g. the cleaned survey joined
+    with young_group, age and usage from group_data. Each item uses the rows
+    where it and all predictors are answered. Thresholds are the terms
+    "1/2", "2/3", ... (named as in statsmodels' OrderedModel, but as cut
+    points rather than its log increments); odds_ratio is
+    exp(coef) for the predictors (> 1: higher answers more likely).
+
+    With by, the models are fitted per subgroup, each fit warm-started from
+    the previous one.
+    """
+    groups = [(None, df)] if by is None else list(df.groupby(by))
+    X_cols = [c for c in predictors if c != by]
+    out, start = [], None
+    for key, sub in groups:
+        Y = sub[items].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        X = sub[X_cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        fit = fit_ordinal(Y, X, start=start)
+        start = fit["params"]
+        table = _tidy(fit, items, X_cols, confidence)
+        table["converged"] = fit["converged"]
+        if by is not None:
+            table.insert(0, by, key)
+        out.append(table)
+    return pd.concat(out, ignore_index=True)
@@ -0,0 +1,153 @@
+import hashlib
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+ALIAS_FILE = "data/other_aliases.csv"
+CACHE_FILE = "data/other_answers_cache.csv"
+QUESTIONS = ["G02Q05", "G02Q06", "G02Q07"]
+
+
+def normalize_text(text: str) -> str:
+    """Lower case, no accents, punctuation and repeated whitespace removed."""
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _trigrams(text: str) -> list[str]:
+    padded = f"  {text} "
+    return [padded[i : i + 3] for i in range(len(padded) - 2)]
+
+
+class TrigramIndex:
+    """
+    Character trigram tf-idf vectors of the alias texts; all queries are
+    scored against all aliases with one sparse matrix product (cosine).
+    """
+
+    def __init__(self, texts: list[str]):
+        self.texts = list(texts)
+        grams = [_trigrams(t) for t in self.texts]
+        self.vocab = {g: i for i, g in enumerate(sorted({g for gs in grams for g in gs}))}
+        counts = self._counts(grams)
+        df = np.asarray((counts > 0).sum(axis=0)).ravel()
+        self.idf = np.log((1 + len(self.texts)) / (1 + df)) + 1
+        self.matrix = self._normalize(counts)
+
+    def _counts(self, grams: list[list[str]]) -> sparse.csr_matrix:
+        rows, cols = [], []
+        for r, gs in enumerate(grams):
+            for g in gs:
+                if g in self.vocab:
+                    rows.append(r)
+                    cols.append(self.vocab[g])
+        data = np.ones(len(rows))
+        return sparse.csr_matrix((data, (rows, cols)), shape=(len(grams), len(self.vocab)))
+
+    def _normalize(self, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+        weighted = counts.multiply(self.idf[None, :]).tocsr()
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms) @ weighted
+
+    def best(self, queries: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Index of the most similar alias and its cosine similarity for every query."""
+        if not queries or not self.texts:
+            return np.zeros(len(queries), dtype=int), np.zeros(len(queries))
+        q = self._normalize(self._counts([_trigrams(t) for t in queries]))
+        sim = (q @ self.matrix.T).toarray()
+        idx = sim.argmax(axis=1)
+        return idx, sim[np.arange(len(queries)), idx]
+
+
+def load_aliases(path: str = ALIAS_FILE) -> pd.DataFrame:
+    """Alias table (question, alias, category); edit the CSV to add or fix mappings."""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["question", "alias", "category"])
+    aliases = pd.read_csv(path, dtype=str).dropna(subset=["alias", "category"])
+    aliases["alias"] = aliases["alias"].map(normalize_text)
+    return aliases
+
+
+class OtherAnswerNormalizer:
+    """
+    Maps free-text [other] answers to canonical categories.
+
+    Values are deduplicated and normalized first; exact alias hits win,
+    the rest goes through a trigram index per question and is accepted above
+    threshold (else "Unknown (<normalized text>)"). Every decision is kept
+    in cache_file, so later runs only match strings never seen before. The
+    cache is dropped when the alias table changes.
+    """
+
+    def __init__(self, alias_file: str = ALIAS_FILE, cache_file: str = CACHE_FILE, threshold: float = 0.6):
+        self.alias_file = alias_file
+        self.cache_file = cache_file
+        self.threshold = threshold
+        self.aliases = load_aliases(alias_file)
+        self.alias_hash = hashlib.sha1(
+            self.aliases.to_csv(index=False).encode() + str(threshold).encode()
+        ).hexdigest()
+        self._indexes = {}
+        self.cache = self._load_cache()
+        self.n_matched = 0
+
+    def _load_cache(self) -> dict:
+        if self.cache_file is None or not os.path.exists(self.cache_file):
+            return {}
+        cached = pd.read_csv(self.cache_file, dtype={"question": str, "text": str, "category": str})
+        cached = cached[cached["alias_hash"] == self.alias_hash]
+        return {(q, t): (c, s) for q, t, c, s in cached[["question", "text", "category", "score"]].itertuples(index=False)}
+
+    def _index(self, question: str):
+        if question not in self._indexes:
+            sub = self.aliases[self.aliases["question"].isin([question, "*"])]
+            self._indexes[question] = (TrigramIndex(sub["alias"].tolist()), sub["category"].tolist())
+        return self._indexes[question]
+
+    def _match(self, question: str, texts: list[str]) -> None:
+        index, categories = self._index(question)
+        exact = dict(zip(index.texts, categories))
+        fuzzy = [t for t in texts if t not in exact]
+        idx, score = index.best(fuzzy)
+        for t in texts:
+            if t in exact:
+                self.cache[(question, t)] = (exact[t], 1.0)
+        for t, i, s in zip(fuzzy, idx, score):
+            category = categories[i] if s >= self.threshold else f"Unknown ({t})"
+            self.cache[(question, t)] = (category, float(s))
+        self.n_matched += len(texts)
+
+    def normalize(self, question: str, values: pd.Series) -> pd.Series:
+        """Canonical category for every value (missing and empty stay NaN)."""
+        values = values.where(values.notna() & (values.astype(str).str.strip() != ""))
+        raw = values.dropna().astype(str).unique()
+        norm = {r: normalize_text(r) for r in raw}
+        new = sorted({n for n in norm.values() if (question, n) not in self.cache})
+        if new:
+            self._match(question, new)
+        lookup = {r: self.cache[(question, n)][0] for r, n in norm.items()}
+        return values.astype(object).map(lookup)
+
+    def save(self) -> None:
+        if self.cache_file is None:
+            return
+        rows = [
+            {"question": q, "text": t, "category": c, "score": s, "alias_hash": self.alias_hash}
+            for (q, t), (c, s) in sorted(self.cache.items())
+        ]
+        os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+        pd.DataFrame(rows, columns=["question", "text", "category", "score", "alias_hash"]).to_csv(
+            self.cache_file, index=False
+        )
+
+    def review(self) -> pd.DataFrame:
+        """All cached decisions, lowest similarity first, to find aliases worth adding."""
+        rows = [(q, t, c, s) for (q, t), (c, s) in self.cache.items()]
+        return pd.DataFrame(rows, columns=["question", "text", "category", "score"]).sort_values("score")
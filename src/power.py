@@ -0,0 +1,170 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+LIKERT_LEVELS = 7
+
+
+def _likert_cuts(levels: int = LIKERT_LEVELS) -> np.ndarray:
+    # equal-probability categories for a standard normal latent response
+    return stats.norm.ppf(np.arange(1, levels) / levels)
+
+
+def simulate_likert_scale(
+    rng: np.random.Generator,
+    factor: np.ndarray,
+    n_items: int,
+    item_corr: float,
+    levels: int = LIKERT_LEVELS,
+) -> np.ndarray:
+    """
+    Scale scores (mean of n_items Likert items) for a batch of latent factor values.
+
+    factor has shape (n_sims, n) and is the respondents' latent trait in SD
+    units. Every item loads sqrt(item_corr) on it, so two items correlate with
+    item_corr on the latent level before discretization.
+    """
+    noise = rng.standard_normal(factor.shape + (n_items,))
+    latent = np.sqrt(item_corr) * factor[..., None] + np.sqrt(1 - item_corr) * noise
+    items = np.searchsorted(_likert_cuts(levels), latent) + 1
+    return items.mean(axis=-1)
+
+
+def batched_ttest(g0: np.ndarray, g1: np.ndarray, alpha_levene: float = 0.05) -> np.ndarray:
+    """
+    p values of the do_ttest decision rule for every row of g0/g1.
+
+    As in do_ttest: Student's t if Levene's test is not significant, Welch otherwise.
+    """
+    _, lev_p = stats.levene(g0, g1, axis=1)
+    _, p_student = stats.ttest_ind(g0, g1, axis=1, equal_var=True)
+    _, p_welch = stats.ttest_ind(g0, g1, axis=1, equal_var=False)
+    return np.where(lev_p > alpha_levene, p_student, p_welch)
+
+
+def batched_ols_pvalue(X: np.ndarray, y: np.ndarray, coef: int) -> np.ndarray:
+    """p value of coefficient `coef` for a stack of OLS problems X (b, n, k), y (b, n)."""
+    XtX = np.einsum("bni,bnj->bij", X, X)
+    Xty = np.einsum("bni,bn->bi", X, y)
+    beta = np.linalg.solve(XtX, Xty[..., None])[..., 0]
+    resid = y - np.einsum("bnk,bk->bn", X, beta)
+    dof = X.shape[1] - X.shape[2]
+    sigma2 = (resid**2).sum(axis=1) / dof
+    var = sigma2 * np.linalg.inv(XtX)[:, coef, coef]
+    t = beta[:, coef] / np.sqrt(var)
+    return 2 * stats.t.sf(np.abs(t), dof)
+
+
+def _simulate_batch(design: str, n_per_group: int, n_sims: int, params: dict, seed) -> np.ndarray:
+    """Simulates n_sims studies and returns their p values for the group effect."""
+    rng = np.random.default_rng(seed)
+    effect = params["effect_size"]
+    group = np.repeat([0, 1], n_per_group)
+
+    if design == "ttest":
+        factor = rng.standard_normal((n_sims, 2 * n_per_group)) + effect * group
+        score = simulate_likert_scale(rng, factor, params["n_items"], params["item_corr"])
+        return batched_ttest(score[:, :n_per_group], score[:, n_per_group:])
+
+    if design == "ancova":
+        # two correlated covariate scales (upskill/reskill orientation)
+        n = 2 * n_per_group
+        cov_r = params["covariate_corr"]
+        c_shared = rng.standard_normal((n_sims, n))
+        c1 = np.sqrt(cov_r) * c_shared + np.sqrt(1 - cov_r) * rng.standard_normal((n_sims, n))
+        c2 = np.sqrt(cov_r) * c_shared + np.sqrt(1 - cov_r) * rng.standard_normal((n_sims, n))
+
+        b = params["covariate_effect"]
+        resid_sd = np.sqrt(max(1 - 2 * b**2 * (1 + cov_r), 1e-6))
+        outcome = effect * group + b * c1 + b * c2 + resid_sd * rng.standard_normal((n_sims, n))
+
+        y = simulate_likert_scale(rng, outcome, params["n_items"], params["item_corr"])
+        s1 = simulate_likert_scale(rng, c1, params["n_covariate_items"], params["item_corr"])
+        s2 = simulate_likert_scale(rng, c2, params["n_covariate_items"], params["item_corr"])
+        X = np.stack([np.ones_like(y), np.broadcast_to(group, y.shape), s1, s2], axis=-1)
+        return batched_ols_pvalue(X, y, coef=1)
+
+    raise ValueError(f"Unknown design: {design}")
+
+
+def power_curve(
+    design: str = "ttest",
+    sample_sizes: list[int] = (20, 40, 60, 80, 100, 150, 200),
+    effect_size: float = 0.5,
+    n_items: int = 5,
+    item_corr: float = 0.5,
+    covariate_effect: float = 0.3,
+    covariate_corr: float = 0.5,
+    n_covariate_items: int = 5,
+    n_sims: int = 2000,
+    alpha: float = 0.05,
+    batch_size: int = 500,
+    n_jobs: int = None,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Monte Carlo power per sample size (respondents per young_group).
+
+    design="ttest" simulates one scale compared with the do_ttest rule,
+    design="ancova" the group effect of run_ancova with two covariate scales.
+    effect_size is the group shift of the latent trait in SD units.
+    The simulations run in batches of batch_size studies on a process pool.
+    """
+    params = {
+        "effect_size": effect_size,
+        "n_items": n_items,
+        "item_corr": item_corr,
+        "covariate_effect": covariate_effect,
+        "covariate_corr": covariate_corr,
+        "n_covariate_items": n_covariate_items,
+    }
+
+    tasks = []
+    for n in sample_sizes:
+        n_batches = int(np.ceil(n_sims / batch_size))
+        for i in range(n_batches):
+            tasks.append((n, min(batch_size, n_sims - i * batch_size)))
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    args = (
+        [design] * len(tasks),
+        [t[0] for t in tasks],
+        [t[1] for t in tasks],
+        [params] * len(tasks),
+        seeds,
+    )
+
+    n_jobs = os.cpu_count() if n_jobs is None else n_jobs
+    if n_jobs == 1:
+        p_values = list(map(_simulate_batch, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            p_values = list(pool.map(_simulate_batch, *args))
+
+    rows = []
+    for n in sample_sizes:
+        p = np.concatenate([pv for (tn, _), pv in zip(tasks, p_values) if tn == n])
+        power = float(np.mean(p < alpha))
+        half = stats.norm.ppf(0.975) * np.sqrt(power * (1 - power) / len(p))
+        rows.append(
+            {
+                "design": design,
+                "n_per_group": n,
+                "effect_size": effect_size,
+                "power": power,
+                "ci_low": max(power - half, 0.0),
+                "ci_high": min(power + half, 1.0),
+                "n_sims": len(p),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def required_sample_size(curve: pd.DataFrame, target_power: float = 0.8):
+    """Smallest simulated n per group that reaches target_power, None if none does."""
+    enough = curve[curve["power"] >= target_power]
+    if enough.empty:
+        return None
+    return int(enough["n_per_group"].min())
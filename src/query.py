@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+
+from src.weighting import age_bands
+
+# index name -> column of the cleaned survey
+INDEXED_COLUMNS = {
+    "group": "young_group",
+    "gender": "G02Q05",
+    "school_education": "G02Q06",
+    "vocational_education": "G02Q07",
+    "usage": "G03Q12",
+}
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+
+class Bitmap:
+    """
+    Packed bit set over the rows of one indexed frame.
+
+    &, | , ^ and ~ work byte-wise on the packed arrays; positions() and
+    labels() resolve the set to row positions or index labels.
+    """
+
+    def __init__(self, bits: np.ndarray, n: int, index: pd.Index):
+        self.bits = bits
+        self.n = n
+        self.index = index
+
+    @classmethod
+    def from_mask(cls, mask, index: pd.Index) -> "Bitmap":
+        mask = np.asarray(mask, dtype=bool)
+        return cls(np.packbits(mask), len(mask), index)
+
+    def _check(self, other: "Bitmap") -> None:
+        if other.n != self.n or other.index is not self.index:
+            raise ValueError("Bitmaps belong to different frames")
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        self._check(other)
+        return Bitmap(self.bits & other.bits, self.n, self.index)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        self._check(other)
+        return Bitmap(self.bits | other.bits, self.n, self.index)
+
+    def __xor__(self, other: "Bitmap") -> "Bitmap":
+        self._check(other)
+        return Bitmap(self.bits ^ other.bits, self.n, self.index)
+
+    def __invert__(self) -> "Bitmap":
+        bits = ~self.bits
+        # padding bits of the last byte stay 0
+        if self.n % 8:
+            bits[-1] &= np.uint8((0xFF << (8 - self.n % 8)) & 0xFF)
+        return Bitmap(bits, self.n, self.index)
+
+    def __len__(self) -> int:
+        return int(_POPCOUNT[self.bits].sum())
+
+    def mask(self) -> np.ndarray:
+        return np.unpackbits(self.bits, count=self.n).astype(bool)
+
+    def positions(self) -> np.ndarray:
+        return np.flatnonzero(np.unpackbits(self.bits, count=self.n))
+
+    def labels(self) -> pd.Index:
+        return self.index[self.positions()]
+
+    def __repr__(self) -> str:
+        return f"Bitmap({len(self)} of {self.n} rows)"
+
+
+class RespondentIndex:
+    """
+    Bitmap indexes over the cleaned responses for fast compound filters.
+
+    Every indexed variable gets one Bitmap per value, built once: group,
+    gender, education and usage frequency (INDEXED_COLUMNS), the age band
+    of G02Q04 and the boolean screening flags (flags frame of clean_data
+    with return_flags=True). extra adds further Series aligned to df.
+
+        idx = RespondentIndex(df, flags=flags)
+        rows = idx.where(group=1, gender=[1, 2]) & ~idx.where(speeder=True)
+        do_ttest(df_grouped[cols], rows=rows)
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        columns: dict = INDEXED_COLUMNS,
+        age_bins=(18, 25, 35, 45, 55, 65, np.inf),
+        flags: pd.DataFrame = None,
+        extra: dict = None,
+    ):
+        self.index = df.index
+        self.n = len(df)
+        variables = {name: df[col] for name, col in columns.items() if col in df.columns}
+        if "G02Q04" in df.columns:
+            variables["age_band"] = age_bands(df, bins=age_bins)
+        if flags is not None:
+            for col in flags.columns:
+                if pd.api.types.is_bool_dtype(flags[col]):
+                    variables[col] = flags[col].reindex(df.index)
+        for name, s in (extra or {}).items():
+            variables[name] = pd.Series(s).reindex(df.index)
+
+        self.bitmaps = {name: self._build(s) for name, s in variables.items()}
+
+    def _build(self, values: pd.Series) -> dict:
+        """One bitmap per value from a single factorization of the column."""
+        codes, uniques = pd.factorize(values, sort=True)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        out = {}
+        for k, value in enumerate(uniques):
+            mask = np.zeros(self.n, dtype=bool)
+            mask[order[bounds[k] : bounds[k + 1]]] = True
+            out[value] = Bitmap.from_mask(mask, self.index)
+        return out
+
+    def all(self) -> Bitmap:
+        return Bitmap.from_mask(np.ones(self.n, dtype=bool), self.index)
+
+    def none(self) -> Bitmap:
+        return Bitmap.from_mask(np.zeros(self.n, dtype=bool), self.index)
+
+    def values(self, name: str) -> list:
+        return list(self.bitmaps[name])
+
+    def isin(self, name: str, values) -> Bitmap:
+        if name not in self.bitmaps:
+            raise KeyError(f"No index on {name}, indexed: {list(self.bitmaps)}")
+        if not isinstance(values, (list, tuple, set, np.ndarray, pd.Index)):
+            values = [values]
+        out = self.none()
+        for v in values:
+            if v in self.bitmaps[name]:
+                out = out | self.bitmaps[name][v]
+        return out
+
+    def where(self, **conditions) -> Bitmap:
+        """AND of all conditions; a list value means any of these values."""
+        out = self.all()
+        for name, values in conditions.items():
+            out = out & self.isin(name, values)
+        return out
+
+    def counts(self, name: str, rows: Bitmap = None) -> pd.Series:
+        """Rows per value of an indexed variable, optionally within rows."""
+        return pd.Series(
+            {v: len(b if rows is None else b & rows) for v, b in self.bitmaps[name].items()}, name=name
+        )
+
+
+def select_rows(df: pd.DataFrame, rows) -> pd.DataFrame:
+    """
+    Subset of df for a row set: Bitmap, index labels or boolean mask (None
+    keeps df). Bitmaps are resolved by label, so they apply to every frame
+    that shares the index of the indexed one (e.g. df_grouped).
+    """
+    if rows is None:
+        return df
+    if isinstance(rows, Bitmap):
+        rows = rows.labels()
+    if isinstance(rows, np.ndarray) and rows.dtype == bool:
+        return df[rows]
+    return df.loc[rows]
@@ -1,66 +1,67 @@
 #regression.py
 
-#Import all needed ibraries 
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-import matplotlib.pyplot as plt
-
-def main():
+# Multiple linear regression of the motivation scales on up-/reskilling, age and usage.
+# Run from the repository root as a module: python -m src.regression
 
-    #Read the CSV file
-    csvFile = "../data/results-survey779776.csv"
+#Import all needed ibraries
+import os
 
-    df = pd.read_csv(csvFile)
+import pandas as pd
+import statsmodels.api as sm
+import matplotlib.pyplot as plt
 
-    #Define features and goal columns
-    feature_cols = ["G05Q18[1]", "G05Q18[2]", "G05Q18[3]", "G05Q18[4]"] #test data/column
-    target_col = "G05Q18[5]"
+from src.cleaning import clean_data, load_raw
+from src.cross_validation import OUTCOMES, PREDICTORS, evaluate_models
+from src.group import group_data
 
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 
-    X = df[feature_cols]
-    y = df[target_col]
+def main():
 
-    #Define and train model
-    model = LinearRegression()
+    #Read both surveys, clean them and score the scales
+    young_csv = os.path.join(DATA_DIR, "results-survey779776.csv")
+    old_csv = os.path.join(DATA_DIR, "results-survey374736.csv")
+    df = clean_data(*load_raw(young_csv, old_csv))
+    df_grouped = group_data(df)
 
-    model.fit(X, y)
+    fig, axes = plt.subplots(1, len(OUTCOMES), figsize=(6 * len(OUTCOMES), 5))
+    for ax, target_col in zip(axes, OUTCOMES):
 
-    #Results 
+        #Define and train model (in-sample, missing answers dropped)
+        data = df_grouped[PREDICTORS + [target_col]].dropna()
+        X = data[PREDICTORS]
+        y = data[target_col]
+        model = sm.OLS(y, sm.add_constant(X)).fit()
 
-    #Intercept
-    print("Intercept:", model.intercept_)
+        #Results
+        print(f"\n=== {target_col} ===")
 
-    # Coeffiecent for every feature
-    print("\Coefficient:")
-    for name, coef in zip(feature_cols, model.coef_):
-        print(f"  {name}: {coef}")
+        #Intercept
+        print("Intercept:", model.params["const"])
 
-    #Predict the model
-    y_pred = model.predict(X)
+        # Coeffiecent for every feature
+        print("Coefficient:")
+        for name in PREDICTORS:
+            print(f"  {name}: {model.params[name]}")
 
-    ergebnis_df = pd.DataFrame(
-        {
-            "y": y,
-            "y_hat": y_pred,
-        }
-    )
+        #Predict the model
+        y_pred = model.fittedvalues
 
-    print("\Comparison: real vs. predicted Values:")
-    print(ergebnis_df)
+        ax.scatter(y, y_pred)
+        ax.set_xlabel("Real Value (y)")
+        ax.set_ylabel("Predicted Value")
+        ax.set_title(f"{target_col}: real vs. predicted Values")
 
-    plt.scatter(y, y_pred)
-    plt.xlabel("Real Value (y)")
-    plt.ylabel("Predicted Value")
-    plt.title("Multiple Linear Regression real vs. predicted Values")
+        min_wert = min(y.min(), y_pred.min())
+        max_wert = max(y.max(), y_pred.max())
+        ax.plot([min_wert, max_wert], [min_wert, max_wert])
 
-    min_wert = min(y.min(), y_pred.min())
-    max_wert = max(y.max(), y_pred.max())
-    plt.plot([min_wert, max_wert], [min_wert, max_wert])
+    #Out-of-sample: repeated 5-fold cross-validation, OLS and regularized models (best penalty per model)
+    print("\nCross-validated R² / RMSE:")
+    print(evaluate_models(df_grouped)[["outcome", "model", "alpha", "r2_mean", "rmse_mean"]].to_string(index=False))
 
     plt.show()
 
 
 if __name__ == "__main__":
     main()
-
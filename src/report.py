@@ -0,0 +1,259 @@
+import hashlib
+import html
+import inspect
+import json
+import os
+import pickle
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+def _update_hash(h, obj) -> None:
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(type(obj).__name__.encode())
+        h.update(repr(list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(repr((obj.dtype, obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for o in obj:
+            _update_hash(h, o)
+    elif isinstance(obj, dict):
+        h.update(f"dict{len(obj)}".encode())
+        for k in sorted(obj, key=repr):
+            _update_hash(h, k)
+            _update_hash(h, obj[k])
+    elif callable(obj):
+        h.update(f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', repr(obj))}".encode())
+        try:
+            h.update(inspect.getsource(obj).encode())
+        except (OSError, TypeError):
+            pass
+        # bound methods also depend on their instance (e.g. SurveyAnalyzer.group_col)
+        if hasattr(obj, "__self__") and hasattr(obj.__self__, "__dict__"):
+            _update_hash(h, vars(obj.__self__))
+    else:
+        h.update(repr(obj).encode())
+
+
+def package_sources(package_dir: str = os.path.dirname(os.path.abspath(__file__))) -> dict:
+    """
+    {module file: sha256} of every module of the analysis package.
+
+    Sections call into helpers whose source the section's own function does
+    not show (group_data, clean_data, ...), so the cache key includes all of
+    them; lazily imported modules are covered as well.
+    """
+    out = {}
+    for name in sorted(os.listdir(package_dir)):
+        if name.endswith(".py"):
+            with open(os.path.join(package_dir, name), "rb") as f:
+                out[name] = hashlib.sha256(f.read()).hexdigest()
+    return out
+
+
+def fingerprint(*objs) -> str:
+    """sha256 over DataFrames (content + index), arrays, parameters and function source."""
+    h = hashlib.sha256()
+    for o in objs:
+        _update_hash(h, o)
+    return h.hexdigest()
+
+
+def _render(result, fmt: str) -> str:
+    if isinstance(result, pd.Series):
+        result = result.to_frame()
+    if isinstance(result, pd.DataFrame):
+        if fmt == "html":
+            return result.to_html(float_format=lambda v: f"{v:.4f}")
+        return "```\n" + result.to_string(float_format=lambda v: f"{v:.4f}") + "\n```"
+    if hasattr(result, "summary"):
+        # statsmodels results
+        result = str(result.summary())
+    text = str(result)
+    if fmt == "html":
+        return f"<pre>{html.escape(text)}</pre>"
+    return f"```\n{text}\n```"
+
+
+def _render_figures(paths: list[str], out_dir: str, fmt: str) -> str:
+    parts = []
+    for p in paths:
+        rel = os.path.relpath(p, out_dir)
+        if fmt == "html":
+            parts.append(f'<img src="{html.escape(rel)}" style="max-width:100%">')
+        else:
+            parts.append(f"![{os.path.basename(p)}]({rel})")
+    return "\n\n".join(parts)
+
+
+def _run_section(section: dict, fmt: str, out_dir: str, figure_dir: str) -> str:
+    """Runs one section and renders its content (module level so workers can run it)."""
+    func, args, kwargs = section["func"], section["args"], dict(section["kwargs"])
+    if section["kind"] == "result":
+        return _render(func(*args, **kwargs), fmt)
+
+    if section["files"] is None:
+        path = os.path.join(figure_dir, f"{section['name']}.png")
+        kwargs[section["out_kwarg"]] = path
+        func(*args, **kwargs)
+        paths = [path]
+    else:
+        func(*args, **kwargs)
+        paths = []
+        for src in section["files"]:
+            dst = os.path.join(figure_dir, f"{section['name']}_{os.path.basename(src)}")
+            shutil.copyfile(src, dst)
+            paths.append(dst)
+    return _render_figures(paths, out_dir, fmt)
+
+
+class Report:
+    """
+    Collects analysis outputs into one Markdown or HTML report.
+
+    Every section stores a fingerprint of its function, arguments and data.
+    build() only reruns sections whose fingerprint changed, all others are
+    taken from the cache in <out_dir>/.cache.
+    """
+
+    def __init__(self, out_dir: str = "report", title: str = "Survey analysis", fmt: str = "md"):
+        if fmt not in ("md", "html"):
+            raise ValueError(f"Unknown report format: {fmt}")
+        self.out_dir = out_dir
+        self.title = title
+        self.fmt = fmt
+        self.sections = []
+        self.cache_dir = os.path.join(out_dir, ".cache")
+        self.figure_dir = os.path.join(out_dir, "figures")
+
+    def add_section(self, name: str, func, *args, title: str = None, **kwargs) -> "Report":
+        """Section with the return value of func (DataFrame, statsmodels result or text)."""
+        self.sections.append(
+            {"name": name, "title": title or name, "func": func, "args": args, "kwargs": kwargs, "kind": "result"}
+        )
+        return self
+
+    def add_figure(
+        self,
+        name: str,
+        func,
+        *args,
+        title: str = None,
+        out_kwarg: str = "out_png",
+        files: list[str] = None,
+        **kwargs,
+    ) -> "Report":
+        """
+        Section with figures. By default the report passes its own file path as
+        out_kwarg (like the SurveyAnalyzer plot methods). Functions that choose
+        their own file names list them in files, they are copied into the report.
+        """
+        self.sections.append(
+            {
+                "name": name,
+                "title": title or name,
+                "func": func,
+                "args": args,
+                "kwargs": kwargs,
+                "kind": "figure",
+                "out_kwarg": out_kwarg,
+                "files": files,
+            }
+        )
+        return self
+
+    # -----------------------------
+    # Cache
+    # -----------------------------
+    def _cache_path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}.pkl")
+
+    def _load_cached(self, name: str, key: str):
+        path = self._cache_path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            cached = pickle.load(f)
+        if cached["fingerprint"] != key:
+            return None
+        return cached["content"]
+
+    def _store(self, name: str, key: str, content: str) -> None:
+        with open(self._cache_path(name), "wb") as f:
+            pickle.dump({"fingerprint": key, "content": content}, f)
+
+    # -----------------------------
+    # Build
+    # -----------------------------
+    def _run_section(self, section: dict) -> str:
+        return _run_section(section, self.fmt, self.out_dir, self.figure_dir)
+
+    def build(self, force: bool = False, n_jobs: int = 1, blas_threads: int = 1) -> dict:
+        """
+        Renders the report to <out_dir>/report.<fmt>.
+
+        With n_jobs != 1 the sections that have to be rebuilt run concurrently
+        through scheduler.Scheduler. Returns {section name: "rebuilt" | "cached"}.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        os.makedirs(self.figure_dir, exist_ok=True)
+
+        keys, contents = {}, {}
+        sources = package_sources()
+        for section in self.sections:
+            keys[section["name"]] = fingerprint(
+                sources,
+                section["kind"],
+                section["func"],
+                section["args"],
+                section["kwargs"],
+                section.get("files"),
+                self.fmt,
+            )
+            if not force:
+                contents[section["name"]] = self._load_cached(section["name"], keys[section["name"]])
+
+        todo = [s for s in self.sections if contents.get(s["name"]) is None]
+        if n_jobs == 1:
+            rebuilt = {s["name"]: self._run_section(s) for s in todo}
+        else:
+            from src.scheduler import Scheduler
+
+            scheduler = Scheduler(n_jobs=n_jobs, blas_threads=blas_threads)
+            for s in todo:
+                scheduler.add(s["name"], _run_section, s, self.fmt, self.out_dir, self.figure_dir)
+            rebuilt = scheduler.run()
+
+        status = {}
+        parts = []
+        for section in self.sections:
+            name = section["name"]
+            if name in rebuilt:
+                contents[name] = rebuilt[name]
+                self._store(name, keys[name], rebuilt[name])
+                status[name] = "rebuilt"
+            else:
+                status[name] = "cached"
+            parts.append((section["title"], contents[name]))
+
+        if self.fmt == "html":
+            body = "\n".join(
+                f"<h2>{html.escape(t)}</h2>\n{c}" for t, c in parts
+            )
+            doc = (
+                f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(self.title)}</title></head>\n"
+                f"<body>\n<h1>{html.escape(self.title)}</h1>\n{body}\n</body></html>\n"
+            )
+        else:
+            doc = f"# {self.title}\n\n" + "\n\n".join(f"## {t}\n\n{c}" for t, c in parts) + "\n"
+
+        with open(os.path.join(self.out_dir, f"report.{self.fmt}"), "w", encoding="utf-8") as f:
+            f.write(doc)
+        with open(os.path.join(self.cache_dir, "status.json"), "w") as f:
+            json.dump(status, f, indent=2)
+        return status
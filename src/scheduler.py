@@ -0,0 +1,205 @@
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# environment variables the BLAS/OpenMP builds of numpy read at import time
+BLAS_ENV_VARS = [
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+]
+
+
+class SharedFrame:
+    """
+    Picklable handle of a DataFrame whose float64 columns live in one shared
+    memory block. Workers rebuild the frame as a read-only view on that block
+    (no copy); columns of other dtypes travel with the handle. If those are
+    not all behind the float columns, restoring the column order copies once.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        numeric = [c for c in df.columns if df[c].dtype == np.float64]
+        values = df[numeric].to_numpy(dtype=np.float64)
+        self.columns = list(df.columns)
+        self.numeric = numeric
+        self.index = df.index
+        self.other = {c: df[c] for c in df.columns if c not in numeric}
+        self.shape = values.shape
+        self.shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        self.name = self.shm.name
+        np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf)[:] = values
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["shm"] = None
+        return state
+
+    def attach(self) -> pd.DataFrame:
+        if self.shm is None:
+            try:
+                # the parent owns the block and unlinks it (track exists from Python 3.13)
+                self.shm = shared_memory.SharedMemory(name=self.name, track=False)
+            except TypeError:
+                self.shm = shared_memory.SharedMemory(name=self.name)
+        values = np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf)
+        values.flags.writeable = False
+        df = pd.DataFrame(values, index=self.index, columns=self.numeric, copy=False)
+        for c, s in self.other.items():
+            df[c] = s
+        if list(df.columns) != self.columns:
+            df = df[self.columns]
+        return df
+
+    def unlink(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _share(obj, shared: dict):
+    """Replaces DataFrames (also inside tuples, lists and dicts) by one SharedFrame each."""
+    if isinstance(obj, pd.DataFrame):
+        if id(obj) not in shared:
+            shared[id(obj)] = SharedFrame(obj)
+        return shared[id(obj)]
+    if isinstance(obj, (tuple, list)):
+        return type(obj)(_share(o, shared) for o in obj)
+    if isinstance(obj, dict):
+        return {k: _share(v, shared) for k, v in obj.items()}
+    return obj
+
+
+def _attach(obj, frames: dict):
+    if isinstance(obj, SharedFrame):
+        if obj.name not in frames:
+            df = obj.attach()
+            # the SharedMemory handle stays with the frame: when the unpickled
+            # SharedFrame is collected its handle would unmap the buffer
+            frames[obj.name] = (obj.shm, df)
+        return frames[obj.name][1]
+    if isinstance(obj, (tuple, list)):
+        return type(obj)(_attach(o, frames) for o in obj)
+    if isinstance(obj, dict):
+        return {k: _attach(v, frames) for k, v in obj.items()}
+    return obj
+
+
+# (shared memory handle, frame) attached in this worker, by shared memory name
+_FRAMES = {}
+
+
+def _init_worker(blas_threads: int) -> None:
+    if blas_threads is None:
+        return
+    try:
+        # limits libraries that are already loaded (fork), env vars only act on import
+        from threadpoolctl import threadpool_limits
+
+        threadpool_limits(blas_threads)
+    except ImportError:
+        pass
+
+
+def _run_task(func, args, kwargs):
+    start = time.perf_counter()
+    result = func(*_attach(args, _FRAMES), **_attach(kwargs, _FRAMES))
+    return result, time.perf_counter() - start
+
+
+@contextmanager
+def _blas_env(blas_threads: int):
+    """Sets the BLAS thread variables for the worker processes started inside."""
+    if blas_threads is None:
+        yield
+        return
+    old = {k: os.environ.get(k) for k in BLAS_ENV_VARS + ["MPLBACKEND"]}
+    os.environ.update({k: str(blas_threads) for k in BLAS_ENV_VARS})
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    try:
+        yield
+    finally:
+        for k, v in old.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+class Scheduler:
+    """
+    Runs independent analyses concurrently in a process pool.
+
+    add() declares a task like report.add_section (function and arguments);
+    DataFrame arguments are copied once into shared memory and every worker
+    maps them without copying. run() returns the results in declaration
+    order. blas_threads limits the BLAS/OpenMP threads per worker so
+    n_jobs workers do not oversubscribe the cores.
+
+    start_method defaults to "fork" where available: workers start without
+    re-importing pandas/statsmodels, which would cost seconds per worker.
+    Forked workers inherit the already loaded BLAS, the limit then needs
+    threadpoolctl (optional). With "spawn" the environment variables are
+    enough.
+    """
+
+    def __init__(self, n_jobs: int = None, blas_threads: int = 1, start_method: str = None):
+        self.n_jobs = os.cpu_count() if n_jobs is None else n_jobs
+        self.blas_threads = blas_threads
+        if start_method is None:
+            start_method = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+        self.start_method = start_method
+        self.tasks = []
+        self.timings = None
+
+    def add(self, name: str, func, *args, **kwargs) -> "Scheduler":
+        if any(t[0] == name for t in self.tasks):
+            raise ValueError(f"Task {name} declared twice")
+        self.tasks.append((name, func, args, kwargs))
+        return self
+
+    def run(self) -> dict:
+        """{task name: result} in declaration order; timings per task are in self.timings."""
+        start = time.perf_counter()
+        if self.n_jobs == 1:
+            results = {}
+            seconds = {}
+            for name, func, args, kwargs in self.tasks:
+                t = time.perf_counter()
+                results[name] = func(*args, **kwargs)
+                seconds[name] = time.perf_counter() - t
+        else:
+            results, seconds = self._run_pool()
+        self.timings = pd.Series(seconds, name="seconds")
+        self.timings["total_wall"] = time.perf_counter() - start
+        return results
+
+    def _run_pool(self) -> tuple[dict, dict]:
+        shared = {}
+        try:
+            jobs = [(name, func, _share(args, shared), _share(kwargs, shared)) for name, func, args, kwargs in self.tasks]
+            with _blas_env(self.blas_threads), ProcessPoolExecutor(
+                max_workers=min(self.n_jobs, len(jobs)) or 1,
+                mp_context=mp.get_context(self.start_method),
+                initializer=_init_worker,
+                initargs=(self.blas_threads,),
+            ) as pool:
+                futures = [(name, pool.submit(_run_task, func, args, kwargs)) for name, func, args, kwargs in jobs]
+                results, seconds = {}, {}
+                for name, future in futures:
+                    try:
+                        results[name], seconds[name] = future.result()
+                    except Exception as e:
+                        raise RuntimeError(f"Analysis {name} failed: {type(e).__name__}: {e}") from e
+            return results, seconds
+        finally:
+            for frame in shared.values():
+                frame.unlink()
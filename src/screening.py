@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from src.group import SCALES, scale_items
+from src.item_correlation import item_columns
+
+# attention check item -> required answer (see survey-key-question.csv)
+ATTENTION_CHECKS = {
+    "G03Q13[7]": 7,  # please select "7 - Strongly agree"
+    "G04Q16[9]": 1,  # please select "not at all"
+}
+
+# LimeSurvey timing export columns, the first one present is used
+TIMING_COLUMNS = ["interviewtime", "Total time", "totaltime"]
+
+EXCLUDE_ON = ("attention", "straightliner", "long_string", "speeder")
+
+
+def longest_run(values: np.ndarray) -> np.ndarray:
+    """Longest run of identical consecutive answers per row, missing answers break a run."""
+    same = (values[:, 1:] == values[:, :-1]) & ~np.isnan(values[:, 1:])
+    count = np.cumsum(same, axis=1)
+    # count at the last break, carried forward
+    last_break = np.maximum.accumulate(np.where(~same, count, 0), axis=1)
+    run = count - last_break
+    longest = run.max(axis=1, initial=0) + 1
+    return np.where(np.isnan(values).all(axis=1), 0, longest)
+
+
+def _completion_seconds(df: pd.DataFrame) -> pd.Series:
+    for col in TIMING_COLUMNS:
+        if col in df.columns:
+            return pd.to_numeric(df[col], errors="coerce")
+    if "startdate" in df.columns and "submitdate" in df.columns:
+        start = pd.to_datetime(df["startdate"], errors="coerce")
+        end = pd.to_datetime(df["submitdate"], errors="coerce")
+        return (end - start).dt.total_seconds()
+    return pd.Series(np.nan, index=df.index)
+
+
+def screening_flags(
+    df: pd.DataFrame,
+    scales: dict = SCALES,
+    attention_checks: dict = ATTENTION_CHECKS,
+    long_string_max: int = 25,
+    speeder_ratio: float = 0.3,
+    straightline_share: float = 1.0,
+) -> pd.DataFrame:
+    """
+    Quality flags for every respondent, computed on the whole item block at once.
+
+    - attention[<item>]: answer differs from the required one (missing answers are not flagged)
+    - zero_var[<scale>]: identical answers on all items of a multi-item SCALES block
+    - straightliner: zero variance in at least straightline_share of the blocks
+    - long_string: more than long_string_max identical answers in a row over all items
+    - speeder: completion time below speeder_ratio x median (only if the export has timings)
+    """
+    flags = pd.DataFrame(index=df.index)
+
+    for item, expected in attention_checks.items():
+        if item in df.columns:
+            answer = pd.to_numeric(df[item], errors="coerce").to_numpy()
+            flags[f"attention[{item}]"] = ~np.isnan(answer) & (answer != expected)
+    attention_cols = [c for c in flags.columns if c.startswith("attention[")]
+    flags["attention"] = flags[attention_cols].any(axis=1) if attention_cols else False
+
+    blocks = {k: scale_items(v) for k, v in scales.items()}
+    blocks = {k: v for k, v in blocks.items() if len(v) > 1 and set(v) <= set(df.columns)}
+    block_items = list(dict.fromkeys(i for v in blocks.values() for i in v))
+    X = df[block_items].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    pos = {item: i for i, item in enumerate(block_items)}
+
+    zero_var = []
+    for key, items in blocks.items():
+        sub = X[:, [pos[i] for i in items]]
+        answered = (~np.isnan(sub)).sum(axis=1)
+        with np.errstate(invalid="ignore"):
+            flat = (np.nanmax(sub, axis=1, initial=-np.inf) == np.nanmin(sub, axis=1, initial=np.inf))
+        col = f"zero_var[{key}]"
+        flags[col] = flat & (answered >= 2)
+        zero_var.append(col)
+    share = flags[zero_var].mean(axis=1) if zero_var else pd.Series(0.0, index=df.index)
+    flags["straightliner"] = share >= straightline_share
+
+    all_items = item_columns(df)
+    items = df[all_items].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    flags["longest_run"] = longest_run(items) if len(all_items) else 0
+    flags["long_string"] = flags["longest_run"] > long_string_max
+
+    seconds = _completion_seconds(df)
+    flags["completion_seconds"] = seconds
+    if seconds.notna().any():
+        flags["speeder"] = (seconds < speeder_ratio * seconds.median()).fillna(False)
+    else:
+        flags["speeder"] = False
+
+    return flags
+
+
+def exclusion_counts(flags: pd.DataFrame, exclude_on: tuple = EXCLUDE_ON) -> pd.Series:
+    """Respondents flagged per exclusion criterion, the excluded ones in total and all screened."""
+    counts = flags[list(exclude_on)].sum().astype(int)
+    counts["excluded"] = int(flags[list(exclude_on)].any(axis=1).sum())
+    counts["screened"] = len(flags)
+    return counts.rename("respondents")
+
+
+def screen(df: pd.DataFrame, exclude_on: tuple = EXCLUDE_ON, **kwargs) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Returns (flags, df without the respondents flagged in any of exclude_on)."""
+    flags = screening_flags(df, **kwargs)
+    flags["exclude"] = flags[list(exclude_on)].any(axis=1)
+    return flags, df[~flags["exclude"]]
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from src.group import COMPOSITES, SCALES, ScoringPlan, min_answered, scale_spec
+from src.item_correlation import pairwise_complete_corr
+
+# composites of group_data as weights over sub-scales, plus alternative weightings
+COMPOSITE_WEIGHTINGS = {
+    "controlled_motivation": {
+        "nested": COMPOSITES["controlled_motivation"],
+        "equal_subscales": {
+            "external_regulation_material": 1 / 3,
+            "external_regulation_social": 1 / 3,
+            "introjected_regulation": 1 / 3,
+        },
+    },
+    "autonomous_motivation": {
+        "nested": COMPOSITES["autonomous_motivation"],
+    },
+}
+
+# which scores every target is correlated with (base definitions)
+PARTNERS = {
+    "upskilling": ["autonomous_motivation", "controlled_motivation"],
+    "reskilling": ["autonomous_motivation", "controlled_motivation"],
+    "autonomous_motivation": ["upskilling", "reskilling"],
+    "controlled_motivation": ["upskilling", "reskilling"],
+}
+
+
+def _scale_variants(scales: dict) -> list[tuple[str, str, list[str], dict]]:
+    """(scale, variant label, items, spec) for every multi-item scale and each drop-one version."""
+    out = []
+    for key, entry in scales.items():
+        spec = scale_spec(entry)
+        items = spec["items"]
+        if len(items) < 2:
+            continue
+        out.append((key, "base", items, spec))
+        for drop in items:
+            out.append((key, f"drop {drop}", [i for i in items if i != drop], spec))
+    return out
+
+
+def score_variants(df: pd.DataFrame, scales: dict = SCALES, composites: dict = COMPOSITE_WEIGHTINGS) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    All scale scores under every drop-one-item variant and composite weighting.
+
+    Sub-scale variants are scored in one masked matrix product over the keyed
+    item block (weighted mean of the answered items, reverse-keying, weights
+    and min_valid / min_share as in group.ScoringPlan), composites are a second product
+    over those scores. Returns (scores, variants) where variants has one row
+    per score column with target and variant label.
+    """
+    base = _scale_variants(scales)
+    # flat composites: plain mean over all items of the sub-scales
+    flat = []
+    for comp, weightings in composites.items():
+        comp_items = [i for sub in next(iter(weightings.values())) for i in scale_spec(scales[sub])["items"]]
+        flat.append((comp, "flat_items", comp_items, scale_spec(comp_items)))
+
+    items = list(dict.fromkeys(i for _, _, its, _ in base + flat for i in its))
+    pos = {item: j for j, item in enumerate(items)}
+    W1 = np.zeros((len(items), len(base) + len(flat)))
+    min_valid = np.zeros(len(base) + len(flat))
+    for c, (_, _, its, spec) in enumerate(base + flat):
+        W1[[pos[i] for i in its], c] = [float(spec["weights"].get(i, 1.0)) for i in its]
+        min_valid[c] = min_answered(spec, len(its))
+
+    X = ScoringPlan(scales, {}).keyed(df)[items].to_numpy(dtype=float)
+    M = ~np.isnan(X)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        S1 = (np.where(M, X, 0.0) @ W1) / (M @ W1)
+    S1[M.astype(float) @ (W1 != 0) < min_valid] = np.nan
+
+    col = {(k, v): c for c, (k, v, _, _) in enumerate(base + flat)}
+    labels = [(k, v) for k, v, _, _ in base + flat]
+    n1 = len(labels)
+
+    # composites: every weighting on the base sub-scales, plus drop-one of each item
+    W2_cols = []
+    for comp, weightings in composites.items():
+        for name, weights in weightings.items():
+            w = np.zeros(n1)
+            for sub, wt in weights.items():
+                w[col[(sub, "base")]] = wt
+            W2_cols.append(w)
+            labels.append((comp, "base" if name == "nested" else name))
+        nested = next(iter(weightings.values()))
+        for sub in nested:
+            for drop in scale_spec(scales[sub])["items"]:
+                w = np.zeros(n1)
+                for other, wt in nested.items():
+                    w[col[(other, f"drop {drop}" if other == sub else "base")]] = wt
+                W2_cols.append(w)
+                labels.append((comp, f"drop {drop}"))
+
+    W2 = np.column_stack(W2_cols)
+    S = np.column_stack([S1, S1 @ W2])
+    names = [f"{k}|{v}" for k, v in labels]
+    variants = pd.DataFrame(labels, columns=["target", "variant"], index=names)
+    return pd.DataFrame(S, index=df.index, columns=names), variants
+
+
+def _group_tests(scores: np.ndarray, group: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Mean difference (old - young, as do_ttest) and p of the do_ttest rule for every column at once."""
+    g0 = scores[group == 0]
+    g1 = scores[group == 1]
+    _, lev_p = stats.levene(g0, g1, axis=0, nan_policy="omit")
+    _, p_student = stats.ttest_ind(g0, g1, axis=0, equal_var=True, nan_policy="omit")
+    _, p_welch = stats.ttest_ind(g0, g1, axis=0, equal_var=False, nan_policy="omit")
+    diff = np.nanmean(g0, axis=0) - np.nanmean(g1, axis=0)
+    return diff, np.where(np.asarray(lev_p) > 0.05, p_student, p_welch)
+
+
+def sensitivity_analysis(
+    df: pd.DataFrame,
+    group_col: str = "young_group",
+    alpha: float = 0.05,
+    scales: dict = SCALES,
+    composites: dict = COMPOSITE_WEIGHTINGS,
+    partners: dict = PARTNERS,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Reruns the group comparison and the partner correlations for every scale variant.
+
+    Returns (results, stability): one row per variant and analysis, and per
+    target and analysis the share of variants that reach the same
+    significance decision as the base definition.
+    """
+    scores, variants = score_variants(df, scales, composites)
+    S = scores.to_numpy()
+    group = pd.to_numeric(df[group_col], errors="coerce").to_numpy()
+
+    diff, p = _group_tests(S, group)
+    results = [
+        variants.assign(analysis="ttest", partner=group_col, estimate=diff, p=p).reset_index(drop=True)
+    ]
+
+    for target, others in partners.items():
+        sel = variants.index[variants["target"] == target]
+        if not len(sel):
+            continue
+        ref_cols = [f"{o}|base" for o in others]
+        x = scores[sel].to_numpy()
+        y = scores[ref_cols].to_numpy()
+        mx, my = ~np.isnan(x), ~np.isnan(y)
+        r, n = pairwise_complete_corr(np.where(mx, x, 0.0), mx.astype(float), np.where(my, y, 0.0), my.astype(float))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = r * np.sqrt((n - 2) / (1 - r**2))
+        p_r = 2 * stats.t.sf(np.abs(t), n - 2)
+        for j, other in enumerate(others):
+            results.append(
+                variants.loc[sel]
+                .assign(analysis="correlation", partner=other, estimate=r[:, j], p=p_r[:, j])
+                .reset_index(drop=True)
+            )
+
+    results = pd.concat(results, ignore_index=True)
+    results["significant"] = results["p"] < alpha
+
+    base = results[results["variant"] == "base"].set_index(["target", "analysis", "partner"])
+    keyed = results.set_index(["target", "analysis", "partner"])
+    keyed["base_significant"] = base["significant"].reindex(keyed.index).to_numpy()
+    keyed["agrees"] = keyed["significant"] == keyed["base_significant"]
+    stability = (
+        keyed.groupby(level=[0, 1, 2])
+        .agg(
+            n_variants=("variant", "size"),
+            base_significant=("base_significant", "first"),
+            share_agree=("agrees", "mean"),
+            estimate_min=("estimate", "min"),
+            estimate_max=("estimate", "max"),
+            p_min=("p", "min"),
+            p_max=("p", "max"),
+        )
+        .reset_index()
+    )
+    stability["stable"] = stability["share_agree"] == 1
+    return results, stability
@@ -7,6 +7,54 @@ import statsmodels.api as sm
 import statsmodels.formula.api as smf
 import matplotlib.pyplot as plt
 
+from src.nonparametric import rank_tests
+
+
+# above this many respondents the point plots switch to binned summaries
+MAX_POINTS = 5000
+# up to this many distinct values a variable counts as discrete (Likert means)
+MAX_LEVELS = 60
+
+
+def _level_counts(values: np.ndarray, bins: int = 40) -> tuple[np.ndarray, np.ndarray, float]:
+    """
+    Counts per distinct value or per histogram bin, with the bar height.
+
+    Values count as discrete only if they lie on an even grid of at most
+    MAX_LEVELS steps (answers, means of a fixed number of items); means over
+    a varying number of answered items (3.0, 3.2, 3.25, ...) are binned so
+    that the smallest gap does not make every bar a hairline.
+    """
+    values = values[~np.isnan(values)]
+    levels, counts = np.unique(values, return_counts=True)
+    if len(levels) <= 1:
+        return levels, counts, 1.0
+    if len(levels) <= MAX_LEVELS:
+        step = np.diff(levels).min()
+        grid = (levels - levels[0]) / step
+        if np.allclose(grid, np.round(grid)) and grid[-1] < MAX_LEVELS:
+            return levels, counts, step
+    counts, edges = np.histogram(values, bins=bins)
+    return (edges[:-1] + edges[1:]) / 2, counts, edges[1] - edges[0]
+
+
+def _pair_counts(x: np.ndarray, y: np.ndarray, bins: int = 60) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Counts per distinct (x, y) pair, or per cell of a 2D histogram; only occupied cells."""
+    keep = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[keep], y[keep]
+    lx, ly = np.unique(x), np.unique(y)
+    if len(lx) <= MAX_LEVELS and len(ly) <= MAX_LEVELS:
+        codes = np.searchsorted(lx, x) * len(ly) + np.searchsorted(ly, y)
+        counts = np.bincount(codes, minlength=len(lx) * len(ly))
+        cx, cy = np.repeat(lx, len(ly)), np.tile(ly, len(lx))
+    else:
+        counts, ex, ey = np.histogram2d(x, y, bins=bins)
+        counts = counts.ravel()
+        cx = np.repeat((ex[:-1] + ex[1:]) / 2, bins)
+        cy = np.tile((ey[:-1] + ey[1:]) / 2, bins)
+    occupied = counts > 0
+    return cx[occupied], cy[occupied], counts[occupied]
+
 
 class SurveyAnalyzer:
     def __init__(
@@ -121,6 +169,25 @@ class SurveyAnalyzer:
             print("mean old   =", g0.mean())
             print()
 
+    def run_rank_test_autonomous_by_group(
+        self, df_clean: pd.DataFrame, print_output: bool = True, generate_files: bool = True
+    ) -> pd.DataFrame:
+        res = rank_tests(
+            df_clean[["autonomous_use", self.group_col]],
+            group_col=self.group_col,
+            old_value=self.old_value,
+            young_value=self.young_value,
+        )
+
+        if print_output:
+            r = res.iloc[0]
+            print("=== RANK TESTS autonomous_use by group ===")
+            print(f"Mann-Whitney U = {r['U']}, p = {r['p_u']} ({r['method']})")
+            print(f"Brunner-Munzel = {r['t']}, p = {r['p']}")
+            print("rank-biserial  =", r["rank_biserial"])
+            print()
+        return res
+
     def run_ancova(
         self, df_clean: pd.DataFrame, print_output: bool = True, generate_files: bool = True
     ):
@@ -148,18 +215,39 @@ class SurveyAnalyzer:
         print_output: bool = True,
         generate_files: bool = True,
         out_png: str = "figures/plot_box_autonomous_use.png",
+        aggregate: bool = None,
     ) -> None:
+        """
+        Box plot with the single answers on top. With more than MAX_POINTS
+        respondents (or aggregate=True) the jittered points become one
+        horizontal bar per answer value (binned strip), width by share.
+        """
         g0 = df_clean.loc[df_clean[self.group_col] == self.old_value, "autonomous_use"].to_numpy()
         g1 = df_clean.loc[df_clean[self.group_col] == self.young_value, "autonomous_use"].to_numpy()
+        if aggregate is None:
+            aggregate = len(g0) + len(g1) > MAX_POINTS
 
         plt.figure()
-        plt.boxplot([g1, g0], labels=["young (1)", "old (0)"], showmeans=True)
-
-        rng = np.random.default_rng(42)
-        x1 = 1 + rng.uniform(-0.06, 0.06, size=len(g1))
-        x0 = 2 + rng.uniform(-0.06, 0.06, size=len(g0))
-        plt.scatter(x1, g1, alpha=0.8)
-        plt.scatter(x0, g0, alpha=0.8)
+        plt.boxplot(
+            [g1[~np.isnan(g1)], g0[~np.isnan(g0)]],
+            labels=["young (1)", "old (0)"],
+            showmeans=True,
+            showfliers=not aggregate,
+        )
+
+        if aggregate:
+            binned = [_level_counts(g) for g in (g1, g0)]
+            # same scale for both groups: widest bar = largest share
+            top = max((counts.max() / counts.sum() for _, counts, _ in binned if counts.sum()), default=1)
+            for pos, (levels, counts, step) in zip((1, 2), binned):
+                width = 0.3 * counts / counts.sum() / top
+                plt.barh(levels, width, height=0.8 * step, left=pos - width / 2, alpha=0.5)
+        else:
+            rng = np.random.default_rng(42)
+            x1 = 1 + rng.uniform(-0.06, 0.06, size=len(g1))
+            x0 = 2 + rng.uniform(-0.06, 0.06, size=len(g0))
+            plt.scatter(x1, g1, alpha=0.8)
+            plt.scatter(x0, g0, alpha=0.8)
 
         plt.ylabel("autonomous_use (mean of G05Q18[1..5])")
         plt.title("Autonomous LLM use by group")
@@ -204,11 +292,34 @@ class SurveyAnalyzer:
         print_output: bool = True,
         generate_files: bool = True,
         out_png: str = "figures/plot_scatter_autonomous_vs_reskill.png",
+        aggregate: bool = None,
     ) -> None:
+        """
+        One marker per respondent. With more than MAX_POINTS respondents (or
+        aggregate=True) one marker per occupied answer pair (2D histogram
+        cell for continuous values), marker area by count.
+        """
+        if aggregate is None:
+            aggregate = len(df_clean) > MAX_POINTS
+
         plt.figure()
-        for grp, label in [(self.young_value, "young (1)"), (self.old_value, "old (0)")]:
-            sub = df_clean[df_clean[self.group_col] == grp]
-            plt.scatter(sub["reskill_orientation"], sub["autonomous_use"], alpha=0.8, label=label)
+        groups = [(self.young_value, "young (1)"), (self.old_value, "old (0)")]
+        if aggregate:
+            binned = []
+            for grp, label in groups:
+                sub = df_clean[df_clean[self.group_col] == grp]
+                binned.append(
+                    _pair_counts(
+                        sub["reskill_orientation"].to_numpy(dtype=float), sub["autonomous_use"].to_numpy(dtype=float)
+                    )
+                )
+            top = max([counts.max() for _, _, counts in binned if len(counts)], default=1)
+            for (grp, label), (cx, cy, counts) in zip(groups, binned):
+                plt.scatter(cx, cy, s=4 + 196 * counts / top, alpha=0.6, label=label)
+        else:
+            for grp, label in groups:
+                sub = df_clean[df_clean[self.group_col] == grp]
+                plt.scatter(sub["reskill_orientation"], sub["autonomous_use"], alpha=0.8, label=label)
 
         plt.xlabel("reskill_orientation (mean of G05Q19[1..6])")
         plt.ylabel("autonomous_use")
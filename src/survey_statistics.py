@@ -7,14 +7,41 @@ class SurveyStatistics:
     Analyzes survey data from demographic questions.
     Accepts DataFrames directly instead of file paths.
     """
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, normalizer=None):
         """
         Initialize with a DataFrame.
         
         Args:
             df: pandas DataFrame containing survey data
+            normalizer: optional other_answers.OtherAnswerNormalizer, maps the
+                free-text [other] answers to canonical categories
         """
         self.data = df
+        self.normalizer = normalizer
+
+    def _combined(self, found: list) -> pd.Series:
+        """Coded answer, or the free-text [other] answer where no code is given."""
+        data = self.data[found]
+        if self.normalizer is not None and len(found) == 2:
+            data = data.assign(**{found[1]: self.normalizer.normalize(found[0], data[found[1]])})
+        data = data.fillna('')
+        first = data.iloc[:, 0]
+        if len(found) == 1:
+            return first
+        return first.where(first.astype(bool), data.iloc[:, 1])
+
+    def _map_counts(self, combined: pd.Series, mapping: dict) -> dict:
+        """Counts per label; normalized [other] categories are labels already."""
+        mapped = {}
+        for k, v in combined.value_counts().items():
+            if k in mapping:
+                label = mapping[k]
+            elif self.normalizer is not None and isinstance(k, str) and k:
+                label = k
+            else:
+                label = f'Unknown ({k})'
+            mapped[label] = mapped.get(label, 0) + int(v)
+        return mapped
 
     def age_statistics(self):
         age_col = "G02Q04"
@@ -40,16 +67,13 @@ class SurveyStatistics:
         if not found:
             return 'No gender columns found.'
         # Combine both columns for total counts
-        gender_data = self.data[found].fillna('')
-        # Use .iloc to avoid FutureWarning
-        combined = gender_data.apply(lambda row: row.iloc[0] if row.iloc[0] else row.iloc[1], axis=1)
-        gender_counts = combined.value_counts().to_dict()
+        combined = self._combined(found)
         
         gender_mapping = {
             '1': 'Male', '2': 'Female', '3': 'Other',
             1: 'Male', 2: 'Female', 3: 'Other',
         }
-        mapped_counts = {gender_mapping.get(k, f'Unknown ({k})'): int(v) for k, v in gender_counts.items()}
+        mapped_counts = self._map_counts(combined, gender_mapping)
         
         return {
             'participants_per_gender': mapped_counts,
@@ -62,15 +86,13 @@ class SurveyStatistics:
         found = [col for col in school_cols if col in self.data.columns]
         if not found:
             return 'No school education columns found.'
-        school_data = self.data[found].fillna('')
-        combined = school_data.apply(lambda row: row.iloc[0] if row.iloc[0] else row.iloc[1], axis=1)
-        school_counts = combined.value_counts().to_dict()
+        combined = self._combined(found)
         
         school_mapping = {
             '1': 'Primary', '2': 'Secondary', '3': 'Tertiary', '4': 'University',
             1: 'Primary', 2: 'Secondary', 3: 'Tertiary', 4: 'University',
         }
-        mapped_counts = {school_mapping.get(k, f'Unknown ({k})'): int(v) for k, v in school_counts.items()}
+        mapped_counts = self._map_counts(combined, school_mapping)
         
         return {
             'participants_per_school_education': mapped_counts,
@@ -83,15 +105,13 @@ class SurveyStatistics:
         found = [col for col in voc_cols if col in self.data.columns]
         if not found:
             return 'No vocational education columns found.'
-        voc_data = self.data[found].fillna('')
-        combined = voc_data.apply(lambda row: row.iloc[0] if row.iloc[0] else row.iloc[1], axis=1)
-        voc_counts = combined.value_counts().to_dict()
+        combined = self._combined(found)
         
         voc_mapping = {
             '1': 'No Training', '2': 'In Training', '3': 'Completed', '4': 'Advanced', '5': 'Specialized',
             1: 'No Training', 2: 'In Training', 3: 'Completed', 4: 'Advanced', 5: 'Specialized',
         }
-        mapped_counts = {voc_mapping.get(k, f'Unknown ({k})'): int(v) for k, v in voc_counts.items()}
+        mapped_counts = self._map_counts(combined, voc_mapping)
         
         return {
             'participants_per_vocational_education': mapped_counts,
@@ -0,0 +1,139 @@
+import itertools
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from math import inf
+
+import pandas as pd
+import statsmodels.formula.api as smf
+
+from src.cleaning import clean_data, load_raw
+from src.group import group_data
+from src.linear_regression import linear_regression
+from src.ttest import do_ttest
+
+TTEST_SCALES = [
+    "autonomous_motivation",
+    "controlled_motivation",
+    "usefulness_work",
+    "usefulness_learning",
+]
+PREDICTORS = ["upskilling", "reskilling", "age", "usage"]
+
+DEFAULT_GRID = {
+    "column_answer_percentage": [0.7, 0.75, 0.8],
+    "young_age": [(18, 35), (18, 34)],
+    "old_age": [(35, inf), (36, inf)],
+    "screen_responses": [True, False],
+}
+
+# raw surveys of the worker process, set once per worker by _init_worker
+_RAW = {}
+
+
+def _init_worker(df_young: pd.DataFrame, df_old: pd.DataFrame) -> None:
+    _RAW["young"] = df_young
+    _RAW["old"] = df_old
+
+
+def run_pipeline(df_young: pd.DataFrame, df_old: pd.DataFrame, config: dict) -> list[dict]:
+    """Cleaning, scoring, t-tests, adjusted group effect and regressions for one configuration, as long rows."""
+    df = clean_data(df_young, df_old, **config)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        df_grouped = group_data(df.copy())
+
+    rows = [
+        {"analysis": "n", "term": "young", "estimate": int((df_grouped["young_group"] == 1).sum()), "p": None},
+        {"analysis": "n", "term": "old", "estimate": int((df_grouped["young_group"] == 0).sum()), "p": None},
+    ]
+
+    ttest = do_ttest(df_grouped[TTEST_SCALES + ["young_group"]])
+    for r in ttest.itertuples():
+        rows.append({"analysis": "ttest", "term": r.scale, "estimate": r.mean_young - r.mean_old, "p": r.p})
+
+    # group effect on autonomous_motivation adjusted for up- and reskilling (group_data scales).
+    # Not the model of SurveyAnalyzer.run_ancova: its autonomous_use is the G05Q18 mean, the
+    # same items as its upskill_orientation covariate and as upskilling here.
+    ancova = smf.ols(
+        "autonomous_motivation ~ young_group + upskilling + reskilling", data=df_grouped
+    ).fit()
+    rows.append(
+        {
+            "analysis": "ancova:autonomous_motivation",
+            "term": "young_group",
+            "estimate": ancova.params["young_group"],
+            "p": ancova.pvalues["young_group"],
+        }
+    )
+
+    data = df_grouped[PREDICTORS + ["autonomous_motivation", "controlled_motivation"]].dropna()
+    for y in ["autonomous_motivation", "controlled_motivation"]:
+        model = linear_regression(df_X=data[PREDICTORS], df_Y=data[y])
+        for p in PREDICTORS:
+            rows.append(
+                {"analysis": f"regression:{y}", "term": p, "estimate": model.params[p], "p": model.pvalues[p]}
+            )
+    return rows
+
+
+def _run_config(config_id: int, config: dict) -> list[dict]:
+    try:
+        rows = run_pipeline(_RAW["young"], _RAW["old"], config)
+    except Exception as e:
+        # e.g. a column threshold that drops all items, keep the rest of the grid
+        rows = [{"analysis": "error", "term": f"{type(e).__name__}: {e}", "estimate": None, "p": None}]
+    return [{"config_id": config_id} | config | r for r in rows]
+
+
+def expand_grid(grid: dict) -> list[dict]:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def run_sweep(
+    young_csv: str = "data/results-survey779776.csv",
+    old_csv: str = "data/results-survey374736.csv",
+    grid: dict = None,
+    n_jobs: int = None,
+) -> pd.DataFrame:
+    """
+    Runs the main.py pipeline for every combination in grid (keyword arguments of clean_data).
+
+    The CSVs are read once; each worker process receives the raw frames a
+    single time through the pool initializer. Returns one row per
+    configuration, analysis and term with estimate and p value.
+    """
+    grid = DEFAULT_GRID if grid is None else grid
+    configs = expand_grid(grid)
+    df_young, df_old = load_raw(young_csv, old_csv)
+
+    n_jobs = os.cpu_count() if n_jobs is None else n_jobs
+    if n_jobs == 1:
+        _init_worker(df_young, df_old)
+        results = [_run_config(i, c) for i, c in enumerate(configs)]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_init_worker, initargs=(df_young, df_old)
+        ) as pool:
+            results = list(pool.map(_run_config, range(len(configs)), configs))
+
+    return pd.DataFrame([r for rows in results for r in rows])
+
+
+def stability(results: pd.DataFrame, alpha: float = 0.05) -> pd.DataFrame:
+    """How much every estimate moves across the grid and how often it is significant."""
+    res = results[~results["analysis"].isin(["n", "error"])].copy()
+    res["significant"] = res["p"] < alpha
+    return (
+        res.groupby(["analysis", "term"])
+        .agg(
+            estimate_min=("estimate", "min"),
+            estimate_median=("estimate", "median"),
+            estimate_max=("estimate", "max"),
+            p_max=("p", "max"),
+            share_significant=("significant", "mean"),
+            sign_stable=("estimate", lambda e: bool((e > 0).all() or (e < 0).all())),
+        )
+        .reset_index()
+    )
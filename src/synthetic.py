@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+LIKERT_BLOCKS = {
+    "G03Q13": 11,
+    "G03Q14": 10,
+    "G04Q16": 20,
+    "G05Q18": 5,
+    "G05Q19": 6,
+}
+
+
+def synthetic_wave(
+    n: int,
+    young: bool = True,
+    seed: int = 0,
+    unfinished_share: float = 0.1,
+    careless_share: float = 0.05,
+) -> pd.DataFrame:
+    """
+    Random responses with the column layout of the LimeSurvey exports in data/.
+
+    Likert items are 1-7 answers driven by one latent factor per question
+    block, a careless_share of respondents answers every item the same, and
+    unfinished_share has no submitdate. Only meant for benchmarks.
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"id": np.arange(1, n + 1)})
+    submitted = rng.random(n) >= unfinished_share
+    df["submitdate"] = np.where(submitted, "1980-01-01 00:00:00", None)
+    df["lastpage"] = np.where(submitted, 5.0, rng.integers(0, 5, n).astype(float))
+    df["startlanguage"] = "en"
+    df["seed"] = rng.integers(1e8, 1e9, n)
+    for q in ("G01Q01", "G01Q02", "G01Q03"):
+        df[q] = 1.0
+
+    low, high = (18, 36) if young else (35, 66)
+    df["G02Q04"] = rng.integers(low, high, n).astype(float)
+    df["G02Q05"] = rng.choice([1.0, 2.0, 3.0, np.nan], n, p=[0.48, 0.48, 0.02, 0.02])
+    df["G02Q05[other]"] = np.where(np.isnan(df["G02Q05"]), "prefer not to say", None)
+    df["G02Q06"] = rng.choice([2.0, 3.0, 4.0], n, p=[0.05, 0.1, 0.85])
+    df["G02Q06[other]"] = None
+    df["G02Q07"] = rng.choice([1.0, 2.0, 3.0, 4.0, 5.0], n)
+    df["G02Q07[other]"] = None
+    df["G02Q08"] = "field"
+    df["G02Q09"] = "position"
+    df["G03Q10"] = np.nan
+    df["G03Q11"] = rng.integers(1, 8, n).astype(float)
+    df["G03Q12"] = rng.integers(1, 8, n).astype(float)
+
+    careless = rng.random(n) < careless_share
+    careless_value = rng.integers(1, 8, n)
+    for block, n_items in LIKERT_BLOCKS.items():
+        if block == "G04Q16":
+            df["G04Q15"] = np.nan
+        if block == "G05Q18":
+            df["G05Q17"] = np.nan
+        factor = rng.standard_normal(n)
+        latent = 0.8 * factor[:, None] + 0.6 * rng.standard_normal((n, n_items))
+        items = np.clip(np.round(4 + 1.5 * latent), 1, 7)
+        items[careless] = careless_value[careless, None]
+        for i in range(n_items):
+            df[f"{block}[{i + 1}]"] = items[:, i]
+
+    # attention checks are answered correctly by the attentive respondents
+    df.loc[~careless, "G03Q13[7]"] = 7.0
+    df.loc[~careless, "G04Q16[9]"] = 1.0
+
+    # unfinished respondents stop somewhere in the item blocks
+    item_cols = [c for c in df.columns if c[:6] in LIKERT_BLOCKS and "[" in c]
+    stop = rng.integers(0, len(item_cols), n)
+    missing = (~submitted)[:, None] & (np.arange(len(item_cols))[None, :] >= stop[:, None])
+    values = df[item_cols].to_numpy()
+    values[missing] = np.nan
+    df[item_cols] = values
+    return df
@@ -1,21 +1,63 @@
 from numpy.ma.core import equal
-from scipy.stats import ttest_ind, levene
+from scipy.stats import ttest_ind, levene, t as t_dist
 import pandas as pd
+import numpy as np
 import warnings
 
+from src.effect_size import standardized_difference
+from src.query import select_rows
+from src.weighting import resolve_weights, weighted_mean_se, weighted_stats
+
 def do_ttest(df: pd.DataFrame):
     results = []
     r = re.compile(r"G\d{2}Q\d{2}")
 
     scales = df.columns
 
-def do_ttest(df: pd.DataFrame, print_results: bool = False):
+def do_ttest(df: pd.DataFrame, print_results: bool = False, weights=None, confidence: float = 0.95, rows=None):
+    """
+    Old vs. young comparison for every column except young_group.
+
+    weights (column name or Series aligned to df, e.g. from weighting.rake)
+    switches to a design-based Welch test on weighted means with
+    linearization standard errors, see weighted_ttest.
+
+    Cohen's d and Hedges' g (old - young, like t) with noncentral-t CIs are
+    computed for all scales in one vectorized step from the group n, means
+    and variances of the loop (weighted: Kish effective n and weighted
+    variances).
+
+    rows (query.Bitmap, index labels or boolean mask) restricts the test to
+    a subset of respondents.
+    """
     results = []
-    column_list = df.columns[df.columns != "young_group"]
+    group_stats = []
+    df = select_rows(df, rows)
+    w = resolve_weights(df, weights)
+    exclude = ["young_group"] + ([weights] if isinstance(weights, str) else [])
+    column_list = df.columns[~df.columns.isin(exclude)]
+    # group masks once for all columns
+    is_old = (df["young_group"] == 0).to_numpy()
+    is_young = (df["young_group"] == 1).to_numpy()
 
     for column in column_list:
-        g0 = df.loc[df["young_group"] == 0, column].dropna()
-        g1 = df.loc[df["young_group"] == 1, column].dropna()
+        if w is not None:
+            if df[column].dtype != "float64":
+                warnings.warn(f"{column} is not numeric")
+                continue
+            results.append(
+                {"scale": column} | weighted_ttest(df[column], df["young_group"], w, confidence)
+            )
+            stats_0 = weighted_stats(df[column].to_numpy()[is_old], w.to_numpy()[is_old])
+            stats_1 = weighted_stats(df[column].to_numpy()[is_young], w.to_numpy()[is_young])
+            group_stats.append(tuple(zip(stats_0, stats_1)))
+            if print_results:
+                r = results[-1]
+                print(f"weighted Welch t-test {column} \t t:{round(r['t'], 3)} \t p:{round(r['p'], 3)}")
+            continue
+
+        g0 = df.loc[is_old, column].dropna()
+        g1 = df.loc[is_young, column].dropna()
         levene_stat, p_value = levene_test(g0, g1)
         equal_var = p_value > 0.05
         # print(equal_var)
@@ -27,7 +69,7 @@ def do_ttest(df: pd.DataFrame, print_results: bool = False):
         result = ttest_ind(g0, g1, equal_var=equal_var, nan_policy="omit")
         t, p = result[0], result[1]
         confidence_intervall_lower, confidence_intervall_higher = (
-            result.confidence_interval()
+            result.confidence_interval(confidence_level=confidence)
         )
 
         results.append(
@@ -42,6 +84,7 @@ def do_ttest(df: pd.DataFrame, print_results: bool = False):
                 "confidence_intervall_higher": confidence_intervall_higher,
             }
         )
+        group_stats.append(((len(g0), len(g1)), (g0.mean(), g1.mean()), (g0.var(), g1.var())))
         if print_results:
             print(f"{column} has a levene p value of {round(p_value, 3)}")
             if equal_var:
@@ -50,11 +93,40 @@ def do_ttest(df: pd.DataFrame, print_results: bool = False):
                 print(f"Welchs t-test results \t t:{round(t, 3)} \t p:{round(p, 3)}")
 
     results_df = pd.DataFrame(results)
+    if results:
+        (n0, n1), (m0, m1), (v0, v1) = (np.array(s).T for s in zip(*group_stats))
+        effect = standardized_difference(n0, n1, m0, m1, v0, v1, confidence)
+        results_df = results_df.assign(**effect)
     if print_results:
         print(results_df.to_string())
     return results_df
 
 
+def weighted_ttest(x: pd.Series, group: pd.Series, weights: pd.Series, confidence: float = 0.95) -> dict:
+    """
+    Welch-type t-test of weighted means (old - young, as ttest_ind(g0, g1)).
+
+    Each group mean gets its linearization SE; the degrees of freedom follow
+    Welch-Satterthwaite with the group sizes.
+    """
+    m0, se0, n0 = weighted_mean_se(x[group == 0], weights[group == 0])
+    m1, se1, n1 = weighted_mean_se(x[group == 1], weights[group == 1])
+    diff = m0 - m1
+    se = np.sqrt(se0**2 + se1**2)
+    dof = se**4 / (se0**4 / (n0 - 1) + se1**4 / (n1 - 1))
+    t = diff / se
+    half = t_dist.ppf((1 + confidence) / 2, dof) * se
+    return {
+        "mean_old": m0,
+        "mean_young": m1,
+        "t": t,
+        "p": 2 * t_dist.sf(abs(t), dof),
+        "degrees_of_freedom": dof,
+        "confidence_intervall_lower": diff - half,
+        "confidence_intervall_higher": diff + half,
+    }
+
+
 def levene_test(df_1: pd.DataFrame, df_2: pd.DataFrame):
     levene_stat, p_value = levene(df_1, df_2)
     return levene_stat, p_value
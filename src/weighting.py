@@ -0,0 +1,186 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# margins the samples are skewed on: age (G02Q04, banded), gender, education
+AGE_COL = "G02Q04"
+GENDER_COL = "G02Q05"
+EDUCATION_COLS = ["G02Q06", "G02Q07"]
+
+
+def age_bands(df: pd.DataFrame, bins=(18, 25, 35, 45, 55, 65, np.inf), col: str = AGE_COL) -> pd.Series:
+    """Age in years as band labels like "18-24" for a raking margin."""
+    labels = [
+        f"{int(lo)}+" if np.isinf(hi) else f"{int(lo)}-{int(hi) - 1}" for lo, hi in zip(bins[:-1], bins[1:])
+    ]
+    age = pd.to_numeric(df[col], errors="coerce")
+    return pd.cut(age, bins=list(bins), labels=labels, right=False).astype(object)
+
+
+def resolve_weights(df: pd.DataFrame, weights) -> pd.Series | None:
+    """weights as column name or Series, aligned to df.index (None stays None)."""
+    if weights is None:
+        return None
+    if isinstance(weights, str):
+        w = df[weights]
+    else:
+        w = pd.Series(weights, index=df.index) if not isinstance(weights, pd.Series) else weights.reindex(df.index)
+    w = pd.to_numeric(w, errors="coerce")
+    if (w < 0).any():
+        raise ValueError("weights must not be negative")
+    return w
+
+
+def rake(
+    df: pd.DataFrame,
+    targets: dict,
+    base_weights=None,
+    max_iter: int = 100,
+    tol: float = 1e-8,
+    trim: tuple[float, float] = None,
+) -> pd.Series:
+    """
+    Raking (iterative proportional fitting) weights against target margins.
+
+    targets maps a column name to {level: share}, shares are normalized per
+    margin (add banded columns like df["age_band"] = age_bands(df) first).
+    Respondents are collapsed into the cells of all margin combinations
+    first, so every iteration only updates one factor per cell with
+    bincount over the cell index, independent of the number of respondents.
+    Rows with a level that is not in a margin's targets are left out of
+    that margin.
+
+    trim=(low, high) clips the weights relative to their mean after
+    convergence (and rakes again until stable). Returns weights with mean 1.
+    """
+    n = len(df)
+    base = np.ones(n) if base_weights is None else resolve_weights(df, base_weights).fillna(0).to_numpy(float)
+
+    codes, shares = [], []
+    for col, target in targets.items():
+        levels = list(target)
+        share = np.array([target[level] for level in levels], dtype=float)
+        codes.append(pd.Categorical(df[col], categories=levels).codes.astype(np.int64))
+        shares.append(share / share.sum())
+        counts = np.bincount(codes[-1][codes[-1] >= 0], minlength=len(levels))
+        empty = [level for level, c in zip(levels, counts) if c == 0]
+        if empty:
+            warnings.warn(f"{col}: no respondents in {empty}, the other levels are scaled up")
+
+    # cells: unique combinations of margin codes (-1 = not in the margin),
+    # one flat integer key per respondent so the grouping is a single hash pass
+    dims = [len(share) + 1 for share in shares]
+    keys = np.ravel_multi_index([c + 1 for c in codes], dims)
+    inverse, cell_keys = pd.factorize(keys)
+    cells = np.column_stack(np.unravel_index(cell_keys, dims)) - 1
+    cell_base = np.bincount(inverse, weights=base, minlength=len(cells))
+    factor = np.ones(len(cells))
+
+    def fit(factor):
+        for _ in range(max_iter):
+            max_dev = 0.0
+            for m, share in enumerate(shares):
+                code = cells[:, m]
+                inside = code >= 0
+                w = cell_base * factor
+                total = np.bincount(code[inside], weights=w[inside], minlength=len(share))
+                target = share * total.sum()
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    adjust = np.where(total > 0, target / total, 1.0)
+                max_dev = max(max_dev, np.abs(total - target).max() / total.sum())
+                factor[inside] *= adjust[code[inside]]
+            if max_dev < tol:
+                return factor, True
+        return factor, False
+
+    factor, converged = fit(factor)
+    if trim is not None:
+        for _ in range(max_iter):
+            mean = (cell_base * factor).sum() / base.sum()
+            clipped = np.clip(factor, trim[0] * mean, trim[1] * mean)
+            if np.allclose(clipped, factor, rtol=tol, atol=0):
+                break
+            factor, converged = fit(clipped)
+    if not converged:
+        warnings.warn(f"raking did not converge in {max_iter} iterations")
+
+    w = base * factor[inverse]
+    return pd.Series(w / w.mean(), index=df.index, name="weight")
+
+
+def weighted_margins(df: pd.DataFrame, weights, columns: list) -> pd.DataFrame:
+    """Unweighted and weighted share of every level, to check the raking result."""
+    w = resolve_weights(df, weights)
+    rows = []
+    for col in columns:
+        values = df[col]
+        shares = pd.DataFrame(
+            {
+                "unweighted": values.value_counts(normalize=True),
+                "weighted": w.groupby(values).sum() / w[values.notna()].sum(),
+            }
+        )
+        rows.append(shares.rename_axis("level").reset_index().assign(variable=col))
+    return pd.concat(rows, ignore_index=True)[["variable", "level", "unweighted", "weighted"]]
+
+
+def effective_n(weights) -> float:
+    """Kish effective sample size (sum w)^2 / sum w^2."""
+    w = np.asarray(weights, dtype=float)
+    w = w[~np.isnan(w)]
+    return float(w.sum() ** 2 / (w**2).sum()) if len(w) else np.nan
+
+
+def weighted_mean_se(x: np.ndarray, w: np.ndarray) -> tuple[float, float, int]:
+    """
+    Weighted mean with its linearization standard error and n, NaNs dropped.
+
+    se^2 = n / (n - 1) * sum w^2 (x - mean)^2 / (sum w)^2, the usual
+    design-based variance of a ratio mean with weights treated as fixed.
+    """
+    x = np.asarray(x, dtype=float)
+    w = np.asarray(w, dtype=float)
+    ok = ~np.isnan(x) & ~np.isnan(w) & (w > 0)
+    x, w = x[ok], w[ok]
+    n = len(x)
+    if n == 0:
+        return np.nan, np.nan, 0
+    mean = float((w * x).sum() / w.sum())
+    if n < 2:
+        return mean, np.nan, n
+    se = float(np.sqrt(n / (n - 1) * (w**2 * (x - mean) ** 2).sum() / w.sum() ** 2))
+    return mean, se, n
+
+
+def weighted_stats(x: np.ndarray, w: np.ndarray) -> tuple[float, float, float]:
+    """Kish effective n, weighted mean and unbiased weighted variance (as np.cov with aweights)."""
+    x = np.asarray(x, dtype=float)
+    w = np.asarray(w, dtype=float)
+    ok = ~np.isnan(x) & ~np.isnan(w) & (w > 0)
+    x, w = x[ok], w[ok]
+    if len(x) < 2:
+        return float(len(x)), (float(x[0]) if len(x) else np.nan), np.nan
+    v1, v2 = w.sum(), (w**2).sum()
+    mean = float((w * x).sum() / v1)
+    var = float((w * (x - mean) ** 2).sum() / (v1 - v2 / v1))
+    return v1**2 / v2, mean, var
+
+
+def weighted_quantile(x: np.ndarray, w: np.ndarray, q: float = 0.5) -> float:
+    """
+    Weighted quantile on the cumulative weight, NaNs dropped. Where the
+    cumulative weight hits q exactly the two neighbours are averaged, so
+    equal weights give the usual median.
+    """
+    x = np.asarray(x, dtype=float)
+    w = np.asarray(w, dtype=float)
+    ok = ~np.isnan(x) & ~np.isnan(w) & (w > 0)
+    if not ok.any():
+        return np.nan
+    order = np.argsort(x[ok])
+    xs, cw = x[ok][order], np.cumsum(w[ok][order])
+    i = np.searchsorted(cw, q * cw[-1])
+    if i + 1 < len(xs) and np.isclose(cw[i], q * cw[-1]):
+        return float((xs[i] + xs[i + 1]) / 2)
+    return float(xs[i])
@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+from src.backend import compare_backends
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+YOUNG_CSV = os.path.join(ROOT, "data/results-survey779776.csv")
+OLD_CSV = os.path.join(ROOT, "data/results-survey374736.csv")
+
+
+@pytest.mark.parametrize("screen_responses", [True, False])
+def test_backends_agree(screen_responses):
+    pytest.importorskip("polars")
+    pytest.importorskip("pyarrow")
+    results = compare_backends(YOUNG_CSV, OLD_CSV, ("pandas", "polars"), screen_responses=screen_responses)
+    assert set(results) == {"pandas", "polars"}
+    assert len(results["pandas"]["grouped"]) > 0
@@ -0,0 +1,78 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("flask")
+from werkzeug.serving import make_server
+
+from src.limesurvey import LimeSurveyClient, _load_pending, fetch_new_responses
+from src.limesurvey_stub import RPC_PATH, create_app
+
+SURVEY_ID = 779776
+
+
+@pytest.fixture
+def stub():
+    """Stub served on a free local port, yields (app, responses, client)."""
+    responses = pd.DataFrame({
+        "id": [1, 2, 3],
+        "submitdate": ["2025-01-01 09:00:00", np.nan, "2025-01-01 09:30:00"],
+        "G01Q01": [4.0, np.nan, 2.0],
+    })
+    surveys = {SURVEY_ID: responses}
+    app = create_app(surveys)
+    server = make_server("127.0.0.1", 0, app)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}{RPC_PATH}"
+    try:
+        with LimeSurveyClient(url, "admin", "admin") as client:
+            yield app, surveys, client
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def test_incremental_fetch_rechecks_pending(stub, tmp_path):
+    app, surveys, client = stub
+    path = str(tmp_path / f"results-survey{SURVEY_ID}.csv")
+
+    assert fetch_new_responses(client, SURVEY_ID, path) == 3
+    assert list(pd.read_csv(path)["id"]) == [1, 2, 3]
+    assert list(_load_pending(path)) == [2]
+
+    # response 2 is submitted, 4 arrives finished and 5 unfinished
+    responses = surveys[SURVEY_ID]
+    responses.loc[responses["id"] == 2, ["submitdate", "G01Q01"]] = ["2025-01-02 10:00:00", 5.0]
+    surveys[SURVEY_ID] = pd.concat([responses, pd.DataFrame({
+        "id": [4, 5],
+        "submitdate": ["2025-01-02 11:00:00", np.nan],
+        "G01Q01": [3.0, np.nan],
+    })], ignore_index=True)
+    app.config["export_calls"].clear()
+
+    assert fetch_new_responses(client, SURVEY_ID, path) == 3
+    # only rows after the last stored id, plus one query for the pending response
+    assert app.config["export_calls"] == [(SURVEY_ID, 4, None), (SURVEY_ID, 2, 2)]
+    stored = pd.read_csv(path).set_index("id")
+    assert list(stored.index) == [1, 2, 3, 4, 5]
+    assert stored.loc[2, "submitdate"] == "2025-01-02 10:00:00"
+    assert stored.loc[2, "G01Q01"] == 5.0
+    assert list(_load_pending(path)) == [5]
+
+    # nothing new: no rows change, 5 is still asked for
+    app.config["export_calls"].clear()
+    assert fetch_new_responses(client, SURVEY_ID, path) == 0
+    assert (SURVEY_ID, 5, 5) in app.config["export_calls"]
+
+
+def test_abandoned_response_is_no_longer_rechecked(stub, tmp_path):
+    app, _, client = stub
+    path = str(tmp_path / f"results-survey{SURVEY_ID}.csv")
+    fetch_new_responses(client, SURVEY_ID, path)
+
+    app.config["export_calls"].clear()
+    assert fetch_new_responses(client, SURVEY_ID, path, max_pending_days=-1) == 0
+    assert app.config["export_calls"] == [(SURVEY_ID, 4, None)]
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.moderation import moderation_sweep
+
+
+def _data(seed=0):
+    rng = np.random.default_rng(seed)
+    n = 120
+    x = rng.normal(size=n)
+    level = rng.choice([1.0, 2.0], n)
+    level[0] = 3.0  # singleton level
+    y = 0.5 * x + 0.3 * x * (level == 2) + rng.normal(scale=0.5, size=n)
+    return pd.DataFrame({"y": y, "x": x, "g": level})
+
+
+def test_singleton_level_is_dropped():
+    with pytest.warns(UserWarning, match="Dropping levels"):
+        res = moderation_sweep(_data(), ["y"], ["x"], moderator="g", categorical=True)
+    assert list(res["simple_slopes"]["moderator_value"]) == [1.0, 2.0]
+    assert res["models"]["n"].iloc[0] == 119
+
+
+def test_singleton_level_kept_is_rank_deficient():
+    with pytest.raises(ValueError, match="moderated by g"):
+        moderation_sweep(_data(), ["y"], ["x"], moderator="g", categorical=True, min_level_n=1)